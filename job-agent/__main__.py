@@ -2,200 +2,62 @@
 Entry point for the A2A + LangGraph Job Agent.
 """
 
-from a2a.types import AgentCapabilities, AgentSkill, AgentCard
-from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.apps import A2AStarletteApplication
-from a2a.server.tasks import InMemoryTaskStore
-from agent import JobAgent
-from agent_executor import JobAgentExecutor
+import time
+
+_IMPORT_START = time.perf_counter()
+
+from log_config import configure_logging
+from server import build_app
 import uvicorn
 from dotenv import load_dotenv
 import logging
 import os
 import click
-import uuid
-from starlette.responses import HTMLResponse, JSONResponse
-from starlette.requests import Request
+from startup_profile import startup
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
 
 load_dotenv()
 
-logging.basicConfig(level=logging.INFO)
+# 로그는 큐에 넣고 별도 스레드에서 출력 (요청 처리 경로에서 stdout I/O 대기 없음)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
 @click.command()
 @click.option("--host", "host", default="0.0.0.0")
 @click.option("--port", "port", default=int(os.getenv("PORT", "8080")))
-def main(host, port):
+@click.option(
+    "--startup-profile",
+    is_flag=True,
+    default=False,
+    help="Build the agent at startup and print the time spent in each import/construction phase.",
+)
+@click.option(
+    "--workers",
+    "workers",
+    default=int(os.getenv("JOB_AGENT_WORKERS", "1")),
+    help="Worker processes; more than 1 runs them behind a dispatcher that routes by contextId.",
+)
+@click.option("--uds", "uds", default=None, hidden=True, help="Serve on this unix socket (dispatcher workers).")
+def main(host, port, startup_profile, workers, uds):
     """Start the A2A server for the Job Agent."""
+    startup.record("import server stack (a2a, starlette, uvicorn)", _IMPORT_SECONDS)
     try:
-        capabilities = AgentCapabilities(streaming=True)
-        skill = AgentSkill(
-            id="job_agent",
-            name="일자리 전문가",
-            description="일자리 고민이 있는 사람에게 전문가 조언을 제공합니다.",
-            tags=["job_agent"],
-            examples=["커리어 고민이 있어요."],
-        )
-        agent_host_url = (
-            os.getenv("HOST_OVERRIDE")
-            if os.getenv("HOST_OVERRIDE")
-            else f"http://{host}:{port}/"
-        )
-        agent_card = AgentCard(
-            name="일자리 전문가",
-            description="일자리 고민이 있는 사람에게 전문가 조언을 제공합니다.",
-            url=agent_host_url,
-            version="1.0.0",
-            defaultInputModes=JobAgent.SUPPORTED_CONTENT_TYPES,
-            defaultOutputModes=JobAgent.SUPPORTED_CONTENT_TYPES,
-            capabilities=capabilities,
-            skills=[skill],
-        )
-
-        request_handler = DefaultRequestHandler(
-            agent_executor=JobAgentExecutor(), task_store=InMemoryTaskStore()
-        )
-        server = A2AStarletteApplication(agent_card=agent_card, http_handler=request_handler)
-
-        # Build underlying Starlette app and mount a simple web UI
-        app = server.build()
-
-        # Lightweight UI agent instance (separate from executor) for direct chats
-        ui_agent = JobAgent()
-
-        async def homepage(_: Request) -> HTMLResponse:
-            return HTMLResponse(
-                """
-<!doctype html>
-<html lang="en">
-  <head>
-    <meta charset="utf-8" />
-    <meta name="viewport" content="width=device-width, initial-scale=1" />
-    <title>Job Agent - Chat</title>
-    <style>
-      body { font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; margin: 0; background: #0b1021; color: #e6e9f5; }
-      .container { max-width: 840px; margin: 0 auto; padding: 24px; }
-      h1 { margin: 0 0 16px; font-size: 20px; color: #a7b1ff; }
-      .chat { background: #0f1633; border: 1px solid #1f2a56; border-radius: 12px; padding: 16px; min-height: 360px; }
-      .msg { padding: 10px 12px; border-radius: 8px; margin: 8px 0; max-width: 80%; white-space: pre-wrap; }
-      .user { background: #1b2554; margin-left: auto; }
-      .agent { background: #131a3a; }
-      .input { display: flex; gap: 8px; margin-top: 12px; }
-      input, button { font-size: 16px; }
-      input { flex: 1; padding: 10px 12px; border-radius: 8px; border: 1px solid #1f2a56; background: #0f1633; color: #e6e9f5; }
-      button { padding: 10px 14px; border-radius: 8px; border: 1px solid #2a3a7a; background: #2d3c80; color: #e6e9f5; cursor: pointer; }
-      button:disabled { opacity: .6; cursor: not-allowed; }
-      .hint { color: #97a0d1; font-size: 12px; margin-top: 8px; }
-      a { color: #a7b1ff; }
-    </style>
-  </head>
-  <body>
-    <div class="container">
-      <h1>Job Agent - Chat</h1>
-      <div class="chat" id="chat"></div>
-      <div class="input">
-        <input id="text" placeholder="Type your message..." />
-        <button id="send">Send</button>
-      </div>
-      <div class="hint">
-        This UI posts to <code>/chat</code> on this service and renders the response. The Agent Card is available at <a href="/.well-known/agent.json">/.well-known/agent.json</a>.
-      </div>
-    </div>
-    <script>
-      const chat = document.getElementById('chat');
-      const input = document.getElementById('text');
-      const btn = document.getElementById('send');
-      function safeUUID() {
-        try {
-          if (typeof crypto !== 'undefined' && crypto && typeof crypto.randomUUID === 'function') {
-            return crypto.randomUUID();
-          }
-        } catch (_) {}
-        // Fallback
-        const s4 = () => Math.floor((1 + Math.random()) * 0x10000).toString(16).substring(1);
-        return `${Date.now().toString(16)}-${s4()}-${s4()}-${s4()}-${s4()}${s4()}${s4()}`;
-      }
-      let contextId = safeUUID();
-
-      function addMsg(text, cls) {
-        const div = document.createElement('div');
-        div.className = 'msg ' + cls;
-        div.textContent = text;
-        chat.appendChild(div);
-        chat.scrollTop = chat.scrollHeight;
-      }
-
-      let isProcessing = false; // 중복 처리 방지 플래그
-      let isComposing = false; // IME 조합 상태 플래그
-
-      async function send() {
-        const text = input.value.trim();
-        if (!text || isProcessing) return; // 이미 처리 중이면 무시
-        
-        isProcessing = true; // 처리 시작
-        input.value = ''; // 즉시 input 비우기
-        btn.disabled = true;
-        addMsg(text, 'user');
-        
-        try {
-          const res = await fetch('/chat', { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify({ text, contextId }) });
-          if (!res.ok) throw new Error('Request failed');
-          const data = await res.json();
-          if (data && data.reply) addMsg(data.reply, 'agent'); else addMsg('[No reply]', 'agent');
-        } catch (e) {
-          console.error('POST /chat failed', e);
-          addMsg('Error: ' + e.message, 'agent');
-        } finally {
-          btn.disabled = false;
-          isProcessing = false; // 처리 완료
-          input.focus();
-        }
-      }
-
-      btn.addEventListener('click', send);
-
-      // IME 조합 상태 처리 (한국어 등)
-      input.addEventListener('compositionstart', () => { isComposing = true; });
-      input.addEventListener('compositionend', () => { isComposing = false; });
-      
-      // Enter 키 이벤트 처리 개선
-      input.addEventListener('keydown', (e) => { 
-        if (e.key === 'Enter' && !e.shiftKey) {
-          if (e.isComposing || isComposing) {
-            // IME 조합 중에는 전송하지 않음
-            return;
-          }
-          e.preventDefault(); // 기본 Enter 동작 방지
-          e.stopPropagation(); // 이벤트 전파 중단
-          e.stopImmediatePropagation(); // 즉시 이벤트 중단
-          send(); 
-        }
-      });
-      
-      input.focus();
-    </script>
-  </body>
-  </html>
-                """
-            )
-
-        async def chat(request: Request) -> JSONResponse:
-            body = await request.json()
-            user_text = (body or {}).get("text", "").strip()
-            context_id = (body or {}).get("contextId") or str(uuid.uuid4())
-            if not user_text:
-                return JSONResponse({"error": "Missing text"}, status_code=400)
-            try:
-                reply = ui_agent.invoke(user_text, context_id)
-                return JSONResponse({"reply": reply, "contextId": context_id})
-            except Exception as e:
-                return JSONResponse({"error": str(e)}, status_code=500)
-
-        app.add_route("/", homepage, methods=["GET"])
-        app.add_route("/chat", chat, methods=["POST"])
-
-        uvicorn.run(app, host=host, port=port)
+        if workers > 1 and uds is None:
+            from dispatcher import Dispatcher
+
+            # 대화 상태는 워커 프로세스별 메모리에 있으므로 contextId 기준으로 워커 고정
+            uvicorn.run(Dispatcher(workers, host, port), host=host, port=port, log_config=None)
+            return
+
+        app = build_app(host, port, startup_profile)
+
+        # log_config=None: uvicorn 로그도 위의 큐 핸들러로 전달
+        if uds is not None:
+            uvicorn.run(app, uds=uds, log_config=None)
+        else:
+            uvicorn.run(app, host=host, port=port, log_config=None)
 
         logger.info(f"Starting server on {host}:{port}")
     except Exception as e:
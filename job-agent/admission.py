@@ -0,0 +1,200 @@
+"""
+Admission control for agent turns: a bounded, fair wait queue in front of
+the graph.
+
+- At most `max_concurrency` turns run at once (the model/tool work).
+- Turns of one contextId run one at a time (`max_per_context`), which also
+  keeps two turns from writing the same conversation concurrently.
+- Waiting turns are granted round-robin across contextIds, so a session
+  that queues many messages cannot starve the others.
+- The queue is bounded: past `max_queue` waiting turns (or
+  `max_queue_per_context` for one contextId) new turns fail fast, and a
+  turn that waits longer than `queue_timeout` gives up. Both raise
+  `Overloaded` with a Retry-After estimate and the HTTP status to answer
+  with (503 for global overload, 429 for one busy context).
+
+Requests answered without the graph (intent router, response cache) never
+enter the queue.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """The turn was not admitted."""
+
+    def __init__(self, reason: str, retry_after: int, status_code: int):
+        super().__init__(f"server busy ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class AdmissionController:
+    """Bounded, per-context fair queue in front of agent turns.
+
+    Args:
+        max_concurrency: Turns running at once.
+        max_queue: Turns waiting at once (0 = no waiting, reject when busy).
+        queue_timeout: Seconds a turn may wait for a slot.
+        max_per_context: Turns of one contextId running at once.
+        max_queue_per_context: Turns of one contextId waiting at once.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_queue: int = 64,
+        queue_timeout: float = 10.0,
+        max_per_context: int = 1,
+        max_queue_per_context: int = 4,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_per_context = max_per_context
+        self.max_queue_per_context = max_queue_per_context
+
+        self._running = 0
+        self._running_by_context: dict[str, int] = {}
+        # contextId -> waiters (futures), in round-robin order
+        self._waiting: "OrderedDict[str, deque[asyncio.Future]]" = OrderedDict()
+        self._queued = 0
+        # 평균 턴 처리 시간 (Retry-After 추정용, EWMA)
+        self._service_time = 1.0
+        self._counters = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_context_busy": 0, "rejected_timeout": 0}
+
+    @classmethod
+    def from_env(cls, max_concurrency: int | None = None) -> "AdmissionController":
+        return cls(
+            max_concurrency=max_concurrency or int(os.getenv("JOB_AGENT_MAX_CONCURRENCY", "8")),
+            max_queue=int(os.getenv("JOB_AGENT_MAX_QUEUE", "64")),
+            queue_timeout=float(os.getenv("JOB_AGENT_QUEUE_TIMEOUT", "10")),
+            max_queue_per_context=int(os.getenv("JOB_AGENT_MAX_QUEUE_PER_CONTEXT", "4")),
+        )
+
+    @asynccontextmanager
+    async def slot(self, context_id: str) -> AsyncIterator[None]:
+        """Hold a turn slot for `context_id`; raises `Overloaded` if not admitted."""
+        await self._acquire(context_id)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._service_time = 0.8 * self._service_time + 0.2 * (time.monotonic() - start)
+            self._release(context_id)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._counters,
+            "running": self._running,
+            "waiting": self._queued,
+            "waiting_contexts": len(self._waiting),
+            "service_time_seconds": self._service_time,
+        }
+
+    # --- internals --------------------------------------------------------------
+
+    def _can_run(self, context_id: str) -> bool:
+        return self._running < self.max_concurrency and self._running_by_context.get(context_id, 0) < self.max_per_context
+
+    async def _acquire(self, context_id: str) -> None:
+        # 대기 중인 턴이 없을 때만 바로 실행 (새 요청이 대기열을 앞지르지 않도록)
+        if not self._queued and self._can_run(context_id):
+            self._start(context_id)
+            metrics.observe("admission.wait", 0.0)
+            return
+
+        waiters = self._waiting.get(context_id)
+        if self._queued >= self.max_queue:
+            raise self._reject("queue_full", "rejected_queue_full", 503)
+        if waiters is not None and len(waiters) >= self.max_queue_per_context:
+            raise self._reject("context_busy", "rejected_context_busy", 429)
+
+        future = asyncio.get_running_loop().create_future()
+        if waiters is None:
+            waiters = self._waiting[context_id] = deque()
+        waiters.append(future)
+        self._queued += 1
+        self._counters["queued"] += 1
+        # 다른 컨텍스트 때문에 막힌 대기열이면 이 턴은 바로 실행될 수도 있음
+        self._dispatch()
+        queued_at = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # 타임아웃/취소 직전에 슬롯을 받았으면 반납
+                self._release(context_id)
+            else:
+                future.cancel()
+                self._forget(context_id, future)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject("queue_timeout", "rejected_timeout", 503) from None
+            raise
+        metrics.observe("admission.wait", time.monotonic() - queued_at)
+
+    def _start(self, context_id: str) -> None:
+        self._running += 1
+        self._running_by_context[context_id] = self._running_by_context.get(context_id, 0) + 1
+        self._counters["admitted"] += 1
+
+    def _release(self, context_id: str) -> None:
+        self._running -= 1
+        remaining = self._running_by_context.get(context_id, 1) - 1
+        if remaining > 0:
+            self._running_by_context[context_id] = remaining
+        else:
+            self._running_by_context.pop(context_id, None)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots round-robin over the contexts that have waiters."""
+        while self._queued and self._running < self.max_concurrency:
+            granted = False
+            for context_id in list(self._waiting):
+                if not self._can_run(context_id):
+                    continue
+                waiters = self._waiting.pop(context_id)
+                future = waiters.popleft()
+                self._queued -= 1
+                if waiters:
+                    # 다음 차례는 뒤로 (라운드 로빈)
+                    self._waiting[context_id] = waiters
+                self._start(context_id)
+                future.set_result(None)
+                granted = True
+                break
+            if not granted:
+                return
+
+    def _forget(self, context_id: str, future: asyncio.Future) -> None:
+        waiters = self._waiting.get(context_id)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(future)
+        except ValueError:
+            return
+        self._queued -= 1
+        if not waiters:
+            del self._waiting[context_id]
+
+    def _reject(self, reason: str, counter: str, status_code: int) -> Overloaded:
+        self._counters[counter] += 1
+        # 대기열이 빠지는 데 걸릴 예상 시간
+        backlog = (self._queued + 1) / max(self.max_concurrency, 1)
+        retry_after = max(1, math.ceil(backlog * self._service_time))
+        logger.warning("turn rejected (%s), retry after %ss", reason, retry_after)
+        return Overloaded(reason, retry_after, status_code)
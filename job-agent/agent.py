@@ -2,43 +2,52 @@
 Job Agent implemented with LangGraph and Vertex AI Gemini.
 """
 
-from langchain_google_vertexai import ChatVertexAI
-from langchain_core.tools import tool
-from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langchain_core.tools import StructuredTool, tool
 from pydantic import BaseModel
+import asyncio
+import contextlib
+import importlib.util
+import json
+import logging
 import uuid
 from dotenv import load_dotenv
 import os
-from typing import Any, List
+from typing import Any, AsyncIterator, List
 
-load_dotenv()
+from admission import AdmissionController
+from intent_router import IntentRouter, Route
+from job_models import JobSearchResult
+from model_tiers import ModelTier, TierRouter
+from registry import get_chat_model, get_checkpointer, get_job_index, get_mcp_tools, get_search_client
+from response_cache import ResponseCache, cache_namespace
+from startup_profile import startup
+from textutil import content_text
+from tool_runtime import ToolGuard
+from tracing import TracingCallbackHandler, tracer
 
-memory = MemorySaver()
+load_dotenv()
 
+logger = logging.getLogger(__name__)
 
-# LinkedIn API 연동 시 사용할 모델들 (향후 구현 예정)
-# class JobRecommendation(BaseModel):
-#     job_id: str
-#     title: str
-#     company: str
-#     location: str
-#     salary_range: str
-#     description: str
-#     requirements: list[str]
 
-# class JobSearchResult(BaseModel):
-#     search_id: str
-#     query: str
-#     recommendations: list[JobRecommendation]
-#     total_found: int
+def _format_job_results(result: JobSearchResult, note: str = "") -> str:
+    lines = [f"'{result.query}' 검색 결과 {result.total_found}건 중 상위 {len(result.recommendations)}건{note}:"]
+    for i, job in enumerate(result.recommendations, 1):
+        lines.append(f"{i}. {job.title} - {job.company} ({job.location}, {job.experience_level or '경력 무관'})")
+        if job.salary_range:
+            lines.append(f"   연봉: {job.salary_range}")
+        if job.requirements:
+            lines.append(f"   요구사항: {', '.join(job.requirements[:5])}")
+        if job.description:
+            lines.append(f"   {job.description[:200]}")
+    return "\n".join(lines)
 
 
 @tool
 def search_jobs(query: str, location: str = "Remote", experience_level: str = "Entry") -> str:
     """
-    Searches for job opportunities on LinkedIn based on the given criteria.
-    Note: LinkedIn API integration is planned for future implementation.
+    Searches the local job postings index based on the given criteria.
 
     Args:
         query: Job title or keywords to search for
@@ -46,31 +55,84 @@ def search_jobs(query: str, location: str = "Remote", experience_level: str = "E
         experience_level: Experience level (Entry, Mid, Senior)
 
     Returns:
-        str: A message about LinkedIn job search functionality.
+        str: The best matching job postings.
     """
     try:
-        # Check if user is asking for LinkedIn job search
-        linkedin_keywords = ["linkedin", "링크드인", "linkedin jobs", "linkedin에서", "linkedin으로"]
-        is_linkedin_request = any(keyword in query.lower() for keyword in linkedin_keywords)
-        
-        if is_linkedin_request:
-            return (
-                f"LinkedIn에서 '{query}' 관련 구직 검색을 요청하셨군요! "
-                "현재 LinkedIn API 연동 기능은 개발 중이며, 곧 실제 LinkedIn 구직 정보를 검색할 수 있도록 업데이트될 예정입니다. "
-                "지금은 커리어 조언이나 이력서 작성 팁 등 다른 도움을 드릴 수 있습니다."
-            )
-        else:
+        index = get_job_index()
+        if len(index) == 0:
+            # 공고 데이터가 없으면 기존 안내 메시지 유지 (JOB_AGENT_POSTINGS_PATH 미설정)
             return (
                 f"'{query}' 관련 구직 기회를 찾고 계시는군요! "
-                "현재 LinkedIn API 연동 기능은 개발 중이며, 곧 실제 구직 정보를 검색할 수 있도록 업데이트될 예정입니다. "
+                "현재 구직 정보 검색 기능은 준비 중이며, 곧 실제 구직 정보를 검색할 수 있도록 업데이트될 예정입니다. "
                 "지금은 커리어 조언, 이력서 작성 팁, 면접 준비 등 다른 도움을 드릴 수 있습니다."
             )
-        
+
+        result = index.search(query, location=location, experience_level=experience_level, limit=5)
+        if result.recommendations:
+            return _format_job_results(result)
+        # 조건에 맞는 공고가 없으면 지역/경력 조건 없이 다시 검색
+        result = index.search(query, limit=5)
+        if result.recommendations:
+            return _format_job_results(result, f" (지역 '{location}', 경력 '{experience_level}' 조건과 일치하는 공고가 없어 조건 없이 검색)")
+        return f"'{query}' 관련 채용 공고를 찾지 못했습니다. 다른 키워드로 검색해 보세요."
+
     except Exception as e:
-        print(f"Error in search_jobs: {e}")
+        logger.exception("search_jobs failed")
         return f"구직 검색 중 오류가 발생했습니다: {e}"
 
 
+def _web_search(query: str, count: int = 5) -> str:
+    """Perform a web search and return top results.
+
+    Args:
+        query: Search query string
+        count: Number of results to return (default 5)
+
+    Returns:
+        JSON string of [{title, href, body}]
+    """
+    # 모델에 넣기 전 ToolGuard의 compactor가 질문 기준으로 문장을 골라 줄임
+    # (MCP 서버의 web_search와 같은 형식)
+    return json.dumps(get_search_client().search(query, count), ensure_ascii=False)
+
+
+async def _aweb_search(query: str, count: int = 5) -> str:
+    return json.dumps(await get_search_client().asearch(query, count), ensure_ascii=False)
+
+
+# 공유 검색 클라이언트 사용 (세션 재사용, 결과 캐시, 동일 쿼리 병합, 타임아웃)
+# 실패/타임아웃은 ToolGuard가 대체 결과로 바꿔 모델에 전달
+web_search = StructuredTool.from_function(
+    func=_web_search,
+    coroutine=_aweb_search,
+    name="web_search",
+    parse_docstring=True,
+)
+
+
+# 취소된 턴을 대화 기록에서 닫을 때 남기는 응답
+CANCELLED_REPLY = "요청이 취소되었습니다."
+# 턴 마감 시간(JOB_AGENT_TURN_DEADLINE)을 넘긴 턴의 응답
+DEADLINE_REPLY = "응답 시간 한도를 초과했습니다. 질문을 조금 더 간단히 해서 다시 시도해 주세요."
+
+
+class _TurnExpired(Exception):
+    """The graph run passed the turn deadline."""
+
+
+@contextlib.asynccontextmanager
+async def _turn_deadline(when: float | None) -> AsyncIterator[None]:
+    """Raise `_TurnExpired` if the block is still running at loop time `when` (None: no limit)."""
+    timeout = asyncio.timeout_at(when)
+    try:
+        async with timeout:
+            yield
+    except TimeoutError:
+        if timeout.expired():
+            raise _TurnExpired from None
+        raise
+
+
 class JobAgent:
     SYSTEM_INSTRUCTION = """
 # 지침
@@ -106,99 +168,117 @@ class JobAgent:
  - 사용자가 LinkedIn(링크드인) 구직 검색을 요청하면, 현재 LinkedIn API 연동은 준비 중임을 명확히 알리고 대안을 제시하세요 (예: 역할/경력/지역을 기반으로 한 일반적 조언)
 """
     SUPPORTED_CONTENT_TYPES = ["text", "text/plain"]
-
-    def __init__(self):
-        self.model = ChatVertexAI(
-            model="gemini-2.5-flash-lite",
-            location=os.getenv("GOOGLE_CLOUD_LOCATION"),
-            project=os.getenv("GOOGLE_CLOUD_PROJECT"),
-            temperature=0,
-        )
+    def __init__(self, model=None, max_concurrency: int | None = None):
+        # 그래프 실행 앞단의 대기열 (동시 실행 수, 대기열 길이/시간 제한, contextId별 공정성)
+        self.admission = AdmissionController.from_env(max_concurrency)
+        # 프로세스 전역에서 공유하는 모델 클라이언트 (재시도/hedge/대체 모델 체인 포함, registry.get_chat_model)
+        self.model = model or get_chat_model()
         # Base tools
         tool_list: List[Any] = [search_jobs]
 
-        # Optionally load MCP tools from local web_search_server (no API key required)
-        # Since MCP client loading is async and complex, add direct web_search tool for now
-        try:
-            print("🔍 Adding web search tool...")
-            # Import the web search functionality directly
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            server_path = os.path.join(current_dir, "web_search_server.py")
-            print(f"📁 MCP server path: {server_path}")
-            print(f"📄 Server exists: {os.path.exists(server_path)}")
-            
-            if os.path.exists(server_path):
-                # Import duckduckgo search function directly
-                try:
-                    from ddgs import DDGS
-                    import json
-
-                    @tool
-                    def web_search(query: str, count: int = 5) -> str:
-                        """Perform a web search and return top results.
-
-                        Args:
-                            query: Search query string
-                            count: Number of results to return (default 5)
-
-                        Returns:
-                            String containing search results with titles and descriptions
-                        """
-                        try:
-                            results = []
-                            with DDGS() as ddgs:
-                                for r in ddgs.text(query, max_results=count):
-                                    results.append({
-                                        "title": r.get("title"),
-                                        "href": r.get("href"),
-                                        "body": r.get("body"),
-                                    })
-                            
-                            # Format results for better readability
-                            formatted = []
-                            for i, result in enumerate(results, 1):
-                                formatted.append(f"{i}. {result['title']}\n   URL: {result['href']}\n   Summary: {result['body'][:200]}...")
-                            
-                            return "\n\n".join(formatted)
-                        except Exception as e:
-                            return f"Search failed: {e}"
-
-                    tool_list.append(web_search)
-                    print("✅ Added direct web_search tool")
-                except ImportError:
-                    print("⚠️ ddgs package not available, skipping web search")
-        except Exception as e:
-            # If MCP libs are not available, proceed with built-in tools only
-            print(f"❌ Web search tool loading failed: {e}")
-            import traceback
-            traceback.print_exc()
-
-        self.tools = tool_list
-        self.graph = create_react_agent(
-            self.model,
-            tools=self.tools,
-            checkpointer=memory,
-            prompt=self.SYSTEM_INSTRUCTION,
+        # MCP 서버(JOB_AGENT_MCP_URL)의 도구는 서버 시작 시 비동기로 불러와 두고
+        # (registry.start_mcp_tools), 같은 이름의 내장 도구 대신 사용
+        remote_tools = get_mcp_tools()
+        remote_names = {t.name for t in remote_tools}
+        if "web_search" not in remote_names:
+            # ddgs itself is imported on the first search, not at startup.
+            if importlib.util.find_spec("ddgs") is not None:
+                tool_list.append(web_search)
+            else:
+                logger.warning("ddgs package not available, skipping web search")
+        tool_list = [t for t in tool_list if t.name not in remote_names] + remote_tools
+
+        # 도구별 타임아웃/대체 결과와 턴 전체 마감 시간 (JOB_AGENT_TOOL_TIMEOUTS, JOB_AGENT_TURN_DEADLINE)
+        self.tool_guard = ToolGuard.from_env()
+        self.tools = [self.tool_guard.wrap(t) for t in tool_list]
+        with startup.phase("import langgraph.prebuilt"):
+            from langgraph.prebuilt import create_react_agent
+
+            from history import HistoryTrimmer, JobAgentState
+
+        # 긴 대화에서 프롬프트 토큰을 예산 안으로 유지 (JOB_AGENT_HISTORY_TOKEN_BUDGET=0이면 비활성화)
+        self.history_trimmer = HistoryTrimmer.from_env()
+        checkpointer = get_checkpointer()
+
+        def compile_graph(chat_model):
+            return create_react_agent(
+                chat_model,
+                tools=self.tools,
+                checkpointer=checkpointer,
+                prompt=self.SYSTEM_INSTRUCTION,
+                pre_model_hook=self.history_trimmer,
+                state_schema=JobAgentState,
+                # v2: 한 스텝에서 요청된 도구 호출들을 각각 별도 태스크로 병렬 실행
+                version="v2",
+            )
+
+        with startup.phase("compile graph"):
+            self.graph = compile_graph(self.model)
+
+        # 질문 복잡도에 따라 턴마다 모델 티어 선택 (JOB_AGENT_MODEL_TIERS, 모델을 직접 넘긴 경우 단일 티어)
+        # 티어별 그래프는 시작 시 한 번 컴파일해 재사용하고, 체크포인터를 공유하므로 대화는 티어를 오갈 수 있음
+        model_name = str(getattr(self.model, "model_name", None) or type(self.model).__name__)
+        self.tier_router = TierRouter.from_env(model_name) if model is None else TierRouter([ModelTier("default", model_name)])
+        self._tier_graphs = {}
+        for tier in self.tier_router.tiers:
+            if tier.model == model_name:
+                self._tier_graphs[tier.name] = self.graph
+            else:
+                with startup.phase(f"compile graph ({tier.name} tier)"):
+                    self._tier_graphs[tier.name] = compile_graph(get_chat_model(tier.model))
+
+        # LLM 없이 처리 가능한 요청(LinkedIn 안내, 인사, 직접 공고 검색 등)을 그래프 전에 라우팅
+        self.intent_router = IntentRouter.from_env({t.name: t for t in self.tools})
+
+        self._tracing = TracingCallbackHandler()
+
+        # 첫 턴의 반복 질문 응답 캐시 (JOB_AGENT_RESPONSE_CACHE=1일 때만)
+        self.response_cache = ResponseCache.from_env()
+        # 네임스페이스는 기본 모델 기준: 다른 티어나 대체 모델이 만든 응답은 저장하지 않음 (_cache_put)
+        self._model_name = model_name
+        self._cache_namespace = cache_namespace(
+            self.SYSTEM_INSTRUCTION,
+            model_name,
         )
 
-    def invoke(self, query, sessionId) -> str:
-        # Early handling: If the user explicitly asks for LinkedIn job search, respond deterministically
+    def _turn_config(self, sessionId, query: str | None = None) -> dict[str, Any]:
+        # 턴 마감 시간, 도구 결과 압축용 사용자 질문 + 그래프 노드/모델/도구 span 기록용 콜백
+        config = {"configurable": {"thread_id": sessionId}, "callbacks": [self._tracing]}
+        return self.tool_guard.turn_config(config, query)
+
+    def _route(self, query) -> Route | None:
+        """Intent that settles `query` without the LLM (canned reply or direct tool call)."""
         try:
-            linkedin_keywords = ["linkedin", "링크드인", "linkedin jobs", "linkedin에서", "linkedin으로"]
-            if any(k in str(query).lower() for k in linkedin_keywords):
-                return (
-                    "LinkedIn 구직 검색 기능은 현재 API 연동 준비 중입니다. "
-                    "원하시면 직무/경력/지역 정보를 기반으로 일반적인 구직 전략, 이력서/자기소개서 개선, 면접 준비 팁을 제공해 드릴게요."
-                )
+            return self.intent_router.route(query)
         except Exception:
-            # Fall through to normal handling if any error occurs in the guard
-            pass
+            # Fall through to normal handling if any error occurs in the router
+            logger.exception("intent routing failed")
+            return None
 
-        config = {"configurable": {"thread_id": sessionId}}
-        
-        # LangGraph invoke를 통해 응답 생성
-        result = self.graph.invoke({"messages": [("user", query)]}, config)
-        
+    @staticmethod
+    def _user_turns(state) -> int:
+        return sum(1 for m in state.values.get("messages", []) if m.type == "human")
+
+    def _depth(self, config) -> int:
+        """User turns already in the thread (only read when caching or tiering needs it)."""
+        if self.response_cache is None and not self.tier_router.enabled:
+            return 0
+        return self._user_turns(self.graph.get_state(config))
+
+    async def _adepth(self, config) -> int:
+        if self.response_cache is None and not self.tier_router.enabled:
+            return 0
+        return self._user_turns(await self.graph.aget_state(config))
+
+    def _tier(self, query, depth: int):
+        """(tier, graph, span context) of the model tier chosen for this turn."""
+        tier, score, features = self.tier_router.choose(query, depth)
+        if not self.tier_router.enabled:
+            return tier, self._tier_graphs[tier.name], contextlib.nullcontext()
+        return tier, self._tier_graphs[tier.name], tracer.span(f"tier {tier.name}", model=tier.model, score=round(score, 3), **features)
+
+    @staticmethod
+    def _extract_reply(result) -> str:
         # 마지막 AI 메시지만 반환 (중복 방지)
         messages = result.get("messages", [])
         
@@ -213,4 +293,224 @@ class JobAgent:
             
         return "죄송합니다. 응답을 생성할 수 없습니다."
 
+    @staticmethod
+    def _cached_turn(query, reply) -> dict[str, Any]:
+        # 캐시/라우팅 응답도 대화 기록에 남겨 후속 질문이 맥락을 유지하도록 함
+        return {"messages": [HumanMessage(content=query), AIMessage(content=reply)]}
+
+    def _cache_put(self, query, reply, tier: ModelTier, messages) -> None:
+        """Cache a first-turn reply if the default model wrote all of it.
+
+        The cache namespace is keyed on the default model, so replies from
+        another tier or from a fallback model (``served_by``, see
+        `model_resilience`) are not stored under it.
+        """
+        if not isinstance(reply, str):
+            return
+        turn = messages[max((i for i, m in enumerate(messages) if m.type == "human"), default=-1) + 1:]
+        served_by = {m.response_metadata.get("served_by", self._model_name) for m in turn if m.type == "ai"}
+        if tier.model != self._model_name or served_by - {self._model_name}:
+            logger.debug("reply not cached: served by %s (tier %s)", sorted(served_by), tier.name)
+            return
+        self.response_cache.put(query, self._cache_namespace, reply)
+
+    def invoke(self, query, sessionId) -> str:
+        config = self._turn_config(sessionId, query)
+
+        route = self._route(query)
+        if route is not None:
+            reply = route.run()
+            self.graph.update_state(config, self._cached_turn(query, reply), as_node="agent")
+            return reply
+
+        # Cache only first turns: later answers depend on the conversation so far.
+        depth = self._depth(config)
+        cacheable = self.response_cache is not None and depth == 0
+        if cacheable:
+            cached = self.response_cache.get(query, self._cache_namespace)
+            if cached is not None:
+                self.graph.update_state(config, self._cached_turn(query, cached), as_node="agent")
+                return cached
+        
+        # LangGraph invoke를 통해 응답 생성 (질문 복잡도에 맞는 티어의 그래프)
+        # 동기 경로에서는 턴 마감 시간이 도구 호출에만 적용됨 (그래프 전체 제한은 ainvoke/astream)
+        tier, graph, tier_span = self._tier(query, depth)
+        with tier_span:
+            result = graph.invoke({"messages": [("user", query)]}, self.tool_guard.start_deadline(config))
+        reply = self._extract_reply(result)
+        if cacheable:
+            self._cache_put(query, reply, tier, result.get("messages", []))
+        return reply
+
+    async def _acached_reply(self, query, config) -> str | None:
+        cached = self.response_cache.get(query, self._cache_namespace)
+        if cached is not None:
+            await self.graph.aupdate_state(config, self._cached_turn(query, cached), as_node="agent")
+        return cached
+
+    async def ainvoke(self, query, sessionId) -> str:
+        """Async variant of `invoke` that never blocks the event loop.
+
+        Model calls go through the graph's async API and sync tools are run
+        in the default executor by LangGraph, so other requests keep being
+        served while a turn waits on Gemini. Turns go through the admission
+        queue (`admission.AdmissionController`), which raises `Overloaded`
+        when the server is too busy to take them. Once a turn has its slot,
+        the graph run (model and tool calls) is bounded by the turn
+        deadline; a turn that runs past it ends with `DEADLINE_REPLY`.
+        """
+        config = self._turn_config(sessionId, query)
+
+        route = self._route(query)
+        if route is not None:
+            reply = await route.arun()
+            await self.graph.aupdate_state(config, self._cached_turn(query, reply), as_node="agent")
+            return reply
+
+        depth = await self._adepth(config)
+        cacheable = self.response_cache is not None and depth == 0
+        if cacheable and (cached := await self._acached_reply(query, config)) is not None:
+            return cached
+
+        tier, graph, tier_span = self._tier(query, depth)
+        try:
+            async with self._cancellable(config), self.admission.slot(sessionId):
+                run_config, when = self._start_deadline(config)
+                # 검색이 필요해 보이는 질문은 첫 모델 호출과 동시에 web_search를 미리 시작
+                with tier_span, self.tool_guard.prefetch(run_config, query) as run_config:
+                    async with _turn_deadline(when):
+                        result = await graph.ainvoke({"messages": [("user", query)]}, run_config)
+        except _TurnExpired:
+            return await self._close_expired_turn(config)
+        reply = self._extract_reply(result)
+        if cacheable:
+            self._cache_put(query, reply, tier, result.get("messages", []))
+        return reply
+
+    def _start_deadline(self, config) -> tuple[dict[str, Any], float | None]:
+        """(run config, event loop time) of a turn deadline starting now; None when disabled."""
+        seconds = self.tool_guard.turn_deadline
+        when = asyncio.get_running_loop().time() + seconds if seconds > 0 else None
+        return self.tool_guard.start_deadline(config), when
+
+    async def _close_expired_turn(self, config) -> str:
+        logger.warning(
+            "turn exceeded its %gs deadline; closed thread %s",
+            self.tool_guard.turn_deadline, config["configurable"]["thread_id"],
+        )
+        await self._close_turn(config, DEADLINE_REPLY)
+        return DEADLINE_REPLY
+
+    @contextlib.asynccontextmanager
+    async def _cancellable(self, config) -> AsyncIterator[None]:
+        """Close the conversation properly if the turn is cancelled midway.
+
+        Cancelling the task stops the running model call and tool calls, but
+        the checkpoint may be left with the user message unanswered or with
+        tool calls that never got a result, which the next turn would choke
+        on. The turn is closed with a short "cancelled" reply instead.
+        """
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            # shield: 정리 작업은 추가 취소 요청이 와도 끝까지 실행
+            await asyncio.shield(self._close_turn(config, CANCELLED_REPLY))
+            raise
+
+    async def _close_turn(self, config, reply: str) -> None:
+        """End an interrupted turn in the checkpoint with `reply`."""
+        try:
+            state = await self.graph.aget_state(config)
+            messages = state.values.get("messages", [])
+            if not messages:
+                return
+            last = messages[-1]
+            if last.type == "ai" and not getattr(last, "tool_calls", None):
+                return  # 이전 턴이 정상 종료된 상태 (이번 턴은 시작 전 취소)
+
+            answered = {m.tool_call_id for m in messages if m.type == "tool"}
+            patch: list[Any] = [
+                ToolMessage(content="요청이 취소되어 실행하지 않았습니다.", tool_call_id=call["id"], name=call["name"])
+                for msg in messages
+                for call in (getattr(msg, "tool_calls", None) or [])
+                if call["id"] not in answered
+            ]
+            patch.append(AIMessage(content=reply))
+            await self.graph.aupdate_state(config, {"messages": patch}, as_node="agent")
+            logger.info("turn interrupted; closed thread %s", config["configurable"]["thread_id"])
+        except Exception:
+            logger.exception("failed to close interrupted turn")
+
+    async def astream(self, query, sessionId) -> AsyncIterator[dict[str, Any]]:
+        """Stream a turn as it runs.
+
+        Yields dicts with a ``type`` key:
+          - ``token``: partial model text (``content``)
+          - ``tool_call``: the model requested a tool (``name``, ``args``)
+          - ``tool_result``: a tool finished (``name``)
+          - ``final``: the complete reply (``content``), always last
+        """
+        config = self._turn_config(sessionId, query)
+
+        route = self._route(query)
+        if route is not None:
+            if route.tool is not None:
+                yield {"type": "tool_call", "name": route.tool.name, "args": route.args}
+            reply = await route.arun()
+            if route.tool is not None:
+                yield {"type": "tool_result", "name": route.tool.name}
+            await self.graph.aupdate_state(config, self._cached_turn(query, reply), as_node="agent")
+            yield {"type": "final", "content": reply}
+            return
+        depth = await self._adepth(config)
+        cacheable = self.response_cache is not None and depth == 0
+        if cacheable and (cached := await self._acached_reply(query, config)) is not None:
+            yield {"type": "final", "content": cached}
+            return
+
+        final_messages: list[Any] = []
+        # 이번 턴에 그래프가 추가한 메시지 전부 (도구 호출 단계 포함; 캐시 저장 여부 판단용)
+        turn_messages: list[Any] = []
+
+        tier, graph, tier_span = self._tier(query, depth)
+        try:
+            async with self._cancellable(config), self.admission.slot(sessionId):
+                run_config, when = self._start_deadline(config)
+                with tier_span, self.tool_guard.prefetch(run_config, query) as run_config:
+                    stream = graph.astream({"messages": [("user", query)]}, run_config, stream_mode=["messages", "updates"])
+                    async with contextlib.aclosing(stream):
+                        while True:
+                            # 마감은 절대 시각 기준: 그래프의 다음 단계를 기다리는 동안만 취소 (yield 중에는 취소하지 않음)
+                            async with _turn_deadline(when):
+                                item = await anext(stream, None)
+                            if item is None:
+                                break
+                            mode, chunk = item
+                            if mode == "messages":
+                                message, metadata = chunk
+                                if metadata.get("langgraph_node") != "agent" or not isinstance(message, AIMessageChunk):
+                                    continue
+                                text = content_text(message.content)
+                                if text:
+                                    yield {"type": "token", "content": text}
+                                continue
+
+                            # mode == "updates": one entry per finished node
+                            for update in chunk.values():
+                                for msg in (update or {}).get("messages", []):
+                                    turn_messages.append(msg)
+                                    if getattr(msg, "tool_calls", None):
+                                        for call in msg.tool_calls:
+                                            yield {"type": "tool_call", "name": call["name"], "args": call["args"]}
+                                    elif msg.type == "tool":
+                                        yield {"type": "tool_result", "name": msg.name}
+                                    elif msg.type == "ai":
+                                        final_messages.append(msg)
+        except _TurnExpired:
+            yield {"type": "final", "content": await self._close_expired_turn(config)}
+            return
 
+        reply = self._extract_reply({"messages": final_messages})
+        if cacheable:
+            self._cache_put(query, reply, tier, turn_messages)
+        yield {"type": "final", "content": reply}
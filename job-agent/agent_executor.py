@@ -4,25 +4,49 @@ Agent executor wiring JobAgent to the A2A server.
 
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
+from a2a.server.tasks import TaskUpdater
 from a2a.types import (
     Part,
     Task,
+    TaskState,
     TextPart,
-    UnsupportedOperationError,
 )
 from a2a.utils import (
-    completed_task,
-    new_artifact,
+    new_agent_text_message,
+    new_task,
 )
 from a2a.utils.errors import ServerError
-from agent import JobAgent
+import asyncio
+import logging
+
+from admission import Overloaded
+from registry import get_agent
+from textutil import content_text
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# 취소 요청 후 실행 중인 턴이 정리될 때까지 기다리는 최대 시간 (초)
+CANCEL_GRACE_SECONDS = 5.0
+
+# 토큰을 이 길이만큼 모아서 하나의 artifact chunk로 전송 (첫 토큰은 즉시 전송)
+STREAM_CHUNK_CHARS = 64
 
 
 class JobAgentExecutor(AgentExecutor):
     """Job Agent Executor."""
 
-    def __init__(self):
-        self.agent = JobAgent()
+    def __init__(self, agent=None):
+        self._agent = agent
+        # task_id -> 실행 중인 턴; cancel()에서 사용
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    @property
+    def agent(self):
+        # 공유 JobAgent는 첫 요청(또는 startup prewarm) 시점에 생성
+        if self._agent is None:
+            self._agent = get_agent()
+        return self._agent
 
     async def execute(
         self,
@@ -30,26 +54,121 @@ class JobAgentExecutor(AgentExecutor):
         event_queue: EventQueue,
     ) -> None:
         query = context.get_user_input()
+        task = context.current_task
+        if not task:
+            task = new_task(context.message)
+            await event_queue.enqueue_event(task)
+        updater = TaskUpdater(event_queue, task.id, task.context_id)
+        artifact_id = f"job_{task.id}"
+
+        with tracer.span("a2a.execute", task_id=task.id, context_id=task.context_id):
+            # 턴을 별도 task로 실행해 cancel()이 모델/도구 호출까지 중단할 수 있게 함
+            work = asyncio.create_task(self._run(query, task, updater, artifact_id))
+            self._inflight[task.id] = work
+            try:
+                await work
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise  # execute 자체가 취소된 경우 (서버 종료 등)
+                # tasks/cancel로 중단됨; canceled 상태는 _run에서 전송
+                logger.info("task %s cancelled", task.id)
+            finally:
+                self._inflight.pop(task.id, None)
+
+    async def _run(self, query: str, task: Task, updater: TaskUpdater, artifact_id: str) -> None:
         try:
-            result = self.agent.invoke(query, context.context_id)
-            print(f"Final Result ===> {result}")
-
-            parts = [Part(root=TextPart(text=str(result)))]
-            await event_queue.enqueue_event(
-                completed_task(
-                    context.task_id,
-                    context.context_id,
-                    [new_artifact(parts, f"job_{context.task_id}")],
-                    [context.message],
-                )
+            await updater.start_work()
+
+            buffer = ""
+            streamed = ""
+            chunks_sent = 0
+            final_text = ""
+            async for event in self.agent.astream(query, task.context_id):
+                kind = event["type"]
+                if kind == "token":
+                    buffer += event["content"]
+                    if chunks_sent == 0 or len(buffer) >= STREAM_CHUNK_CHARS:
+                        await self._send_chunk(updater, artifact_id, buffer, append=chunks_sent > 0)
+                        chunks_sent += 1
+                        streamed += buffer
+                        buffer = ""
+                elif kind == "tool_call":
+                    await updater.update_status(
+                        TaskState.working,
+                        new_agent_text_message(f"{event['name']} 도구 실행 중...", task.context_id, task.id),
+                    )
+                elif kind == "final":
+                    final_text = content_text(event["content"])
+
+            logger.info("task %s completed (%d chars, %d chunks)", task.id, len(final_text), chunks_sent + 1)
+            logger.debug("Final Result ===> %s", final_text)
+
+            if chunks_sent and streamed + buffer == final_text:
+                # 남은 토큰을 보내고 artifact를 닫음
+                await self._send_chunk(updater, artifact_id, buffer, append=True, last_chunk=True)
+            else:
+                # 스트리밍된 토큰이 없거나 (예: 결정적 응답), 최종 응답과 다른 경우 (도구 호출 전 모델이
+                # 낸 텍스트, 마감 시간 초과 등) 전체 응답으로 artifact를 교체
+                await self._send_chunk(updater, artifact_id, final_text, append=False, last_chunk=True)
+            await updater.complete()
+        except asyncio.CancelledError:
+            # 큐가 닫히기 전에 (execute가 끝나기 전에) canceled 상태 전송
+            await updater.cancel(new_agent_text_message("요청이 취소되었습니다.", task.context_id, task.id))
+            raise
+        except Overloaded as e:
+            # 대기열 초과: 재시도 시점을 알려주고 rejected로 종료
+            await updater.update_status(
+                TaskState.rejected,
+                new_agent_text_message(
+                    f"요청이 많아 지금은 처리할 수 없습니다. {e.retry_after}초 후 다시 시도해 주세요.",
+                    task.context_id,
+                    task.id,
+                ),
+                final=True,
+                metadata={"reason": e.reason, "retryAfter": e.retry_after},
             )
         except Exception as e:
-            print("Error invoking agent: %s", e)
+            logger.exception("Error invoking agent: %s", e)
             raise ServerError(error=ValueError(f"Error invoking agent: {e}")) from e
 
+    @staticmethod
+    async def _send_chunk(
+        updater: TaskUpdater,
+        artifact_id: str,
+        text: str,
+        append: bool,
+        last_chunk: bool = False,
+    ) -> None:
+        await updater.add_artifact(
+            [Part(root=TextPart(text=text))],
+            artifact_id=artifact_id,
+            name=artifact_id,
+            append=append,
+            last_chunk=last_chunk,
+        )
+
     async def cancel(
         self, request: RequestContext, event_queue: EventQueue
     ) -> Task | None:
-        raise ServerError(error=UnsupportedOperationError())
-
+        """Stop the task's in-flight turn and mark the task canceled.
 
+        The running model call and tool calls are cancelled, and the
+        conversation is closed with a "cancelled" reply (see
+        `JobAgent._cancellable`), so the next message on the same contextId
+        continues normally.
+        """
+        task_id = request.task_id
+        with tracer.span("a2a.cancel", task_id=task_id, context_id=request.context_id):
+            work = self._inflight.get(task_id)
+            if work is None:
+                # 이 프로세스에서 실행 중이 아님 (대기 중이거나 이미 끝남)
+                updater = TaskUpdater(event_queue, task_id, request.context_id)
+                await updater.cancel(new_agent_text_message("요청이 취소되었습니다.", request.context_id, task_id))
+            else:
+                # 턴을 취소하고, 체크포인트 정리와 canceled 상태 전송이 끝날 때까지 대기
+                work.cancel()
+                done, _ = await asyncio.wait({work}, timeout=CANCEL_GRACE_SECONDS)
+                if not done:
+                    logger.warning("task %s did not stop within %ss", task_id, CANCEL_GRACE_SECONDS)
+        logger.info("task %s cancel requested (in flight: %s)", task_id, work is not None)
+        return None
@@ -0,0 +1,312 @@
+"""
+Offline batch runner: pushes a JSONL file of recorded questions through
+`JobAgent` in-process, for quality and cost reviews.
+
+Input, one JSON object per line:
+  {"id": "q-1", "sessionId": "s-1", "query": "이력서 팁을 알려주세요"}
+("text" is accepted for "query" and "contextId" for "sessionId"; "id"
+defaults to the line number and "sessionId" to a fresh id per line.)
+
+- The file is read as a stream; at most `--window` items are held at once.
+- `--concurrency` turns run at a time and `--rate` caps turns per second.
+  Turns of one sessionId run one after another in file order, so recorded
+  multi-turn conversations replay as conversations.
+- Each result is appended to `--output` as soon as it finishes (completion
+  order, with the input line number). The output doubles as the checkpoint:
+  rerunning with the same output skips every id already answered (and
+  retries earlier errors with `--retry-errors`). Conversations resume
+  from their history only with a persistent JOB_AGENT_STATE_BACKEND.
+- Every result carries its latency and token usage. A summary (throughput,
+  latency percentiles, token totals per model) is printed at the end, or
+  written to `--report`.
+
+Usage:
+  python batch.py questions.jsonl --output answers.jsonl --concurrency 8 --rate 5
+  python batch.py questions.jsonl --output answers.jsonl --fake-model   # no Vertex AI / DuckDuckGo
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from benchmark import percentiles
+
+logger = logging.getLogger("batch")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a JSONL file of queries through the Job Agent")
+    parser.add_argument("input", help="JSONL file of {id, sessionId, query}")
+    parser.add_argument("--output", required=True, help="JSONL results; also the resume checkpoint")
+    parser.add_argument("--concurrency", type=int, default=8, help="Turns running at once")
+    parser.add_argument("--rate", type=float, default=0.0, help="Max turns started per second (0 = unlimited)")
+    parser.add_argument("--window", type=int, default=0, help="Items held in memory at once (default 4 x concurrency)")
+    parser.add_argument("--retries", type=int, default=2, help="Retries per item on errors or overload")
+    parser.add_argument("--retry-errors", action="store_true", help="Rerun items whose earlier result was an error")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many input lines (0 = all)")
+    parser.add_argument("--fake-model", action="store_true", help="Use the deterministic fake model and web search")
+    parser.add_argument("--model", help="Model name (overrides JOB_AGENT_MODEL)")
+    parser.add_argument("--report", help="Write the JSON summary here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def configure_env(args: argparse.Namespace) -> None:
+    """Model selection and limits; must run before the app modules are imported."""
+    if args.fake_model:
+        os.environ["JOB_AGENT_MODEL"] = "fake"
+        os.environ.setdefault("JOB_AGENT_SEARCH_BACKEND", "fake")
+    elif args.model:
+        os.environ["JOB_AGENT_MODEL"] = args.model
+    # 배치 자체가 동시 실행 수를 제한하므로 에이전트 대기열에서 거절되지 않도록 맞춤
+    os.environ.setdefault("JOB_AGENT_MAX_CONCURRENCY", str(args.concurrency))
+    os.environ.setdefault("JOB_AGENT_LOG_LEVEL", "WARNING")
+
+
+# --- input / checkpoint -------------------------------------------------------
+
+
+def read_items(path: str, limit: int = 0) -> Iterator[dict[str, Any]]:
+    """Input items as a stream; malformed lines are yielded with an ``error``."""
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if limit and line_no > limit:
+                return
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                query = record.get("query") or record.get("text")
+                if not isinstance(query, str) or not query.strip():
+                    raise ValueError("missing query")
+            except (ValueError, AttributeError) as e:
+                yield {"id": str(line_no), "line": line_no, "error": f"bad input line: {e}"}
+                continue
+            yield {
+                "id": str(record.get("id", line_no)),
+                "line": line_no,
+                "session_id": str(record.get("sessionId") or record.get("contextId") or f"batch-{uuid.uuid4()}"),
+                "query": query.strip(),
+            }
+
+
+def load_checkpoint(path: str, retry_errors: bool) -> set[str]:
+    """Ids already answered in `path`; drops a torn last line left by a crash."""
+    done: set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            # 기록 도중 중단된 마지막 줄은 잘라내고 다시 실행
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[: data.rfind(b"\n") + 1]
+    for line in data.splitlines():
+        try:
+            result = json.loads(line)
+        except ValueError:
+            continue
+        if result.get("status") == "ok" or not retry_errors:
+            done.add(str(result.get("id")))
+    return done
+
+
+# --- pacing -------------------------------------------------------------------
+
+
+class RateLimiter:
+    """Evenly spaced starts: at most `rate` acquisitions per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+# 항목별 토큰 사용량 수집용 콜백 (항목 task마다 새 핸들러를 설정, 그래프 전체에 상속됨)
+_usage_handler: ContextVar[Any] = ContextVar("job_agent_batch_usage", default=None)
+
+
+def _register_usage_hook() -> None:
+    from langchain_core.tracers.context import register_configure_hook
+
+    register_configure_hook(_usage_handler, inheritable=True)
+
+
+def _usage_totals(usage_by_model: dict[str, dict[str, Any]]) -> dict[str, int]:
+    totals = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    for usage in usage_by_model.values():
+        for key in totals:
+            totals[key] += int(usage.get(key, 0) or 0)
+    return totals
+
+
+# --- runner -------------------------------------------------------------------
+
+
+class BatchRunner:
+    def __init__(self, agent, args: argparse.Namespace, done: set[str], out):
+        self.agent = agent
+        self.args = args
+        self.done = done
+        self.out = out
+        self.workers = asyncio.Semaphore(args.concurrency)
+        self.window = asyncio.Semaphore(args.window or 4 * args.concurrency)
+        self.limiter = RateLimiter(args.rate)
+        # sessionId -> 같은 세션의 직전 항목이 끝나면 set되는 이벤트
+        self._session_tail: dict[str, asyncio.Event] = {}
+        self.latencies: list[float] = []
+        self.usage_by_model: dict[str, dict[str, int]] = {}
+        self.counts = {"ok": 0, "error": 0, "skipped": 0}
+
+    async def run(self) -> None:
+        tasks: set[asyncio.Task] = set()
+        for item in read_items(self.args.input, self.args.limit):
+            if item["id"] in self.done:
+                self.counts["skipped"] += 1
+                continue
+            await self.window.acquire()
+            previous = self._session_tail.get(item.get("session_id"))
+            finished = asyncio.Event()
+            if "session_id" in item:
+                self._session_tail[item["session_id"]] = finished
+            task = asyncio.create_task(self._run_item(item, previous, finished))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def _run_item(self, item: dict[str, Any], previous: asyncio.Event | None, finished: asyncio.Event) -> None:
+        try:
+            if "error" in item:
+                self._write({**item, "status": "error"})
+                return
+            if previous is not None:
+                await previous.wait()
+            async with self.workers:
+                await self.limiter.acquire()
+                self._write(await self._answer(item))
+        finally:
+            finished.set()
+            if self._session_tail.get(item.get("session_id")) is finished:
+                del self._session_tail[item["session_id"]]
+            self.window.release()
+
+    async def _answer(self, item: dict[str, Any]) -> dict[str, Any]:
+        from admission import Overloaded
+        from langchain_core.callbacks import UsageMetadataCallbackHandler
+
+        result = {"id": item["id"], "line": item["line"], "sessionId": item["session_id"], "query": item["query"]}
+        usage = UsageMetadataCallbackHandler()
+        _usage_handler.set(usage)
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                reply = await self.agent.ainvoke(item["query"], item["session_id"])
+                result.update(status="ok", reply=reply)
+                break
+            except Overloaded as e:
+                if attempt > self.args.retries:
+                    result.update(status="error", error=str(e))
+                    break
+                await asyncio.sleep(e.retry_after)
+            except Exception as e:
+                if attempt > self.args.retries:
+                    result.update(status="error", error=f"{type(e).__name__}: {e}")
+                    break
+                await asyncio.sleep(min(10.0, 0.5 * 2 ** attempt))
+        latency = time.perf_counter() - start
+
+        usage_by_model = {model: dict(u) for model, u in usage.usage_metadata.items()}
+        result.update(
+            latency_seconds=round(latency, 4),
+            attempts=attempt,
+            tokens=_usage_totals(usage_by_model),
+            tokens_by_model={m: {k: u.get(k, 0) for k in ("input_tokens", "output_tokens", "total_tokens")} for m, u in usage_by_model.items()},
+        )
+        if result["status"] == "ok":
+            self.latencies.append(latency)
+        for model, u in result["tokens_by_model"].items():
+            totals = self.usage_by_model.setdefault(model, {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0})
+            for key in totals:
+                totals[key] += u[key]
+        return result
+
+    def _write(self, result: dict[str, Any]) -> None:
+        # 한 줄씩 바로 기록 (중단되어도 이미 끝난 항목은 다음 실행에서 건너뜀)
+        self.out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.out.flush()
+        self.counts["ok" if result.get("status") == "ok" else "error"] += 1
+        completed = self.counts["ok"] + self.counts["error"]
+        if completed % 100 == 0:
+            logger.warning("%d items done (%d errors)", completed, self.counts["error"])
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    import registry
+    from log_config import configure_logging
+
+    configure_logging()
+    _register_usage_hook()
+    done = load_checkpoint(args.output, args.retry_errors)
+    # MCP 도구 세션은 이 이벤트 루프에 열어야 함 (JOB_AGENT_MCP_URL 설정 시)
+    await registry.start_mcp_tools()
+    agent = await asyncio.to_thread(registry.get_agent)
+
+    start = time.perf_counter()
+    try:
+        with open(args.output, "a", encoding="utf-8") as out:
+            runner = BatchRunner(agent, args, done, out)
+            await runner.run()
+    finally:
+        await registry.stop_mcp_tools()
+    elapsed = time.perf_counter() - start
+
+    completed = runner.counts["ok"] + runner.counts["error"]
+    return {
+        "input": args.input,
+        "output": args.output,
+        "model": os.getenv("JOB_AGENT_MODEL", registry.DEFAULT_MODEL),
+        "items": {**runner.counts, "resumed_from_checkpoint": len(done)},
+        "elapsed_seconds": elapsed,
+        "items_per_second": completed / elapsed if elapsed else 0.0,
+        "latency_seconds": percentiles(runner.latencies),
+        "tokens": _usage_totals(runner.usage_by_model),
+        "tokens_by_model": runner.usage_by_model,
+    }
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    configure_env(args)
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if report["items"]["error"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
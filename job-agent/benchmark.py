@@ -0,0 +1,310 @@
+"""
+Offline load test for the Job Agent.
+
+Serves the real app in-process (uvicorn on a free local port) with the
+Gemini model and DuckDuckGo replaced by deterministic fakes, then drives N
+concurrent sessions against the A2A endpoint (`message/send`) and/or
+`/chat` through one pooled `httpx.AsyncClient`. Every session sends
+`--turns` messages on its own contextId, one after another.
+
+The report is JSON (stdout or --output), so runs can be diffed between
+releases:
+  - requests/sec, latency percentiles and errors per endpoint
+  - RSS growth per session (and Python heap growth with --tracemalloc)
+  - event-loop lag (how late a 10 ms timer fires while under load)
+  - the server's own /metrics latency summary
+
+Usage:
+  python benchmark.py --sessions 50 --turns 3
+  python benchmark.py --mode chat --model-latency 0.5 --tool-calls --output bench.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from typing import Any
+
+QUERIES = [
+    "이력서를 어떻게 개선하면 좋을까요?",
+    "백엔드 개발자로 이직하려면 무엇을 준비해야 하나요?",
+    "면접에서 자주 나오는 질문과 답변 팁을 알려주세요.",
+    "연봉 협상은 언제, 어떻게 시작하는 게 좋을까요?",
+    "데이터 엔지니어 커리어 로드맵이 궁금해요.",
+    "How should I prepare for a product manager interview?",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline load test for the Job Agent (fake model and search)")
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent sessions per endpoint")
+    parser.add_argument("--turns", type=int, default=3, help="Messages per session")
+    parser.add_argument("--mode", choices=["a2a", "chat", "both"], default="both")
+    parser.add_argument("--model-latency", type=float, default=0.2, help="Fake model seconds per call")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="Fake web search seconds per call")
+    parser.add_argument("--tool-calls", action="store_true", help="Fake model calls web_search/search_jobs every turn")
+    parser.add_argument("--no-compaction", action="store_true", help="Pass tool results to the model uncompacted")
+    parser.add_argument("--connections", type=int, default=100, help="httpx connection pool size")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also measure Python heap growth (slower)")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    return parser.parse_args()
+
+
+def configure_env(args: argparse.Namespace) -> None:
+    """Select the fakes; must run before the app modules are imported."""
+    os.environ["JOB_AGENT_MODEL"] = "fake"
+    os.environ["JOB_AGENT_FAKE_LATENCY"] = str(args.model_latency)
+    os.environ["JOB_AGENT_FAKE_TOOL_CALLS"] = "1" if args.tool_calls else "0"
+    os.environ["JOB_AGENT_SEARCH_BACKEND"] = "fake"
+    os.environ["JOB_AGENT_FAKE_SEARCH_LATENCY"] = str(args.search_latency)
+    os.environ["JOB_AGENT_TOOL_COMPACTION"] = "0" if args.no_compaction else "1"
+    os.environ.setdefault("JOB_AGENT_LOG_LEVEL", "WARNING")
+
+
+# --- measurements -------------------------------------------------------------
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def rank(q: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+    return {
+        "min": ordered[0],
+        "mean": sum(ordered) / len(ordered),
+        "p50": rank(0.50),
+        "p90": rank(0.90),
+        "p95": rank(0.95),
+        "p99": rank(0.99),
+        "max": ordered[-1],
+    }
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # peak RSS (KiB on Linux, bytes on macOS) where /proc is unavailable
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic timer fires on the running event loop."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - start - self.interval))
+
+    def __enter__(self) -> "LoopLagMonitor":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._task.cancel()
+
+
+# --- sessions -----------------------------------------------------------------
+
+
+async def a2a_turn(client, text: str, context_id: str) -> bool:
+    payload = {
+        "jsonrpc": "2.0",
+        "id": str(uuid.uuid4()),
+        "method": "message/send",
+        "params": {
+            "message": {
+                "role": "user",
+                "messageId": str(uuid.uuid4()),
+                "contextId": context_id,
+                "parts": [{"kind": "text", "text": text}],
+            }
+        },
+    }
+    response = await client.post("/", json=payload)
+    if response.status_code != 200:
+        return False
+    result = response.json().get("result") or {}
+    return (result.get("status") or {}).get("state") == "completed"
+
+
+async def chat_turn(client, text: str, context_id: str) -> bool:
+    response = await client.post("/chat", json={"text": text, "contextId": context_id})
+    return response.status_code == 200 and "reply" in response.json()
+
+
+async def run_session(client, turn, index: int, turns: int, latencies: list[float], errors: list[str]) -> None:
+    context_id = f"bench-{uuid.uuid4()}"
+    for t in range(turns):
+        text = QUERIES[(index + t) % len(QUERIES)]
+        start = time.perf_counter()
+        try:
+            ok = await turn(client, text, context_id)
+        except Exception as e:
+            ok = False
+            errors.append(type(e).__name__)
+        else:
+            if not ok:
+                errors.append("bad_response")
+        if ok:
+            latencies.append(time.perf_counter() - start)
+
+
+async def run_endpoint(client, name: str, args: argparse.Namespace) -> dict[str, Any]:
+    turn = a2a_turn if name == "a2a" else chat_turn
+    latencies: list[float] = []
+    errors: list[str] = []
+
+    gc.collect()
+    rss_before = rss_bytes()
+    heap_before = tracemalloc.get_traced_memory()[0] if args.tracemalloc else 0
+
+    with LoopLagMonitor() as lag:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(run_session(client, turn, i, args.turns, latencies, errors) for i in range(args.sessions))
+        )
+        elapsed = time.perf_counter() - start
+
+    gc.collect()
+    rss_growth = rss_bytes() - rss_before
+    result = {
+        "requests": args.sessions * args.turns,
+        "ok": len(latencies),
+        "errors": len(errors),
+        "error_kinds": {kind: errors.count(kind) for kind in sorted(set(errors))},
+        "elapsed_seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_seconds": percentiles(latencies),
+        "memory": {
+            "rss_growth_bytes": rss_growth,
+            "rss_growth_per_session_bytes": rss_growth / args.sessions,
+        },
+        "event_loop_lag_seconds": percentiles(lag.lags),
+    }
+    if args.tracemalloc:
+        heap_growth = tracemalloc.get_traced_memory()[0] - heap_before
+        result["memory"]["heap_growth_bytes"] = heap_growth
+        result["memory"]["heap_growth_per_session_bytes"] = heap_growth / args.sessions
+    return result
+
+
+# --- in-process server --------------------------------------------------------
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    import httpx
+    import uvicorn
+
+    from log_config import configure_logging
+    from server import build_app
+
+    configure_logging()
+    port = free_port()
+    app = build_app("127.0.0.1", port)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_config=None, lifespan="on"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        if serve_task.done():
+            serve_task.result()
+        await asyncio.sleep(0.01)
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    endpoints = ["a2a", "chat"] if args.mode == "both" else [args.mode]
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    results: dict[str, Any] = {}
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=args.timeout) as client:
+            # one warm-up turn per endpoint so lazy imports are not measured
+            for name in endpoints:
+                await (a2a_turn if name == "a2a" else chat_turn)(client, QUERIES[0], f"warmup-{name}")
+            for name in endpoints:
+                results[name] = await run_endpoint(client, name, args)
+            server_metrics = (await client.get("/metrics")).json()
+    finally:
+        server.should_exit = True
+        await serve_task
+        if args.tracemalloc:
+            tracemalloc.stop()
+
+    return {
+        "config": {
+            "sessions": args.sessions,
+            "turns": args.turns,
+            "mode": args.mode,
+            "model_latency": args.model_latency,
+            "search_latency": args.search_latency,
+            "tool_calls": args.tool_calls,
+            "tool_compaction": not args.no_compaction,
+            "connections": args.connections,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "git_revision": git_revision(),
+        },
+        "results": results,
+        "server_latency_seconds": {
+            name: {k: v for k, v in summary.items() if k != "buckets"}
+            for name, summary in server_metrics.get("latency_seconds", {}).items()
+        },
+        "server_components": server_metrics.get("components", {}),
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    configure_env(args)
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Bounded in-memory checkpointer for conversation state.
+
+`MemorySaver` keeps every thread forever, so each new `contextId` grows the
+process until Cloud Run kills it. `BoundedMemorySaver` keeps the same
+storage layout but evicts whole threads by least-recent use once a thread
+count or byte budget is exceeded, and drops threads that have been idle
+longer than a TTL.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import MemorySaver
+
+logger = logging.getLogger(__name__)
+
+
+def _typed_size(value: tuple[str, bytes]) -> int:
+    """Size of a `serde.dumps_typed` result."""
+    type_, data = value
+    return len(type_) + len(data)
+
+
+class BoundedMemorySaver(MemorySaver):
+    """`MemorySaver` with LRU + idle-TTL eviction of whole threads.
+
+    Args:
+        max_threads: Maximum number of threads kept in memory (0 = unlimited).
+        max_bytes: Maximum serialized size of all threads (0 = unlimited).
+        ttl_seconds: Threads idle longer than this are dropped (0 = never).
+    """
+
+    def __init__(self, max_threads: int = 1000, max_bytes: int = 256 * 1024 * 1024, ttl_seconds: float = 3600):
+        super().__init__()
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.RLock()
+        # thread_id -> last access (monotonic), oldest first
+        self._lru: "OrderedDict[str, float]" = OrderedDict()
+        self._thread_bytes: dict[str, int] = {}
+        self._blob_keys: dict[str, set[tuple]] = {}
+        self._total_bytes = 0
+        self._evictions = {"threads": 0, "bytes": 0, "idle": 0}
+
+    @classmethod
+    def from_env(cls) -> "BoundedMemorySaver":
+        return cls(
+            max_threads=int(os.getenv("JOB_AGENT_MEMORY_MAX_THREADS", "1000")),
+            max_bytes=int(os.getenv("JOB_AGENT_MEMORY_MAX_BYTES", str(256 * 1024 * 1024))),
+            ttl_seconds=float(os.getenv("JOB_AGENT_MEMORY_TTL_SECONDS", "3600")),
+        )
+
+    # --- checkpointer API -------------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._evict_idle(time.monotonic())
+            if thread_id not in self._lru:
+                # MemorySaver's defaultdicts would otherwise keep an empty entry per lookup
+                self.storage.pop(thread_id, None)
+                return None
+            self._touch(thread_id)
+            return super().get_tuple(config)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+
+            added = 0
+            blob_keys = self._blob_keys.setdefault(thread_id, set())
+            for channel, version in new_versions.items():
+                key = (thread_id, checkpoint_ns, channel, version)
+                if key not in blob_keys:
+                    blob_keys.add(key)
+                    added += _typed_size(self.blobs[key])
+            saved_checkpoint, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            added += _typed_size(saved_checkpoint) + _typed_size(saved_metadata)
+
+            self._account(thread_id, added)
+            self._touch(thread_id)
+            self._enforce_limits(thread_id)
+            return next_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        outer_key = (
+            thread_id,
+            config["configurable"].get("checkpoint_ns", ""),
+            config["configurable"]["checkpoint_id"],
+        )
+        with self._lock:
+            before = self._writes_size(outer_key)
+            super().put_writes(config, writes, task_id, task_path)
+            self._account(thread_id, self._writes_size(outer_key) - before)
+            self._touch(thread_id)
+            self._enforce_limits(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._drop(thread_id)
+
+    # --- metrics ----------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        """Current size and eviction counters (evictions keyed by reason)."""
+        with self._lock:
+            return {
+                "threads": len(self._lru),
+                "bytes": self._total_bytes,
+                "max_threads": self.max_threads,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": dict(self._evictions),
+            }
+
+    # --- internals --------------------------------------------------------
+
+    def _writes_size(self, outer_key: tuple) -> int:
+        writes = self.writes.get(outer_key)
+        if not writes:
+            return 0
+        return sum(_typed_size(value) for _, _, value, _ in writes.values())
+
+    def _touch(self, thread_id: str) -> None:
+        self._lru[thread_id] = time.monotonic()
+        self._lru.move_to_end(thread_id)
+
+    def _account(self, thread_id: str, delta: int) -> None:
+        self._thread_bytes[thread_id] = self._thread_bytes.get(thread_id, 0) + delta
+        self._total_bytes += delta
+
+    def _evict_idle(self, now: float) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        while self._lru:
+            thread_id, last_access = next(iter(self._lru.items()))
+            if now - last_access <= self.ttl_seconds:
+                break
+            self._evict(thread_id, "idle")
+
+    def _enforce_limits(self, current: str) -> None:
+        self._evict_idle(time.monotonic())
+        # The thread being written is most recently used, so it is only evicted
+        # if it alone exceeds the budget and nothing else is left to drop.
+        while self.max_threads and len(self._lru) > self.max_threads:
+            self._evict(next(iter(self._lru)), "threads")
+        while self.max_bytes and self._total_bytes > self.max_bytes and len(self._lru) > 1:
+            oldest = next(iter(self._lru))
+            if oldest == current:
+                break
+            self._evict(oldest, "bytes")
+
+    def _evict(self, thread_id: str, reason: str) -> None:
+        freed = self._thread_bytes.get(thread_id, 0)
+        self._drop(thread_id)
+        self._evictions[reason] += 1
+        logger.debug("Evicted thread %s (%s, %d bytes)", thread_id, reason, freed)
+
+    def _drop(self, thread_id: str) -> None:
+        # Walk only this thread's keys; MemorySaver.delete_thread scans every thread.
+        for checkpoint_ns, checkpoints in self.storage.pop(thread_id, {}).items():
+            for checkpoint_id in checkpoints:
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+        for key in self._blob_keys.pop(thread_id, ()):
+            self.blobs.pop(key, None)
+        self._total_bytes -= self._thread_bytes.pop(thread_id, 0)
+        self._lru.pop(thread_id, None)
@@ -0,0 +1,485 @@
+"""
+Multi-process serving: N worker processes behind a small front dispatcher
+(`--workers N` / JOB_AGENT_WORKERS).
+
+Conversation memory, A2A tasks and the compiled agent live in each worker
+process, so every request of a conversation has to reach the worker that
+holds it; uvicorn's own ``workers`` option can't do that. The dispatcher is
+a pure ASGI app in the parent process. It reads the request body, takes the
+conversation's contextId and picks a worker from a consistent-hash ring:
+
+- A2A JSON-RPC (``POST /``): ``params.message.contextId``. Methods that only
+  carry a task id (tasks/get, tasks/cancel, tasks/resubscribe, push
+  notification config) go to the worker that owns the task, found by asking
+  the workers with ``tasks/get`` once and remembered afterwards.
+- ``/chat`` and ``/chat/stream``: ``contextId`` of the JSON body.
+- Requests without a contextId get a new one before they are routed, so the
+  follow-up request carrying it lands on the same worker.
+- Everything else (web UI, agent card) goes to any live worker.
+
+Workers are the normal server (`__main__.py`) listening on a unix socket;
+responses, SSE streams included, are relayed as they arrive, and a client
+disconnect closes the upstream request so the worker cancels the turn.
+
+A supervisor task restarts workers that exit. A dead worker leaves the ring
+until its replacement answers, so only its own share of contextIds moves
+(to the next worker on the ring) and moves back afterwards; its in-memory
+conversations are lost with the process unless JOB_AGENT_STATE_BACKEND=sqlite
+is used, which every worker shares.
+"""
+
+import asyncio
+import bisect
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any
+from urllib.parse import parse_qsl
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__main__.py")
+
+# A2A JSON-RPC methods that address an existing task by id
+TASK_METHODS = {
+    "tasks/get",
+    "tasks/cancel",
+    "tasks/resubscribe",
+    "tasks/pushNotificationConfig/get",
+    "tasks/pushNotificationConfig/set",
+    "tasks/pushNotificationConfig/list",
+    "tasks/pushNotificationConfig/delete",
+}
+CHAT_PATHS = {"/chat", "/chat/stream"}
+
+# connection-level headers that must not be relayed
+HOP_BY_HOP = {b"connection", b"keep-alive", b"transfer-encoding", b"upgrade", b"te", b"trailer", b"proxy-connection"}
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes.
+
+    Args:
+        replicas: Points per member; more points spread keys more evenly.
+    """
+
+    def __init__(self, replicas: int = 64):
+        self.replicas = replicas
+        self._points: list[int] = []
+        self._owners: list[int] = []
+        self.members: set[int] = set()
+
+    def add(self, member: int) -> None:
+        if member in self.members:
+            return
+        self.members.add(member)
+        for r in range(self.replicas):
+            point = _hash(f"worker-{member}#{r}")
+            i = bisect.bisect(self._points, point)
+            self._points.insert(i, point)
+            self._owners.insert(i, member)
+
+    def remove(self, member: int) -> None:
+        if member not in self.members:
+            return
+        self.members.discard(member)
+        keep = [(p, m) for p, m in zip(self._points, self._owners) if m != member]
+        self._points = [p for p, _ in keep]
+        self._owners = [m for _, m in keep]
+
+    def get(self, key: str) -> int | None:
+        if not self._points:
+            return None
+        i = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[i]
+
+
+class Worker:
+    """One server process listening on a unix socket."""
+
+    def __init__(self, index: int, socket_path: str):
+        self.index = index
+        self.socket_path = socket_path
+        self.process: subprocess.Popen | None = None
+        self.client: httpx.AsyncClient | None = None
+        self.started_at = 0.0
+        self.restarts = 0
+        # 연속으로 곧바로 종료된 횟수 (재시작 지연 계산용)
+        self.crash_streak = 0
+        self.requests = 0
+        self.errors = 0
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+
+class Dispatcher:
+    """ASGI front end routing requests to worker processes by contextId.
+
+    Args:
+        workers: Worker processes to run.
+        host: Public host (for the workers' agent card URL).
+        port: Public port (for the workers' agent card URL).
+        replicas: Hash ring points per worker.
+        ready_timeout: Seconds a worker may take to start serving.
+        max_owner_entries: Task id -> worker entries remembered.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        host: str,
+        port: int,
+        replicas: int = 64,
+        ready_timeout: float = 120.0,
+        max_owner_entries: int = 100_000,
+    ):
+        self.host = host
+        self.port = port
+        self.ready_timeout = ready_timeout
+        self.max_owner_entries = max_owner_entries
+        self.ring = HashRing(replicas)
+        self._socket_dir = tempfile.mkdtemp(prefix="job-agent-workers-")
+        self.workers = [Worker(i, os.path.join(self._socket_dir, f"worker-{i}.sock")) for i in range(workers)]
+        self._task_owners: "OrderedDict[str, int]" = OrderedDict()
+        self._round_robin = 0
+        self._supervisor: asyncio.Task | None = None
+        self._stopping = False
+        self._counters = {"requests": 0, "no_worker": 0, "context_assigned": 0, "task_probes": 0}
+
+    # --- ASGI -------------------------------------------------------------------
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.start()
+                except Exception as e:
+                    logger.exception("dispatcher startup failed")
+                    await self.stop()
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send) -> None:
+        self._counters["requests"] += 1
+        body = await self._read_body(receive)
+        if scope["path"] == "/metrics" and scope["method"] == "GET":
+            await self._metrics(scope, send)
+            return
+
+        body, worker = await self._route(scope, body)
+        if worker is None:
+            self._counters["no_worker"] += 1
+            await self._respond(send, 503, {"error": "no worker available"}, retry_after=1)
+            return
+
+        # 응답을 전달하는 동안 클라이언트 연결 종료를 감시 (끊기면 워커 요청도 닫아 턴을 취소)
+        relay = asyncio.ensure_future(self._relay(worker, scope, body, send))
+
+        async def disconnected() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        watcher = asyncio.create_task(disconnected())
+        try:
+            await asyncio.wait({relay, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            watcher.cancel()
+            if not relay.done():
+                relay.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await relay
+        if not relay.cancelled() and relay.exception() is not None:
+            raise relay.exception()
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        return b"".join(chunks)
+
+    # --- routing ----------------------------------------------------------------
+
+    async def _route(self, scope, body: bytes) -> tuple[bytes, Worker | None]:
+        """The (possibly rewritten) body and the worker that should handle it."""
+        if scope["method"] != "POST" or not body:
+            return body, self._any_worker()
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return body, self._any_worker()
+        if not isinstance(payload, dict):
+            return body, self._any_worker()
+
+        path = scope["path"]
+        if path in CHAT_PATHS:
+            context_id = payload.get("contextId")
+            if not context_id:
+                context_id = payload["contextId"] = str(uuid.uuid4())
+                body = self._assigned(payload)
+            return body, self._by_context(context_id)
+
+        if path == "/" and payload.get("jsonrpc"):
+            params = payload.get("params")
+            if not isinstance(params, dict):
+                return body, self._any_worker()
+            method = payload.get("method")
+            if method in TASK_METHODS:
+                return body, await self._task_owner(str(params.get("id", "")))
+            message = params.get("message")
+            if isinstance(message, dict):
+                context_id = message.get("contextId")
+                if not context_id and message.get("taskId"):
+                    return body, await self._task_owner(str(message["taskId"]))
+                if not context_id:
+                    context_id = message["contextId"] = str(uuid.uuid4())
+                    body = self._assigned(payload)
+                return body, self._by_context(context_id)
+        return body, self._any_worker()
+
+    def _assigned(self, payload: dict[str, Any]) -> bytes:
+        self._counters["context_assigned"] += 1
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    def _by_context(self, context_id: str) -> Worker | None:
+        index = self.ring.get(context_id)
+        return None if index is None else self.workers[index]
+
+    def _any_worker(self) -> Worker | None:
+        members = sorted(self.ring.members)
+        if not members:
+            return None
+        self._round_robin = (self._round_robin + 1) % len(members)
+        return self.workers[members[self._round_robin]]
+
+    async def _task_owner(self, task_id: str) -> Worker | None:
+        """The worker holding `task_id`; asks every live worker the first time."""
+        index = self._task_owners.get(task_id)
+        if index is not None and index in self.ring.members:
+            self._task_owners.move_to_end(task_id)
+            return self.workers[index]
+
+        self._counters["task_probes"] += 1
+        members = sorted(self.ring.members)
+        request = {"jsonrpc": "2.0", "id": "dispatcher", "method": "tasks/get", "params": {"id": task_id, "historyLength": 0}}
+
+        async def probe(i: int) -> int | None:
+            try:
+                response = await self.workers[i].client.post("/", json=request)
+                return i if "result" in response.json() else None
+            except (httpx.HTTPError, ValueError):
+                return None
+
+        for found in await asyncio.gather(*(probe(i) for i in members)):
+            if found is not None:
+                self._task_owners[task_id] = found
+                while len(self._task_owners) > self.max_owner_entries:
+                    self._task_owners.popitem(last=False)
+                return self.workers[found]
+        # 어느 워커에도 없으면 아무 워커가 TaskNotFound로 응답
+        return self._any_worker()
+
+    # --- relaying ---------------------------------------------------------------
+
+    async def _relay(self, worker: Worker, scope, body: bytes, send) -> None:
+        worker.requests += 1
+        url = scope.get("raw_path") or scope["path"].encode()
+        if scope.get("query_string"):
+            url += b"?" + scope["query_string"]
+        headers = [(k, v) for k, v in scope["headers"] if k not in HOP_BY_HOP and k not in (b"host", b"content-length")]
+        request = worker.client.build_request(scope["method"], url.decode("latin-1"), headers=headers, content=body)
+        try:
+            response = await worker.client.send(request, stream=True)
+        except httpx.HTTPError as e:
+            worker.errors += 1
+            logger.warning("worker %d unavailable: %s", worker.index, e)
+            await self._respond(send, 503, {"error": "worker unavailable"}, retry_after=1)
+            return
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [(k, v) for k, v in response.headers.raw if k.lower() not in HOP_BY_HOP],
+            })
+            # SSE 등 스트리밍 응답은 받은 만큼 바로 전달
+            async for chunk in response.aiter_raw():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except httpx.HTTPError as e:
+            # 응답 도중 워커가 종료됨; 이미 보낸 헤더는 되돌릴 수 없으므로 연결을 끝냄
+            worker.errors += 1
+            logger.warning("worker %d failed mid-response: %s", worker.index, e)
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            await response.aclose()
+
+    @staticmethod
+    async def _respond(send, status: int, payload: dict[str, Any], retry_after: int | None = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        if retry_after is not None:
+            headers.append((b"retry-after", str(retry_after).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _metrics(self, scope, send) -> None:
+        # Prometheus 텍스트는 워커별로 (?worker=N, 기본 0), JSON은 전체를 묶어서 반환
+        query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        if query.get("format") == "prometheus":
+            index = int(query.get("worker", "0"))
+            if 0 <= index < len(self.workers) and index in self.ring.members:
+                await self._relay(self.workers[index], {**scope, "query_string": b"format=prometheus"}, b"", send)
+            else:
+                await self._respond(send, 503, {"error": f"worker {index} not available"}, retry_after=1)
+            return
+
+        async def snapshot(worker: Worker) -> Any:
+            try:
+                return (await worker.client.get("/metrics")).json()
+            except (httpx.HTTPError, ValueError) as e:
+                return {"error": str(e)}
+
+        live = [w for w in self.workers if w.index in self.ring.members]
+        snapshots = await asyncio.gather(*(snapshot(w) for w in live))
+        await self._respond(
+            send, 200, {"dispatcher": self.stats(), "workers": {str(w.index): s for w, s in zip(live, snapshots)}}
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._counters,
+            "ring_members": sorted(self.ring.members),
+            "task_owners": len(self._task_owners),
+            "workers": {
+                str(w.index): {
+                    "pid": w.process.pid if w.process else None,
+                    "alive": w.alive(),
+                    "restarts": w.restarts,
+                    "requests": w.requests,
+                    "errors": w.errors,
+                }
+                for w in self.workers
+            },
+        }
+
+    # --- worker processes -------------------------------------------------------
+
+    async def start(self) -> None:
+        await asyncio.gather(*(self._start_worker(w) for w in self.workers))
+        self._supervisor = asyncio.create_task(self._supervise())
+        logger.info("dispatcher serving %d workers", len(self.workers))
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+        for worker in self.workers:
+            if worker.alive():
+                worker.process.terminate()
+        for worker in self.workers:
+            if worker.process is not None:
+                try:
+                    await asyncio.to_thread(worker.process.wait, 10)
+                except subprocess.TimeoutExpired:
+                    worker.process.kill()
+            if worker.client is not None:
+                await worker.client.aclose()
+        shutil.rmtree(self._socket_dir, ignore_errors=True)
+
+    async def _start_worker(self, worker: Worker) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(worker.socket_path)
+        env = {**os.environ, "JOB_AGENT_WORKER_INDEX": str(worker.index)}
+        worker.started_at = time.monotonic()
+        worker.process = subprocess.Popen(
+            [sys.executable, MAIN_PATH, "--host", self.host, "--port", str(self.port), "--uds", worker.socket_path],
+            env=env,
+        )
+        if worker.client is None:
+            worker.client = httpx.AsyncClient(
+                transport=httpx.AsyncHTTPTransport(uds=worker.socket_path),
+                base_url="http://worker",
+                timeout=httpx.Timeout(None, connect=5.0),
+                limits=httpx.Limits(max_connections=None, max_keepalive_connections=64),
+            )
+        await self._wait_ready(worker)
+        self.ring.add(worker.index)
+        logger.info("worker %d ready (pid %d)", worker.index, worker.process.pid)
+
+    async def _wait_ready(self, worker: Worker) -> None:
+        deadline = time.monotonic() + self.ready_timeout
+        while time.monotonic() < deadline:
+            if not worker.alive():
+                raise RuntimeError(f"worker {worker.index} exited with code {worker.process.returncode}")
+            try:
+                response = await worker.client.get("/.well-known/agent-card.json")
+                if response.status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+        raise RuntimeError(f"worker {worker.index} not ready after {self.ready_timeout:g}s")
+
+    async def _supervise(self) -> None:
+        """Take exited workers out of the ring and restart them."""
+        restarting: dict[int, asyncio.Task] = {}
+        while not self._stopping:
+            for worker in self.workers:
+                if worker.alive() or worker.index in restarting:
+                    continue
+                # 링에서 빼면 이 워커의 contextId만 다음 워커로 이동
+                self.ring.remove(worker.index)
+                self._task_owners = OrderedDict((t, i) for t, i in self._task_owners.items() if i != worker.index)
+                logger.warning("worker %d exited (code %s), restarting", worker.index, worker.process.returncode)
+                restarting[worker.index] = asyncio.create_task(self._restart(worker))
+            for index, task in list(restarting.items()):
+                if task.done():
+                    del restarting[index]
+            await asyncio.sleep(0.5)
+
+    async def _restart(self, worker: Worker) -> None:
+        # 시작 직후 반복 종료되는 워커는 점점 늦게 재시작
+        if time.monotonic() - worker.started_at > 60:
+            worker.crash_streak = 0
+        await asyncio.sleep(min(30.0, 0.5 * 2 ** worker.crash_streak))
+        worker.crash_streak += 1
+        worker.restarts += 1
+        try:
+            await self._start_worker(worker)
+        except Exception:
+            logger.exception("worker %d restart failed", worker.index)
+            if worker.alive():
+                worker.process.kill()
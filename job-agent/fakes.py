@@ -0,0 +1,198 @@
+"""
+Deterministic stand-in for the Gemini chat model, for benchmarks and offline
+runs (`JOB_AGENT_MODEL=fake`).
+
+`FakeChatModel` answers from a fixed phrase list chosen by a hash of the
+conversation, so the same input always gives the same reply. Latency is
+configurable and spread over the streamed chunks; token usage is reported
+with the same estimate the history trimmer uses. With `tool_calls=True` the
+first model call of a turn asks for `web_search` (and `search_jobs` when
+bound), which exercises the tool path of the graph.
+
+For resilience tests it can also inject faults: `error_rate` of the calls
+fail with a retryable 503 (`FakeModelError`) and `slow_rate` of them take
+`slow_latency` seconds instead of `latency`, before the first chunk.
+
+The web search fake lives in `search_client.FakeSearchBackend`
+(`JOB_AGENT_SEARCH_BACKEND=fake`).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Iterator
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from textutil import content_text, estimate_tokens
+
+_PHRASES = [
+    "이력서에는 성과를 숫자로 보여주는 것이 좋습니다.",
+    "지원하는 직무의 핵심 역량을 먼저 정리해 보세요.",
+    "면접 전에는 회사의 최근 제품과 채용 공고를 꼼꼼히 읽어 두세요.",
+    "포트폴리오는 문제, 접근, 결과 순서로 구성하면 읽기 쉽습니다.",
+    "연봉 협상 전에는 업계 평균과 본인의 기대치를 근거와 함께 준비하세요.",
+    "네트워킹은 짧고 구체적인 질문으로 시작하는 것이 효과적입니다.",
+    "커리어 전환을 고민한다면 작은 프로젝트로 먼저 경험을 쌓아 보세요.",
+    "자기소개서는 회사가 풀고 싶은 문제와 나의 경험을 연결해 쓰세요.",
+]
+
+
+class FakeModelError(Exception):
+    """Injected upstream failure (looks like a 503 to `model_resilience`)."""
+
+    code = 503
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic chat model with configurable latency.
+
+    Attributes:
+        latency: Seconds per call (spread over the streamed chunks).
+        reply_sentences: Sentences per reply.
+        chunk_chars: Characters per streamed chunk.
+        tool_calls: Request tools on the first model call of each turn.
+        error_rate: Fraction of calls that fail with `FakeModelError`.
+        slow_rate: Fraction of calls that take `slow_latency` instead of `latency`.
+        slow_latency: Seconds of a slow call.
+    """
+
+    model_name: str = "fake"
+    latency: float = 0.0
+    reply_sentences: int = 3
+    chunk_chars: int = 16
+    tool_calls: bool = False
+    bound_tools: list[str] = []
+    error_rate: float = 0.0
+    slow_rate: float = 0.0
+    slow_latency: float = 5.0
+
+    @classmethod
+    def from_env(cls, model_name: str = "fake") -> "FakeChatModel":
+        """Fake model `model_name`; faults are injected into "fake" only, so
+        other "fake-*" models can serve as a healthy fallback chain."""
+        faults = model_name == "fake"
+        return cls(
+            model_name=model_name,
+            latency=float(os.getenv("JOB_AGENT_FAKE_LATENCY", "0")),
+            tool_calls=os.getenv("JOB_AGENT_FAKE_TOOL_CALLS", "0") == "1",
+            error_rate=float(os.getenv("JOB_AGENT_FAKE_ERROR_RATE", "0")) if faults else 0.0,
+            slow_rate=float(os.getenv("JOB_AGENT_FAKE_SLOW_RATE", "0")) if faults else 0.0,
+            slow_latency=float(os.getenv("JOB_AGENT_FAKE_SLOW_LATENCY", "5")),
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools, **kwargs):
+        names = [getattr(t, "name", None) or getattr(t, "__name__", str(t)) for t in tools]
+        return self.model_copy(update={"bound_tools": names})
+
+    # --- fault injection ------------------------------------------------------
+
+    def _fault(self) -> float:
+        """Extra delay for this call; raises `FakeModelError` for injected failures."""
+        if self.error_rate and random.random() < self.error_rate:
+            raise FakeModelError(f"{self.model_name}: injected 503 Service Unavailable")
+        if self.slow_rate and random.random() < self.slow_rate:
+            return max(0.0, self.slow_latency - self.latency)
+        return 0.0
+
+    # --- reply ----------------------------------------------------------------
+
+    def _message(self, messages: list[BaseMessage]) -> AIMessage:
+        last = messages[-1] if messages else None
+        if self.tool_calls and last is not None and last.type == "human" and "web_search" in self.bound_tools:
+            query = content_text(last.content)[:100]
+            calls = [{"name": "web_search", "args": {"query": query}, "id": f"call_{self._digest(messages)[:8]}_0"}]
+            if "search_jobs" in self.bound_tools:
+                calls.append({"name": "search_jobs", "args": {"query": query}, "id": f"call_{self._digest(messages)[:8]}_1"})
+            return AIMessage(
+                content="", tool_calls=calls, usage_metadata=self._usage(messages, ""), response_metadata=self._metadata()
+            )
+
+        digest = self._digest(messages)
+        start = int(digest[:8], 16)
+        text = " ".join(_PHRASES[(start + i) % len(_PHRASES)] for i in range(self.reply_sentences))
+        return AIMessage(content=text, usage_metadata=self._usage(messages, text), response_metadata=self._metadata())
+
+    def _metadata(self) -> dict[str, Any]:
+        # 실제 모델처럼 model_name을 남겨 모델별 토큰 집계(usage 콜백)에 잡히도록 함
+        return {"model_name": self.model_name}
+
+    @staticmethod
+    def _digest(messages: list[BaseMessage]) -> str:
+        joined = "\x00".join(content_text(m.content) for m in messages)
+        return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _usage(messages: list[BaseMessage], text: str) -> dict[str, int]:
+        input_tokens = sum(estimate_tokens(content_text(m.content)) for m in messages)
+        output_tokens = estimate_tokens(text)
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+    def _chunks(self, message: AIMessage) -> list[AIMessageChunk]:
+        if message.tool_calls:
+            return [AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": c["name"], "args": json.dumps(c["args"], ensure_ascii=False), "id": c["id"], "index": i}
+                    for i, c in enumerate(message.tool_calls)
+                ],
+                usage_metadata=message.usage_metadata,
+                response_metadata=message.response_metadata,
+            )]
+        text = message.content
+        pieces = [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)] or [""]
+        chunks = [AIMessageChunk(content=piece) for piece in pieces]
+        chunks[-1].usage_metadata = message.usage_metadata
+        chunks[-1].response_metadata = message.response_metadata
+        return chunks
+
+    # --- BaseChatModel --------------------------------------------------------
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        delay = self.latency + self._fault()
+        if delay:
+            time.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        delay = self.latency + self._fault()
+        if delay:
+            await asyncio.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        delay = self._fault()
+        if delay:
+            time.sleep(delay)
+        chunks = self._chunks(self._message(messages))
+        for chunk in chunks:
+            if self.latency:
+                time.sleep(self.latency / len(chunks))
+            if run_manager and chunk.content:
+                run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        delay = self._fault()
+        if delay:
+            await asyncio.sleep(delay)
+        chunks = self._chunks(self._message(messages))
+        for chunk in chunks:
+            if self.latency:
+                await asyncio.sleep(self.latency / len(chunks))
+            if run_manager and chunk.content:
+                await run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"model_name": self.model_name, "latency": self.latency, "error_rate": self.error_rate}
@@ -0,0 +1,181 @@
+"""
+Pre-model hook that keeps the prompt under a token budget.
+
+`create_react_agent` sends the whole thread to Gemini on every model call,
+so long sessions get slower and more expensive each turn. `HistoryTrimmer`
+runs before each model call and, once the budget is exceeded:
+
+1. drops tool calls and tool outputs from earlier turns (the final answers
+   of those turns are kept), then
+2. folds the oldest remaining turns into a running summary stored in the
+   graph state, so later turns do not have to re-fold them.
+
+The "summary" is extractive, not generated: each folded message becomes
+one line with its role and its first `SUMMARY_LINE_CHARS` characters (cut
+at a word boundary), and the oldest lines are dropped past
+``summary_tokens``. Folding costs no model call and adds no latency to the
+turn, but details past the first characters of a long answer are lost.
+
+The current turn is never trimmed. Only the model input is rewritten
+(`llm_input_messages`); the checkpointed history stays complete.
+"""
+
+import logging
+import os
+from typing import Any
+
+from langchain_core.messages import BaseMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.prebuilt.chat_agent_executor import AgentState
+from typing_extensions import NotRequired
+
+from textutil import content_text, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PREFIX = "이전 대화 발췌 (오래된 메시지의 앞부분):\n"
+# 요약에 넣을 메시지당 최대 글자 수 (앞부분만 남기는 발췌)
+SUMMARY_LINE_CHARS = 200
+
+
+class JobAgentState(AgentState):
+    """Agent state plus the trimmer's running summary."""
+
+    context: NotRequired[dict[str, Any]]
+
+
+def message_tokens(message: BaseMessage) -> int:
+    tokens = estimate_tokens(content_text(message.content)) + 4  # role/framing overhead
+    for call in getattr(message, "tool_calls", None) or []:
+        tokens += estimate_tokens(f"{call['name']}{call['args']}")
+    return tokens
+
+
+def _is_tool_traffic(message: BaseMessage) -> bool:
+    return message.type == "tool" or (message.type == "ai" and bool(getattr(message, "tool_calls", None)))
+
+
+class HistoryTrimmer:
+    """Token-budgeted pre-model hook.
+
+    Args:
+        token_budget: Target size of the messages sent to the model (the
+            system prompt is not counted).
+        summary_tokens: Upper bound for the running summary; the oldest
+            summary lines are dropped past it.
+    """
+
+    def __init__(self, token_budget: int = 6000, summary_tokens: int = 800):
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.stats = {"calls": 0, "trimmed": 0, "tokens_in": 0, "tokens_out": 0, "tokens_saved": 0}
+
+    @classmethod
+    def from_env(cls) -> "HistoryTrimmer | None":
+        """Build from env; returns None when trimming is disabled (budget 0)."""
+        budget = int(os.getenv("JOB_AGENT_HISTORY_TOKEN_BUDGET", "6000"))
+        if budget <= 0:
+            return None
+        return cls(
+            token_budget=budget,
+            summary_tokens=int(os.getenv("JOB_AGENT_HISTORY_SUMMARY_TOKENS", "800")),
+        )
+
+    def __call__(self, state: JobAgentState, config: RunnableConfig) -> dict[str, Any]:
+        messages = list(state["messages"])
+        context = dict(state.get("context") or {})
+        summary = context.get("running_summary", "")
+        summarized_until = context.get("summarized_until")
+
+        # Messages already folded into the summary are never sent again.
+        start = 0
+        if summarized_until:
+            for i, message in enumerate(messages):
+                if message.id == summarized_until:
+                    start = i + 1
+                    break
+        history = messages[start:]
+
+        human_idx = [i for i, m in enumerate(history) if m.type == "human"]
+        turn_start = human_idx[-1] if human_idx else 0
+        older, current = history[:turn_start], history[turn_start:]
+
+        tokens_in = sum(message_tokens(m) for m in messages)
+        current_tokens = sum(message_tokens(m) for m in current)
+        older_tokens = [message_tokens(m) for m in older]
+
+        def total() -> int:
+            return estimate_tokens(summary) + sum(older_tokens) + current_tokens
+
+        changed = False
+        if total() > self.token_budget:
+            # 1. Older tool traffic is the bulk of the history and rarely needed again.
+            kept = [(m, t) for m, t in zip(older, older_tokens) if not _is_tool_traffic(m)]
+            older, older_tokens = [m for m, _ in kept], [t for _, t in kept]
+
+            # 2. Fold the oldest turns into the summary until the prompt fits.
+            while older and total() > self.token_budget:
+                summary = self._fold(summary, older.pop(0))
+                older_tokens.pop(0)
+                # Keep the remaining history starting at a user message.
+                while older and older[0].type != "human":
+                    summary = self._fold(summary, older.pop(0))
+                    older_tokens.pop(0)
+                summarized_until = self._last_folded_id(history, older, current)
+                changed = True
+
+        llm_input: list[BaseMessage] = []
+        if summary:
+            llm_input.append(SystemMessage(content=SUMMARY_PREFIX + summary))
+        llm_input.extend(older)
+        llm_input.extend(current)
+
+        tokens_out = total()
+        saved = max(tokens_in - tokens_out, 0)
+        self.stats["calls"] += 1
+        self.stats["tokens_in"] += tokens_in
+        self.stats["tokens_out"] += tokens_out
+        self.stats["tokens_saved"] += saved
+        if saved:
+            self.stats["trimmed"] += 1
+            logger.info(
+                "History trimmed for thread %s: %d -> %d tokens (saved %d)",
+                config.get("configurable", {}).get("thread_id"), tokens_in, tokens_out, saved,
+            )
+
+        update: dict[str, Any] = {"llm_input_messages": llm_input}
+        if changed:
+            context["running_summary"] = summary
+            context["summarized_until"] = summarized_until
+            update["context"] = context
+        return update
+
+    def _fold(self, summary: str, message: BaseMessage) -> str:
+        """Append `message` to the summary as "- role: <first characters>".
+
+        This is truncation, not summarization: only the first
+        `SUMMARY_LINE_CHARS` characters of the message are kept.
+        """
+        text = " ".join(content_text(message.content).split())
+        if not text:
+            return summary
+        if len(text) > SUMMARY_LINE_CHARS:
+            # 단어 중간에서 자르지 않고, 잘렸음을 표시
+            text = (text[:SUMMARY_LINE_CHARS].rsplit(" ", 1)[0] or text[:SUMMARY_LINE_CHARS]) + "…"
+        role = "사용자" if message.type == "human" else "어시스턴트"
+        lines = summary.splitlines() if summary else []
+        lines.append(f"- {role}: {text}")
+        while len(lines) > 1 and estimate_tokens("\n".join(lines)) > self.summary_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    @staticmethod
+    def _last_folded_id(history: list[BaseMessage], older: list[BaseMessage], current: list[BaseMessage]) -> str | None:
+        """Id of the last history message before the first one still sent as-is."""
+        first_kept = older[0] if older else current[0] if current else None
+        previous = None
+        for message in history:
+            if message is first_kept:
+                break
+            previous = message
+        return previous.id if previous is not None else None
@@ -0,0 +1,273 @@
+"""
+Deterministic pre-graph routing for requests that do not need the LLM.
+
+An intent table maps trigger phrases (Korean or English) to either a
+templated reply or a direct tool call. All phrases are compiled into one
+Aho-Corasick automaton, so routing a query is a single pass over its
+normalized text no matter how many intents or phrases are configured.
+
+Intent fields:
+  - ``name``: id used in logs and stats
+  - ``patterns``: trigger phrases (normalized like queries, see `normalize_query`)
+  - ``match``: ``"any"`` (phrase anywhere in the query, default),
+    ``"prefix"`` (the query starts with the phrase, e.g. commands) or
+    ``"exact"`` (the whole query is the phrase, e.g. bare greetings)
+  - ``priority``: higher wins when several intents match (default 0)
+  - ``reply``: answer template; ``{query}`` is replaced with the user query
+  - ``tool`` / ``args``: call this tool instead, with ``args`` plus
+    ``query`` set to the rest of the query after the trigger phrase; the
+    tool's output is the reply. If nothing is left after the phrase, or
+    the query is a question ("?", a question word or ending), the request
+    goes to the LLM instead.
+  - ``not_followed_by``: words that, right after the phrase, mean the query
+    is about the topic rather than a tool call ("job search tips"); the
+    request goes to the LLM
+
+JOB_AGENT_INTENTS_PATH points to a JSON file with a list of intents that
+replaces the built-in table.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from textutil import normalize_query
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTENTS: list[dict[str, Any]] = [
+    {
+        "name": "linkedin",
+        "patterns": ["linkedin", "링크드인", "링크드 인"],
+        "priority": 10,
+        "reply": (
+            "LinkedIn 구직 검색 기능은 현재 API 연동 준비 중입니다. "
+            "원하시면 직무/경력/지역 정보를 기반으로 일반적인 구직 전략, 이력서/자기소개서 개선, 면접 준비 팁을 제공해 드릴게요."
+        ),
+    },
+    {
+        "name": "job_search",
+        "patterns": [
+            "채용 공고 검색", "채용공고 검색", "공고 검색", "채용 검색", "일자리 검색",
+            "search jobs", "job search", "find jobs", "search job postings",
+        ],
+        "match": "prefix",
+        "priority": 5,
+        "not_followed_by": [
+            "tip", "tips", "advice", "strategy", "strategies", "guide", "help", "plan", "mistakes",
+            "팁", "요령", "조언", "전략", "방법", "노하우", "가이드",
+        ],
+        "tool": "search_jobs",
+        "args": {"location": "", "experience_level": ""},
+    },
+    {
+        "name": "greeting",
+        "patterns": ["안녕", "안녕하세요", "반가워요", "반갑습니다", "hi", "hello", "hey"],
+        "match": "exact",
+        "reply": (
+            "안녕하세요! 커리어 및 취업 상담 어시스턴트입니다. "
+            "취업 전략, 이력서 작성, 면접 준비, 연봉 협상, 커리어 경로 등 궁금한 점을 편하게 물어보세요."
+        ),
+    },
+    {
+        "name": "help",
+        "patterns": ["도움말", "help", "뭘 할 수 있어", "무엇을 할 수 있나요", "what can you do"],
+        "match": "exact",
+        "reply": (
+            "다음과 같은 도움을 드릴 수 있습니다:\n"
+            "- 취업 전략 및 기법\n- 이력서 작성 및 최적화\n- 면접 준비 및 팁\n- 커리어 경로 가이드\n"
+            "- 연봉 협상 조언\n- 전문성 개발 계획\n- 업계 인사이트 및 트렌드\n- 네트워킹 전략\n"
+            "채용 공고를 바로 찾으려면 \"채용 공고 검색 백엔드 개발자\"처럼 입력해 보세요."
+        ),
+    },
+]
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher (one pass over the text for all patterns)."""
+
+    def __init__(self, patterns: list[tuple[str, Any]]):
+        # node -> {char: next node}; node 0 is the root
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # node -> [(pattern length, payload)] for every pattern ending there
+        self._out: list[list[tuple[int, Any]]] = [[]]
+        for pattern, payload in patterns:
+            if pattern:
+                self._insert(pattern, payload)
+        self._build()
+
+    def _insert(self, pattern: str, payload: Any) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), payload))
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def finditer(self, text: str) -> Iterator[tuple[int, int, Any]]:
+        """Yield ``(start, end, payload)`` for every pattern occurrence in `text`."""
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, payload in out[node]:
+                yield i + 1 - length, i + 1, payload
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+_QUESTION_WORDS = frozenset({
+    "how", "what", "why", "when", "where", "which", "who", "should", "can", "could", "do", "does",
+    "is", "are", "어떻게", "왜", "뭐", "무엇", "어디", "언제", "어떤",
+})
+_QUESTION_ENDINGS = ("까", "까요", "나요", "가요", "는지", "을지")
+
+
+def _is_question(query: str, rest: str) -> bool:
+    """True if `query` asks something rather than giving a tool argument."""
+    if "?" in query or "？" in query:
+        return True
+    words = rest.split()
+    return bool(words) and (words[0] in _QUESTION_WORDS or words[-1].endswith(_QUESTION_ENDINGS))
+
+
+@dataclass
+class Route:
+    """A routing decision: reply directly, or call `tool` with `args`."""
+
+    intent: str
+    reply: str | None = None
+    tool: Any = None
+    args: dict[str, Any] = field(default_factory=dict)
+
+    def run(self) -> str:
+        if self.tool is None:
+            return self.reply or ""
+        return str(self.tool.invoke(self.args))
+
+    async def arun(self) -> str:
+        if self.tool is None:
+            return self.reply or ""
+        return str(await self.tool.ainvoke(self.args))
+
+
+class IntentRouter:
+    """Routes queries to canned intents before the graph runs.
+
+    Args:
+        intents: Intent table (see the module docstring).
+        tools: Tools by name, for intents with a ``tool``. Intents naming a
+            tool that is not available are dropped.
+    """
+
+    def __init__(self, intents: list[dict[str, Any]], tools: dict[str, Any] | None = None):
+        tools = tools or {}
+        self.intents: list[dict[str, Any]] = []
+        patterns: list[tuple[str, int]] = []
+        for intent in intents:
+            if intent.get("tool") and intent["tool"] not in tools:
+                logger.warning("intent %s skipped: tool %s is not available", intent["name"], intent["tool"])
+                continue
+            index = len(self.intents)
+            self.intents.append(intent)
+            patterns.extend((normalize_query(p), index) for p in intent.get("patterns", ()))
+        self._tools = tools
+        self._matcher = AhoCorasick(patterns)
+
+        self._lock = threading.Lock()
+        self._queries = 0
+        self._hits = {intent["name"]: 0 for intent in self.intents}
+
+    @classmethod
+    def from_env(cls, tools: dict[str, Any] | None = None) -> "IntentRouter":
+        path = os.getenv("JOB_AGENT_INTENTS_PATH")
+        if path:
+            with open(path, encoding="utf-8") as f:
+                return cls(json.load(f), tools)
+        return cls(DEFAULT_INTENTS, tools)
+
+    def route(self, query: Any) -> Route | None:
+        """Best matching intent for `query`, or None to run the graph."""
+        text = normalize_query(str(query))
+        best = None  # (priority, -start, start, end, intent index)
+        for start, end, index in self._matcher.finditer(text):
+            intent = self.intents[index]
+            match = intent.get("match")
+            if match == "exact":
+                if start != 0 or end != len(text):
+                    continue
+            elif match == "prefix" and start != 0:
+                continue
+            # 영문 패턴은 단어 경계에서만 매칭 ("hi"가 "this"에 걸리지 않도록)
+            if (start > 0 and _is_word_char(text[start]) and _is_word_char(text[start - 1])) or (
+                end < len(text) and _is_word_char(text[end - 1]) and _is_word_char(text[end])
+            ):
+                continue
+            candidate = (intent.get("priority", 0), -start, start, end, index)
+            if best is None or candidate[:2] > best[:2]:
+                best = candidate
+
+        route = None
+        if best is not None:
+            _, _, start, end, index = best
+            route = self._build_route(self.intents[index], str(query), text[end:].strip())
+        self._record(route)
+        return route
+
+    def _build_route(self, intent: dict[str, Any], query: str, rest: str) -> Route | None:
+        if intent.get("tool"):
+            if not rest or _is_question(query, rest):
+                return None
+            if rest.split()[0] in intent.get("not_followed_by", ()):
+                return None
+            return Route(intent["name"], tool=self._tools[intent["tool"]], args={**intent.get("args", {}), "query": rest})
+        return Route(intent["name"], reply=intent.get("reply", "").replace("{query}", query))
+
+    def _record(self, route: Route | None) -> None:
+        with self._lock:
+            self._queries += 1
+            if route is None:
+                logger.debug("intent router: no intent, running the graph")
+                return
+            hits = self._hits[route.intent] = self._hits[route.intent] + 1
+            rate = hits / self._queries
+        logger.info("intent router: %s (hits=%d, hit rate=%.1f%%)", route.intent, hits, rate * 100)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            routed = sum(self._hits.values())
+            return {
+                "queries": self._queries,
+                "routed": routed,
+                "routed_rate": routed / self._queries if self._queries else 0.0,
+                "intents": {
+                    name: {"hits": hits, "hit_rate": hits / self._queries if self._queries else 0.0}
+                    for name, hits in self._hits.items()
+                },
+            }
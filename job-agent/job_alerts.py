@@ -0,0 +1,334 @@
+"""
+Job alerts: match new postings against users' saved search profiles.
+
+Running every saved query against every new posting costs
+profiles x postings. `AlertMatcher` works the other way round, like a
+percolator: it indexes the saved profiles themselves, so matching a
+posting only touches the profiles that can possibly match it.
+
+A profile (query, location, experience level) matches a posting when
+
+- at least `min_match` of its query terms appear in the posting (title,
+  company, description, requirements; same terms as `search_jobs`),
+- all of its location terms appear in the posting's location, and
+- its experience level, if any, equals the posting's.
+
+If a match needs `m` of a profile's `n` query terms, any `n - m + 1` of
+them are enough to find it: a matching posting contains at least one. Each
+profile is therefore filed under only that many "anchor" terms, the ones
+rarest among the postings seen so far, and the anchor key also carries the
+profile's level and rarest location term (empty when it has none). A
+posting looks up its own terms under its level and location terms and
+verifies just those candidates, so the work per posting grows with its
+length and the number of near matches, not with the number of profiles.
+Profiles without a query are filed under an empty term.
+
+Anchors are re-picked as the posting statistics grow (after the first
+1000 postings, then each time the count doubles). Profiles can be added,
+replaced and removed at any time; removed ones are tombstoned and the
+index is rebuilt once a quarter of it is dead. `match_batch` matches a
+micro-batch of postings, scanning each anchor list once per batch;
+`match_feed` cuts a stream of postings into such batches. `stats` reports
+throughput in postings per second.
+
+Usage:
+  python job_alerts.py --profiles profiles.jsonl postings.jsonl --output matches.jsonl
+"""
+
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+from array import array
+from typing import Any, Iterable, Iterator, NamedTuple
+
+from job_index import LEVEL_CODES, normalize_experience_level, read_postings
+from job_models import JobAlertProfile, JobRecommendation
+from textutil import tokenize
+
+# 처음 이만큼의 공고를 본 뒤, 그 다음부터는 본 공고 수가 두 배가 될 때마다 anchor를 다시 고름
+REANCHOR_MIN_POSTINGS = 1000
+
+
+class AlertMatch(NamedTuple):
+    profile_id: str
+    user_id: str
+    job_id: str
+    # 일치한 검색어 비율 (검색어 없는 프로필은 1.0)
+    score: float
+
+
+def _posting_terms(posting: dict[str, Any]) -> tuple[frozenset, frozenset, int]:
+    """(text terms, location terms, level code) of a posting."""
+    requirements = posting.get("requirements") or []
+    text = " ".join(
+        [str(posting.get("title") or ""), str(posting.get("company") or ""), str(posting.get("description") or "")]
+        + [str(r) for r in requirements]
+    )
+    level = LEVEL_CODES[normalize_experience_level(posting.get("experience_level"))]
+    return frozenset(tokenize(text)), frozenset(tokenize(str(posting.get("location") or ""))), level
+
+
+class AlertMatcher:
+    """Percolator-style index of saved job search profiles.
+
+    Args:
+        min_match: Share of a profile's query terms a posting must contain.
+    """
+
+    def __init__(self, min_match: float = 0.75):
+        self.min_match = min_match
+        self._lock = threading.RLock()
+        # 공고에서 본 단어별 문서 빈도 (anchor 선택용, 드문 단어일수록 후보가 적음)
+        self._posting_df: dict[str, int] = {}
+        # 지금 anchor를 고를 때까지 본 공고 수
+        self._seen = 0
+        self._anchored_at = 0
+        self._counters = {"postings": 0, "matches": 0, "candidates": 0, "batches": 0}
+        self._match_seconds = 0.0
+        self._reset()
+
+    def _reset(self) -> None:
+        # profile id -> (profile_id, user_id, query terms, terms needed, location terms, level code,
+        # anchored more than once), None if removed
+        self._profiles: list[tuple | None] = []
+        self._ids: dict[str, int] = {}
+        # (anchor term, level code, location term) -> profile ids ("" / 0 = 조건 없음)
+        self._anchors: dict[tuple[str, int, str], array] = {}
+        # anchor로 쓰이는 단어 (공고 단어 대부분을 키 조합 없이 바로 건너뜀)
+        self._anchor_terms: set[str] = set()
+        self._live = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    # --- profiles -----------------------------------------------------------
+
+    def add(self, profile: JobAlertProfile | dict[str, Any]) -> None:
+        """Add a profile, replacing any profile with the same profile_id."""
+        if isinstance(profile, dict):
+            profile = JobAlertProfile(**profile)
+        terms = frozenset(tokenize(profile.query))
+        needed = max(1, math.ceil(self.min_match * len(terms))) if terms else 0
+        entry = (
+            profile.profile_id,
+            profile.user_id,
+            terms,
+            needed,
+            frozenset(tokenize(profile.location)),
+            LEVEL_CODES[normalize_experience_level(profile.experience_level)],
+        )
+        with self._lock:
+            self._remove_locked(profile.profile_id)
+            self._append_locked(entry)
+            self._maybe_compact_locked()
+
+    def add_many(self, profiles: Iterable[JobAlertProfile | dict[str, Any]]) -> int:
+        count = 0
+        for profile in profiles:
+            self.add(profile)
+            count += 1
+        return count
+
+    def remove(self, profile_id: str) -> bool:
+        with self._lock:
+            removed = self._remove_locked(profile_id)
+            self._maybe_compact_locked()
+            return removed
+
+    # --- matching -----------------------------------------------------------
+
+    def match(self, posting: JobRecommendation | dict[str, Any]) -> list[AlertMatch]:
+        """Profiles matching one posting."""
+        return self.match_batch([posting])[0]
+
+    def match_batch(self, postings: list[JobRecommendation | dict[str, Any]]) -> list[list[AlertMatch]]:
+        """Matches for each posting of a micro-batch (in the same order)."""
+        start = time.perf_counter()
+        docs = []
+        for posting in postings:
+            if isinstance(posting, JobRecommendation):
+                posting = posting.model_dump()
+            docs.append((str(posting.get("job_id") or ""),) + _posting_terms(posting))
+        results: list[list[AlertMatch]] = [[] for _ in docs]
+        candidates = 0
+
+        with self._lock:
+            # 배치 안에서 anchor 키 -> 공고 목록을 만들어 각 anchor 목록은 배치당 한 번만 훑음
+            grouped: dict[tuple[str, int, str], list[int]] = {}
+            anchors, anchor_terms = self._anchors, self._anchor_terms
+            for i, (_, terms, location, level) in enumerate(docs):
+                levels = (0, level) if level else (0,)
+                locations = ("", *location)
+                for term in ("", *terms):
+                    if term not in anchor_terms:
+                        continue
+                    for lv in levels:
+                        for loc in locations:
+                            key = (term, lv, loc)
+                            if key in anchors:
+                                grouped.setdefault(key, []).append(i)
+
+            # 여러 anchor에 걸린 프로필만 (프로필, 공고) 쌍을 한 번만 확인하도록 기록
+            verified: set[tuple[int, int]] = set()
+            profiles = self._profiles
+            verify = self._verify
+            for key, indexes in grouped.items():
+                for profile_id in anchors[key]:
+                    profile = profiles[profile_id]
+                    if profile is None:
+                        continue
+                    for i in indexes:
+                        if profile[6]:
+                            if (profile_id, i) in verified:
+                                continue
+                            verified.add((profile_id, i))
+                        candidates += 1
+                        match = verify(profile, docs[i])
+                        if match is not None:
+                            results[i].append(match)
+
+            df = self._posting_df
+            for _, terms, _, _ in docs:
+                for term in terms:
+                    df[term] = df.get(term, 0) + 1
+            self._seen += len(docs)
+            if self._seen >= max(REANCHOR_MIN_POSTINGS, 2 * self._anchored_at):
+                # 공고 단어 빈도가 충분히 바뀌었으면 (본 공고 수가 두 배가 될 때마다) anchor를 다시 고름
+                self._rebuild_locked()
+
+            self._counters["postings"] += len(docs)
+            self._counters["matches"] += sum(len(r) for r in results)
+            self._counters["candidates"] += candidates
+            self._counters["batches"] += 1
+            self._match_seconds += time.perf_counter() - start
+        return results
+
+    def match_feed(
+        self, postings: Iterable[JobRecommendation | dict[str, Any]], batch_size: int = 512
+    ) -> Iterator[tuple[dict[str, Any] | JobRecommendation, list[AlertMatch]]]:
+        """(posting, matches) for a stream of postings, matched in micro-batches."""
+        batch: list = []
+        for posting in postings:
+            batch.append(posting)
+            if len(batch) >= batch_size:
+                yield from zip(batch, self.match_batch(batch))
+                batch = []
+        if batch:
+            yield from zip(batch, self.match_batch(batch))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counters)
+            seconds = self._match_seconds
+            profiles = self._live
+        return {
+            **counts,
+            "profiles": profiles,
+            "match_seconds": seconds,
+            "postings_per_second": counts["postings"] / seconds if seconds else 0.0,
+            "candidates_per_posting": counts["candidates"] / counts["postings"] if counts["postings"] else 0.0,
+        }
+
+    # --- internals ----------------------------------------------------------
+
+    @staticmethod
+    def _verify(profile: tuple, doc: tuple) -> AlertMatch | None:
+        _, terms, location, level = doc
+        if profile[5] and profile[5] != level:
+            return None
+        if profile[4] and not profile[4] <= location:
+            return None
+        if profile[2]:
+            found = len(profile[2] & terms)
+            if found < profile[3]:
+                return None
+            return AlertMatch(profile[0], profile[1], doc[0], found / len(profile[2]))
+        return AlertMatch(profile[0], profile[1], doc[0], 1.0)
+
+    def _rarest(self, terms: frozenset, count: int) -> list[str]:
+        # 공고에서 드문 단어 우선, 아직 본 적 없으면 긴 단어(영문 단어)를 우선
+        return sorted(terms, key=lambda t: (self._posting_df.get(t, 0), -len(t), t))[:count]
+
+    def _append_locked(self, entry: tuple) -> None:
+        profile_id = len(self._profiles)
+        terms, needed, location, level = entry[2], entry[3], entry[4], entry[5]
+        anchor_terms = self._rarest(terms, len(terms) - needed + 1) if terms else [""]
+        # 지역 단어는 모두 일치해야 하므로 하나만 키에 넣으면 충분
+        location_term = self._rarest(location, 1)[0] if location else ""
+        self._profiles.append(entry[:6] + (len(anchor_terms) > 1,))
+        self._ids[entry[0]] = profile_id
+        for term in anchor_terms:
+            self._anchors.setdefault((term, level, location_term), array("I")).append(profile_id)
+            self._anchor_terms.add(term)
+        self._live += 1
+
+    def _remove_locked(self, profile_id: str) -> bool:
+        index = self._ids.pop(profile_id, None)
+        if index is None:
+            return False
+        self._profiles[index] = None
+        self._live -= 1
+        return True
+
+    def _maybe_compact_locked(self) -> None:
+        dead = len(self._profiles) - self._live
+        if dead > 1000 and dead * 4 > len(self._profiles):
+            self._rebuild_locked()
+
+    def _rebuild_locked(self) -> None:
+        """Drop removed profiles and re-pick every anchor from the current posting frequencies."""
+        entries = [entry for entry in self._profiles if entry is not None]
+        self._reset()
+        for entry in entries:
+            self._append_locked(entry)
+        self._anchored_at = self._seen
+
+
+# --- CLI ------------------------------------------------------------------------
+
+
+def read_profiles(path: str) -> Iterator[dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Match job postings against saved alert profiles")
+    parser.add_argument("postings", help="JSONL or CSV postings (JobRecommendation shape)")
+    parser.add_argument("--profiles", required=True, help="JSONL of {profile_id, user_id, query, location, experience_level}")
+    parser.add_argument("--output", help="Write one JSON line per match here")
+    parser.add_argument("--batch-size", type=int, default=512, help="Postings matched per micro-batch")
+    parser.add_argument("--min-match", type=float, default=0.75, help="Share of a profile's query terms that must match")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    matcher = AlertMatcher(min_match=args.min_match)
+    start = time.perf_counter()
+    profiles = matcher.add_many(read_profiles(args.profiles))
+    index_seconds = time.perf_counter() - start
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else None
+    try:
+        for _, matches in matcher.match_feed(read_postings(args.postings), args.batch_size):
+            if out is not None:
+                for match in matches:
+                    out.write(json.dumps(match._asdict(), ensure_ascii=False) + "\n")
+    finally:
+        if out is not None:
+            out.close()
+
+    report = {"profiles_indexed": profiles, "index_seconds": index_seconds, **matcher.stats()}
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
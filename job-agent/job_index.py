@@ -0,0 +1,348 @@
+"""
+In-memory BM25 index over job postings, used by the `search_jobs` tool.
+
+Postings are loaded from JSONL or CSV files (one posting per line/row in the
+`JobRecommendation` shape) and can be added, replaced or removed at any
+time. The index is kept compact so it can hold hundreds of thousands of
+postings:
+
+- postings lists are two parallel `array`s per term (doc ids, term counts)
+- documents are stored as plain tuples; `JobRecommendation` objects are only
+  built for the results that are returned
+- removed documents are tombstoned and the index is rebuilt once a quarter
+  of it is dead
+- each document's experience level and location are stored as small codes
+  in per-document arrays, so filters are checked while walking postings
+
+Searches are term-at-a-time BM25, rarest term first, with MaxScore
+pruning: once no posting outside the current candidates can reach the top
+`limit` (the remaining terms' score bound is below the `limit`-th score),
+the common terms only update the candidates. `total_found` is still exact;
+the remaining postings are counted, not scored.
+"""
+
+import csv
+import hashlib
+import heapq
+import json
+import math
+import os
+import threading
+import uuid
+from array import array
+from bisect import bisect_left
+from typing import Any, Iterable, Iterator
+
+from job_models import JobRecommendation, JobSearchResult
+from textutil import tokenize
+
+# 제목에 등장한 단어는 본문보다 가중치를 높게 (term frequency 배수)
+TITLE_BOOST = 3
+
+EXPERIENCE_LEVELS = {
+    "entry": "entry", "junior": "entry", "intern": "entry", "신입": "entry", "인턴": "entry", "주니어": "entry",
+    "mid": "mid", "middle": "mid", "intermediate": "mid", "경력": "mid", "미드": "mid",
+    "senior": "senior", "lead": "senior", "principal": "senior", "시니어": "senior", "리드": "senior",
+}
+LEVEL_CODES = {"": 0, "entry": 1, "mid": 2, "senior": 3}
+# 삭제된 문서의 level 코드 (필터 마스크에서 항상 제외)
+_DEAD = 0xFF
+# 위치 필터별로 캐시하는 문서 마스크 수
+_LOCATION_MASKS = 64
+# 건수 계산용 비트 집합을 캐시하는 흔한 단어 수와 최소 문서 빈도
+_TERM_BITS = 64
+_TERM_BITS_MIN_DF = 4096
+
+POSTING_FIELDS = ("job_id", "title", "company", "location", "salary_range", "description", "requirements", "experience_level")
+
+
+def normalize_experience_level(level: str | None) -> str:
+    """Map free-form levels ("Entry", "신입", "Senior") to entry/mid/senior ("" if unknown)."""
+    return EXPERIENCE_LEVELS.get((level or "").strip().lower(), "")
+
+
+def fallback_job_id(posting: dict[str, Any]) -> str:
+    """Stable id for a posting without `job_id`, derived from its content."""
+    key = "\0".join(str(posting.get(name) or "") for name in ("title", "company", "location", "description"))
+    return "posting-" + hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def read_postings(path: str) -> Iterator[dict[str, Any]]:
+    """Stream postings from a .jsonl/.json-lines or .csv file.
+
+    In CSV files `requirements` may be separated by ``|`` or ``;``.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                requirements = row.get("requirements") or ""
+                sep = "|" if "|" in requirements else ";"
+                row["requirements"] = [r.strip() for r in requirements.split(sep) if r.strip()]
+                yield row
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+class JobIndex:
+    """BM25 inverted index over job postings.
+
+    Args:
+        k1, b: BM25 parameters.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._docs: list[tuple | None] = []
+        self._ids: dict[str, int] = {}
+        self._doc_len = array("I")
+        # doc id -> experience level code (_DEAD once removed)
+        self._levels = bytearray()
+        self._postings: dict[str, tuple[array, array]] = {}
+        # doc id -> location code; code -> location terms (distinct locations are few)
+        self._doc_locations = array("I")
+        self._location_codes: dict[frozenset, int] = {}
+        self._location_terms: list[frozenset] = []
+        # location filter terms -> (code mask, doc mask), extended as documents are added
+        self._location_masks: dict[frozenset, tuple[bytearray, bytearray]] = {}
+        # common term -> (postings length, documents as bits), for counting matches without scoring them
+        self._term_bits: dict[str, tuple[int, int]] = {}
+        self._total_len = 0
+        self._live = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    # --- updates ----------------------------------------------------------
+
+    def add(self, posting: JobRecommendation | dict[str, Any]) -> None:
+        """Add a posting, replacing any posting with the same job_id."""
+        if isinstance(posting, JobRecommendation):
+            posting = posting.model_dump()
+        doc = tuple(posting.get(name) or ("" if name != "requirements" else []) for name in POSTING_FIELDS)
+        doc = doc[:6] + (tuple(doc[6]),) + doc[7:]
+        if not doc[0]:
+            doc = (fallback_job_id(posting),) + doc[1:]
+        with self._lock:
+            self._remove_locked(doc[0])
+            self._append_locked(doc)
+            self._maybe_compact_locked()
+
+    def add_many(self, postings: Iterable[JobRecommendation | dict[str, Any]]) -> int:
+        count = 0
+        for posting in postings:
+            self.add(posting)
+            count += 1
+        return count
+
+    def remove(self, job_id: str) -> bool:
+        with self._lock:
+            removed = self._remove_locked(job_id)
+            self._maybe_compact_locked()
+            return removed
+
+    def load(self, path: str) -> int:
+        """Ingest a JSONL or CSV file; returns the number of postings read."""
+        return self.add_many(read_postings(path))
+
+    # --- search -----------------------------------------------------------
+
+    def search(
+        self,
+        query: str,
+        location: str | None = None,
+        experience_level: str | None = None,
+        limit: int = 10,
+    ) -> JobSearchResult:
+        terms = set(tokenize(query))
+        with self._lock:
+            allowed = self._filter_mask(location, experience_level)
+            n_docs = max(self._live, 1)
+            avg_len = self._total_len / n_docs if self._live else 1.0
+            k1, doc_len = self.k1, self._doc_len
+            # BM25 길이 정규화 k1 * (1 - b + b * len / avg_len) = base + per_len * len
+            base, per_len = k1 * (1 - self.b), k1 * self.b / avg_len
+
+            entries = []
+            for term in terms:
+                if term in self._postings:
+                    doc_ids, tfs = self._postings[term]
+                    df = len(doc_ids)
+                    idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                    entries.append((doc_ids, tfs, idf, term))
+            entries.sort(key=lambda e: len(e[0]))
+            # 남은 단어들로 얻을 수 있는 점수의 상한 (BM25 단어 점수 < idf * (k1 + 1))
+            bounds = [0.0] * (len(entries) + 1)
+            for i in range(len(entries) - 1, -1, -1):
+                bounds[i] = bounds[i + 1] + entries[i][2] * (k1 + 1)
+
+            scores: dict[int, float] = {}
+            rest = len(entries)
+            for i, (doc_ids, tfs, idf, _) in enumerate(entries):
+                if limit and len(scores) >= limit and heapq.nlargest(limit, scores.values())[-1] >= bounds[i]:
+                    # 후보 밖의 공고는 상위 limit에 들 수 없음: 나머지 단어는 후보만 갱신
+                    rest = i
+                    break
+                weight, get = idf * (k1 + 1), scores.get
+                for doc_id, tf in zip(doc_ids, tfs):
+                    if allowed[doc_id]:
+                        scores[doc_id] = get(doc_id, 0.0) + weight * tf / (tf + base + per_len * doc_len[doc_id])
+
+            total_found = len(scores)
+            if rest < len(entries):
+                touched: set[int] = set()
+                matched = 0
+                for doc_ids, tfs, idf, term in entries[rest:]:
+                    df = len(doc_ids)
+                    if df > 8 * len(scores):
+                        pairs = []
+                        for doc_id in scores:
+                            j = bisect_left(doc_ids, doc_id)
+                            if j < df and doc_ids[j] == doc_id:
+                                pairs.append((doc_id, tfs[j]))
+                    else:
+                        pairs = [(d, tf) for d, tf in zip(doc_ids, tfs) if d in scores]
+                    weight = idf * (k1 + 1)
+                    for doc_id, tf in pairs:
+                        scores[doc_id] += weight * tf / (tf + base + per_len * doc_len[doc_id])
+                        touched.add(doc_id)
+                    matched |= self._doc_bits(term, doc_ids)
+                # 점수는 매기지 않은 나머지 일치 공고도 건수에는 포함 (후보는 모두 필터를 통과한 공고)
+                total_found += (matched & int.from_bytes(allowed, "little")).bit_count() - len(touched)
+
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            recommendations = [self._to_model(self._docs[doc_id]) for doc_id, _ in top]
+
+        return JobSearchResult(
+            search_id=str(uuid.uuid4()),
+            query=query,
+            recommendations=recommendations,
+            total_found=total_found,
+        )
+
+    # --- internals --------------------------------------------------------
+
+    def _append_locked(self, doc: tuple) -> None:
+        doc_id = len(self._docs)
+        self._docs.append(doc)
+        self._ids[doc[0]] = doc_id
+        self._levels.append(LEVEL_CODES[normalize_experience_level(doc[7])])
+
+        counts: dict[str, int] = {}
+        for term in tokenize(doc[1]):
+            counts[term] = counts.get(term, 0) + TITLE_BOOST
+        for text in (doc[2], doc[5], " ".join(doc[6])):
+            for term in tokenize(text):
+                counts[term] = counts.get(term, 0) + 1
+        for term, tf in counts.items():
+            entry = self._postings.get(term)
+            if entry is None:
+                entry = self._postings[term] = (array("I"), array("H"))
+            entry[0].append(doc_id)
+            entry[1].append(min(tf, 0xFFFF))
+        length = sum(counts.values())
+        self._doc_len.append(length)
+        self._total_len += length
+
+        location = frozenset(tokenize(doc[3]))
+        code = self._location_codes.get(location)
+        if code is None:
+            code = self._location_codes[location] = len(self._location_terms)
+            self._location_terms.append(location)
+        self._doc_locations.append(code)
+        self._live += 1
+
+    def _remove_locked(self, job_id: str) -> bool:
+        doc_id = self._ids.pop(job_id, None)
+        if doc_id is None:
+            return False
+        self._levels[doc_id] = _DEAD
+        self._docs[doc_id] = None
+        self._total_len -= self._doc_len[doc_id]
+        self._live -= 1
+        return True
+
+    def _maybe_compact_locked(self) -> None:
+        dead = len(self._docs) - self._live
+        if dead > 1000 and dead * 4 > len(self._docs):
+            docs = [doc for doc in self._docs if doc is not None]
+            self._reset()
+            for doc in docs:
+                self._append_locked(doc)
+
+    def _filter_mask(self, location: str | None, experience_level: str | None) -> bytes:
+        """Per-document 1/0 mask: live and passing the location and level filters."""
+        level = LEVEL_CODES[normalize_experience_level(experience_level)]
+        table = bytearray(256)
+        for code in LEVEL_CODES.values():
+            table[code] = 1 if not level or code == level else 0
+        mask = self._levels.translate(table)
+        terms = frozenset(tokenize(location or ""))
+        if terms:
+            # 문서 수만큼의 바이트 AND는 큰 정수 연산으로 한 번에
+            n = len(mask)
+            both = int.from_bytes(mask, "little") & int.from_bytes(self._location_mask(terms), "little")
+            mask = both.to_bytes(n, "little")
+        return mask
+
+    def _doc_bits(self, term: str, doc_ids: array) -> int:
+        """Documents of a postings list as an int with bit 8 * doc_id set (same layout as the filter mask)."""
+        cached = self._term_bits.get(term)
+        if cached is not None and cached[0] == len(doc_ids):
+            return cached[1]
+        buf = bytearray(len(self._levels))
+        for doc_id in doc_ids:
+            buf[doc_id] = 1
+        bits = int.from_bytes(buf, "little")
+        if len(doc_ids) >= _TERM_BITS_MIN_DF:
+            # 흔한 단어만 캐시 (짧은 목록은 매번 만들어도 빠름)
+            self._term_bits.pop(term, None)
+            self._term_bits[term] = (len(doc_ids), bits)
+            if len(self._term_bits) > _TERM_BITS:
+                del self._term_bits[next(iter(self._term_bits))]
+        return bits
+
+    def _location_mask(self, terms: frozenset) -> bytearray:
+        """Documents whose location contains all `terms`, cached and extended per filter."""
+        cached = self._location_masks.pop(terms, None)
+        codes, docs = cached or (bytearray(), bytearray())
+        if len(codes) < len(self._location_terms):
+            codes.extend(terms <= t for t in self._location_terms[len(codes):])
+        if len(docs) < len(self._doc_locations):
+            docs.extend(map(codes.__getitem__, self._doc_locations[len(docs):]))
+        self._location_masks[terms] = (codes, docs)
+        if len(self._location_masks) > _LOCATION_MASKS:
+            del self._location_masks[next(iter(self._location_masks))]
+        return docs
+
+    @staticmethod
+    def _to_model(doc: tuple) -> JobRecommendation:
+        return JobRecommendation(**dict(zip(POSTING_FIELDS, doc[:6] + (list(doc[6]),) + doc[7:])))
+
+
+def load_job_index() -> JobIndex:
+    """Index built from JOB_AGENT_POSTINGS_PATH (comma-separated files; empty if unset).
+
+    With JOB_AGENT_POSTINGS_DEDUP=1 the files go through `job_ingest` first,
+    so cross-posted near duplicates are indexed once.
+    """
+    index = JobIndex()
+    paths = [p.strip() for p in os.getenv("JOB_AGENT_POSTINGS_PATH", "").split(",") if p.strip()]
+    if os.getenv("JOB_AGENT_POSTINGS_DEDUP", "0") == "1":
+        from job_ingest import IngestPipeline, read_records
+
+        pipeline = IngestPipeline.from_env()
+        for path in paths:
+            index.add_many(pipeline.run(read_records(path)))
+        return index
+    for path in paths:
+        index.load(path)
+    return index
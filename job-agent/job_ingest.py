@@ -0,0 +1,487 @@
+"""
+Streaming ingest of job posting dumps with near-duplicate detection.
+
+The same role is often cross-posted many times (agencies, job boards,
+reposts with a new id). `IngestPipeline` is a chain of generators over a
+stream of raw records, so a dump of any size is read one record at a time:
+
+1. `read_records` streams JSONL or CSV files (optionally gzipped);
+   malformed lines are counted, not fatal.
+2. `normalize_posting` cleans the fields into the `JobRecommendation`
+   shape: NFKC text, single spaces, requirements as a list (``|`` / ``;``
+   separated strings are split), experience level as entry/mid/senior.
+3. `NearDuplicateIndex` drops postings whose text (title, company,
+   location, description, requirements) is a near copy of one already kept.
+
+Near duplicates are found with MinHash over word 3-shingles (Latin and
+Hangul words, `split_words`). Signatures use one-permutation hashing: each
+shingle is hashed once and kept as the minimum of one of `num_perm` bins,
+which estimates Jaccard similarity like `num_perm` separate permutations at
+the cost of one. Signatures are split into `bands` for LSH: postings
+sharing a band are candidates, and a candidate is a duplicate when the
+share of equal signature values is at least `threshold`. Words, shingles
+and bands are hashed with crc32, a fixed 64-bit mix and blake2b, never the
+per-process salted `hash()`, so every process and every run of the same
+input makes the same decisions.
+
+Memory is bounded by `window`: the index keeps the signatures of the last
+`window` kept postings in one flat `array` used as a ring, and forgets the
+oldest (and its LSH buckets) once it is full. Duplicates further apart than
+that are not detected. The LSH buckets are an open-addressing table in two
+arrays (band hash, slot) holding up to `BUCKET_SLOTS` postings per band
+value; when boilerplate fills a bucket, its oldest posting is replaced and
+can then only be found through its other bands.
+
+Usage:
+  python job_ingest.py dump.jsonl.gz --output unique.jsonl --duplicates duplicates.jsonl
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+import unicodedata
+import zlib
+from array import array
+from operator import eq
+from typing import Any, Iterable, Iterator
+
+from job_index import POSTING_FIELDS, fallback_job_id, normalize_experience_level
+from textutil import split_words
+
+_MASK32 = 0xFFFFFFFF
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+# shingle 해시용 64비트 곱셈 상수 (splitmix64)
+_MIX1 = 0x9E3779B97F4A7C15
+_MIX2 = 0xBF58476D1CE4E5B9
+# 비어 있는 bin을 채울 때 거리마다 더하는 값 (rotation densification)
+_ROTATION = 0x9E3779B1
+# band 값 하나에 기억하는 공고 수 (넘치면 가장 오래된 공고를 교체)
+BUCKET_SLOTS = 4
+
+
+# --- reading ------------------------------------------------------------------
+
+
+def _open_text(path: str, newline: str | None = None):
+    if path.lower().endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline=newline)
+    return open(path, encoding="utf-8", newline=newline)
+
+
+def read_records(path: str) -> Iterator[dict[str, Any] | None]:
+    """Stream raw records from a .jsonl/.csv file (also .jsonl.gz/.csv.gz).
+
+    Yields None for a line that is not a JSON object, so the caller can
+    count it and move on.
+    """
+    name = path.lower().removesuffix(".gz")
+    if name.endswith(".csv"):
+        with _open_text(path, newline="") as f:
+            yield from csv.DictReader(f)
+        return
+    with _open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield record if isinstance(record, dict) else None
+
+
+# --- normalization ------------------------------------------------------------
+
+
+def _clean(value: Any) -> str:
+    if value is None:
+        return ""
+    return " ".join(unicodedata.normalize("NFKC", str(value)).split())
+
+
+def normalize_posting(record: dict[str, Any]) -> dict[str, Any] | None:
+    """A record cleaned into the `JobRecommendation` shape, or None without a title."""
+    posting = {name: _clean(record.get(name)) for name in POSTING_FIELDS if name != "requirements"}
+    if not posting["title"]:
+        return None
+    requirements = record.get("requirements") or []
+    if isinstance(requirements, str):
+        requirements = requirements.split("|" if "|" in requirements else ";")
+    seen: set[str] = set()
+    posting["requirements"] = []
+    for requirement in requirements:
+        requirement = _clean(requirement)
+        if requirement and requirement.lower() not in seen:
+            seen.add(requirement.lower())
+            posting["requirements"].append(requirement)
+    posting["experience_level"] = normalize_experience_level(posting["experience_level"])
+    if not posting["job_id"]:
+        # id 없는 공고는 내용으로 고정 id를 만듦 (다시 적재해도 같은 id)
+        posting["job_id"] = fallback_job_id(posting)
+    return posting
+
+
+def posting_text(posting: dict[str, Any]) -> str:
+    """Text compared for near duplicates."""
+    return " ".join(
+        [posting["title"], posting["company"], posting["location"], posting["description"], *posting["requirements"]]
+    )
+
+
+# --- near-duplicate detection -------------------------------------------------
+
+
+class MinHasher:
+    """One-permutation MinHash signatures over word shingles.
+
+    Args:
+        num_perm: Signature length (bins).
+        shingle: Words per shingle.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle: int = 3):
+        self.num_perm = num_perm
+        self.shingle = shingle
+
+    def shingle_hashes(self, text: str) -> set[int]:
+        # 이미 NFKC로 정규화된 텍스트라 단어만 뽑음 (한글도 조사 차이가 드물어 bigram 대신 단어 단위)
+        words = [zlib.crc32(word.encode("utf-8")) for word in split_words(text)]
+        if not words:
+            return set()
+        hashes = words[: max(1, len(words) - self.shingle + 1)]
+        for i in range(1, min(self.shingle, len(words))):
+            hashes = [(h * _MIX1 + w) & _MASK64 for h, w in zip(hashes, words[i:])]
+        return {(h * _MIX2) & _MASK64 for h in hashes}
+
+    def signature(self, text: str) -> array | None:
+        """Signature of `text`, None when it has no terms."""
+        hashes = self.shingle_hashes(text)
+        if not hashes:
+            return None
+        k = self.num_perm
+        empty = _MASK32 + 1
+        bins = [empty] * k
+        for h in hashes:
+            # 가운데 비트로 bin을 고르고 상위 32비트를 그 bin의 값으로 씀 (곱셈 결과의 하위 비트는 덜 섞임)
+            b = (h >> 8) % k
+            v = h >> 32
+            if v < bins[b]:
+                bins[b] = v
+        if empty in bins:
+            # 빈 bin은 오른쪽으로 (원형) 가장 가까운 값 있는 bin의 값을 거리만큼 옮겨서 채움
+            original = bins[:]
+            source = None
+            for i in range(2 * k - 1, -1, -1):
+                if original[i % k] != empty:
+                    source = i
+                elif i < k and source is not None:
+                    bins[i] = (original[source % k] + (source - i) * _ROTATION) & _MASK32
+        return array("I", bins)
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index over the most recent `window` kept postings.
+
+    Args:
+        num_perm: Signature length.
+        bands: LSH bands (`num_perm` must be a multiple).
+        threshold: Estimated Jaccard similarity at which a posting is a duplicate.
+        window: Kept postings remembered; older ones are forgotten.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.8, window: int = 250_000):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.hasher = MinHasher(num_perm)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.window = window
+        # slot i의 서명은 _signatures[i * num_perm:(i + 1) * num_perm] (slot은 ring으로 재사용)
+        self._signatures = array("I")
+        self._job_ids: list[str] = []
+        # LSH bucket: open addressing (linear probing) 표, band 해시(0 = 빈 칸) / slot
+        self._keys = array("Q", bytes(8 * 1024))
+        self._slots = array("I", bytes(4 * 1024))
+        self._entries = 0
+        self._next = 0
+        self._evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._job_ids)
+
+    def check(self, posting: dict[str, Any]) -> tuple[str, float] | None:
+        """(job_id, similarity) of a kept near duplicate of `posting`, or remember it and return None."""
+        signature = self.hasher.signature(posting_text(posting))
+        if signature is None:
+            return None
+        keys = self._band_keys(signature)
+        k = self.num_perm
+        checked: set[int] = set()
+        for key in keys:
+            for slot in self._lookup(key):
+                if slot in checked:
+                    continue
+                checked.add(slot)
+                stored = self._signatures[slot * k:(slot + 1) * k]
+                similarity = sum(map(eq, signature, stored)) / k
+                if similarity >= self.threshold:
+                    return self._job_ids[slot], similarity
+        self._add(posting["job_id"], signature, keys)
+        return None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "signatures": len(self._job_ids),
+            "bucket_entries": self._entries,
+            "evicted": self._evicted,
+            "signature_bytes": self._signatures.itemsize * len(self._signatures),
+            "bucket_bytes": self._keys.itemsize * len(self._keys) + self._slots.itemsize * len(self._slots),
+        }
+
+    # --- internals ----------------------------------------------------------
+
+    def _band_keys(self, signature: array) -> list[int]:
+        raw = signature.tobytes()
+        width = self.rows * signature.itemsize
+        keys = []
+        for band in range(self.bands):
+            digest = hashlib.blake2b(raw[band * width:(band + 1) * width], digest_size=8, salt=band.to_bytes(16, "little"))
+            keys.append(int.from_bytes(digest.digest(), "little") or 1)
+        return keys
+
+    def _add(self, job_id: str, signature: array, keys: list[int]) -> None:
+        k = self.num_perm
+        if len(self._job_ids) < self.window:
+            slot = len(self._job_ids)
+            self._signatures.extend(signature)
+            self._job_ids.append(job_id)
+        else:
+            # 가장 오래된 slot을 비우고 재사용 (그 slot의 bucket 항목만 삭제)
+            slot = self._next
+            self._next = (slot + 1) % self.window
+            for key in self._band_keys(self._signatures[slot * k:(slot + 1) * k]):
+                self._delete(key, slot)
+            self._signatures[slot * k:(slot + 1) * k] = signature
+            self._job_ids[slot] = job_id
+            self._evicted += 1
+        for key in keys:
+            self._insert(key, slot)
+
+    def _lookup(self, key: int) -> list[int]:
+        keys, mask = self._keys, len(self._keys) - 1
+        i = key & mask
+        found = []
+        while keys[i]:
+            if keys[i] == key:
+                found.append(self._slots[i])
+            i = (i + 1) & mask
+        return found
+
+    def _insert(self, key: int, slot: int) -> None:
+        if 2 * (self._entries + 1) > len(self._keys):
+            self._resize(2 * len(self._keys))
+        keys, mask = self._keys, len(self._keys) - 1
+        i = key & mask
+        first, count = -1, 0
+        while keys[i]:
+            if keys[i] == key:
+                if self._slots[i] == slot:
+                    return
+                if first < 0:
+                    first = i
+                count += 1
+            i = (i + 1) & mask
+        if count >= BUCKET_SLOTS:
+            # 같은 band 값의 항목은 대체로 넣은 순서대로 놓이므로 처음 만난 항목을 교체
+            self._delete_at(first)
+            self._insert(key, slot)
+            return
+        keys[i] = key
+        self._slots[i] = slot
+        self._entries += 1
+
+    def _delete(self, key: int, slot: int) -> None:
+        keys, mask = self._keys, len(self._keys) - 1
+        i = key & mask
+        while keys[i]:
+            if keys[i] == key and self._slots[i] == slot:
+                self._delete_at(i)
+                return
+            i = (i + 1) & mask
+
+    def _delete_at(self, i: int) -> None:
+        # linear probing 삭제: 뒤따르는 항목을 당겨와 빈 칸 없이 유지 (tombstone 없음)
+        keys, slots, mask = self._keys, self._slots, len(self._keys) - 1
+        j = i
+        while True:
+            j = (j + 1) & mask
+            key = keys[j]
+            if not key:
+                break
+            home = key & mask
+            # home이 (i, j] 구간(원형) 안이면 그 자리에 둠, 밖이면 i로 당겨도 탐색 경로가 끊기지 않음
+            if (i < home <= j) if i <= j else (home > i or home <= j):
+                continue
+            keys[i], slots[i] = key, slots[j]
+            i = j
+        keys[i] = 0
+        self._entries -= 1
+
+    def _resize(self, size: int) -> None:
+        old_keys, old_slots = self._keys, self._slots
+        self._keys = array("Q", bytes(8 * size))
+        self._slots = array("I", bytes(4 * size))
+        self._entries = 0
+        keys, slots, mask = self._keys, self._slots, size - 1
+        for key, slot in zip(old_keys, old_slots):
+            if key:
+                i = key & mask
+                while keys[i]:
+                    i = (i + 1) & mask
+                keys[i], slots[i] = key, slot
+                self._entries += 1
+
+
+# --- pipeline -----------------------------------------------------------------
+
+
+class IngestPipeline:
+    """Normalize and deduplicate a stream of raw posting records.
+
+    Args:
+        dedup: Near-duplicate index (default `NearDuplicateIndex()`); None keeps every posting.
+        on_duplicate: Called with (posting, kept job_id, similarity) for each dropped duplicate.
+    """
+
+    def __init__(self, dedup: NearDuplicateIndex | None = None, on_duplicate=None):
+        self.dedup = dedup
+        self.on_duplicate = on_duplicate
+        self._counters = {"records": 0, "invalid": 0, "duplicates": 0, "unique": 0}
+        self._seconds = 0.0
+
+    @classmethod
+    def from_env(cls, on_duplicate=None) -> "IngestPipeline":
+        dedup = None
+        if os.getenv("JOB_AGENT_POSTINGS_DEDUP", "0") == "1":
+            dedup = NearDuplicateIndex(
+                threshold=float(os.getenv("JOB_AGENT_POSTINGS_DEDUP_THRESHOLD", "0.8")),
+                window=int(os.getenv("JOB_AGENT_POSTINGS_DEDUP_WINDOW", "250000")),
+            )
+        return cls(dedup, on_duplicate)
+
+    def run(self, records: Iterable[dict[str, Any] | None]) -> Iterator[dict[str, Any]]:
+        """Deduplicated, normalized postings, one at a time."""
+        return self.deduplicated(self.normalized(records))
+
+    def normalized(self, records: Iterable[dict[str, Any] | None]) -> Iterator[dict[str, Any]]:
+        for record in records:
+            self._counters["records"] += 1
+            posting = normalize_posting(record) if record is not None else None
+            if posting is None:
+                self._counters["invalid"] += 1
+                continue
+            yield posting
+
+    def deduplicated(self, postings: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        for posting in postings:
+            start = time.perf_counter()
+            duplicate = self.dedup.check(posting) if self.dedup is not None else None
+            self._seconds += time.perf_counter() - start
+            if duplicate is not None:
+                self._counters["duplicates"] += 1
+                if self.on_duplicate is not None:
+                    self.on_duplicate(posting, *duplicate)
+                continue
+            self._counters["unique"] += 1
+            yield posting
+
+    def stats(self) -> dict[str, Any]:
+        counts = dict(self._counters)
+        valid = counts["records"] - counts["invalid"]
+        return {
+            **counts,
+            "duplicate_ratio": counts["duplicates"] / valid if valid else 0.0,
+            "dedup_seconds": self._seconds,
+            **({"dedup": self.dedup.stats()} if self.dedup is not None else {}),
+        }
+
+
+# --- CLI ------------------------------------------------------------------------
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Normalize and deduplicate job posting dumps")
+    parser.add_argument("inputs", nargs="+", help="JSONL or CSV dumps (optionally .gz), read in order")
+    parser.add_argument("--output", help="Write unique postings as JSONL here (.gz to compress)")
+    parser.add_argument("--duplicates", help="Write {job_id, duplicate_of, similarity} per dropped duplicate")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Estimated Jaccard similarity of a duplicate")
+    parser.add_argument("--num-perm", type=int, default=64, help="MinHash signature length")
+    parser.add_argument("--bands", type=int, default=16, help="LSH bands")
+    parser.add_argument("--window", type=int, default=250_000, help="Kept postings remembered for deduplication")
+    parser.add_argument("--no-dedup", action="store_true", help="Only normalize")
+    parser.add_argument("--progress", type=int, default=0, help="Print progress to stderr every N unique postings")
+    return parser.parse_args(argv)
+
+
+def _open_output(path: str | None):
+    if not path:
+        return None
+    if path.lower().endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "wb"), encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    out = _open_output(args.output)
+    duplicates_out = _open_output(args.duplicates)
+
+    def on_duplicate(posting: dict[str, Any], kept: str, similarity: float) -> None:
+        if duplicates_out is not None:
+            record = {"job_id": posting["job_id"], "duplicate_of": kept, "similarity": round(similarity, 3)}
+            duplicates_out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    dedup = None if args.no_dedup else NearDuplicateIndex(args.num_perm, args.bands, args.threshold, args.window)
+    pipeline = IngestPipeline(dedup, on_duplicate)
+    records = (record for path in args.inputs for record in read_records(path))
+
+    start = time.perf_counter()
+    kept = 0
+    try:
+        for posting in pipeline.run(records):
+            if out is not None:
+                out.write(json.dumps(posting, ensure_ascii=False) + "\n")
+            kept += 1
+            if args.progress and kept % args.progress == 0:
+                print(json.dumps(pipeline.stats()), file=sys.stderr)
+    finally:
+        for f in (out, duplicates_out):
+            if f is not None:
+                f.close()
+    elapsed = time.perf_counter() - start
+
+    stats = pipeline.stats()
+    input_bytes = sum(os.path.getsize(path) for path in args.inputs)
+    report = {
+        "inputs": args.inputs,
+        "output": args.output,
+        **stats,
+        "elapsed_seconds": elapsed,
+        "records_per_second": stats["records"] / elapsed if elapsed else 0.0,
+        "input_megabytes_per_second": input_bytes / 1e6 / elapsed if elapsed else 0.0,
+    }
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Job posting models shared by the job search tool, the ingest pipeline and alerts.
+"""
+
+from pydantic import BaseModel
+
+
+class JobRecommendation(BaseModel):
+    job_id: str
+    title: str
+    company: str
+    location: str
+    salary_range: str = ""
+    description: str = ""
+    requirements: list[str] = []
+    experience_level: str = ""
+
+
+class JobSearchResult(BaseModel):
+    search_id: str
+    query: str
+    recommendations: list[JobRecommendation]
+    total_found: int
+
+
+class JobAlertProfile(BaseModel):
+    """Saved search criteria of a user, matched against new postings (job_alerts.py)."""
+
+    profile_id: str
+    user_id: str = ""
+    query: str = ""
+    location: str = ""
+    experience_level: str = ""
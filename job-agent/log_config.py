@@ -0,0 +1,38 @@
+"""
+Leveled, non-blocking logging for the server.
+
+Records are put on an in-memory queue by a `QueueHandler` and written to
+stderr by a `QueueListener` thread, so request handlers never block on the
+console. JOB_AGENT_LOG_LEVEL sets the level (default INFO).
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def configure_logging(level: str | None = None) -> None:
+    global _listener
+    if _listener is not None:
+        return
+    level = (level or os.getenv("JOB_AGENT_LOG_LEVEL", "INFO")).upper()
+
+    records: queue.Queue = queue.Queue(-1)
+    console = logging.StreamHandler()
+    # 멀티 프로세스 모드(dispatcher)의 워커는 로그에 워커 번호 표시
+    worker = os.getenv("JOB_AGENT_WORKER_INDEX")
+    prefix = f"[worker {worker}] " if worker else ""
+    console.setFormatter(logging.Formatter(f"%(asctime)s %(levelname)s {prefix}%(name)s: %(message)s"))
+    _listener = logging.handlers.QueueListener(records, console, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.setLevel(level)
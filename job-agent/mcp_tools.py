@@ -0,0 +1,133 @@
+"""
+Agent tools served by a remote MCP server (JOB_AGENT_MCP_URL), e.g.
+`web_search_server.py --transport streamable-http`.
+
+`McpToolset` keeps one streamable-HTTP session open for the life of the
+process instead of opening a session (or spawning a stdio server) per tool
+call. The session is owned by a background task on the server's event loop;
+tool calls are concurrent requests on it, over the pooled connections of its
+httpx client. The tools are loaded with langchain-mcp-adapters, with the
+toolset standing in for the `ClientSession`, so when the session drops the
+next call waits for the reconnect instead of failing for good.
+
+Several agent instances pointed at the same server share its search cache.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import timedelta
+from typing import Any
+
+from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+
+class McpToolset:
+    """Tools of one MCP server over a persistent streamable-HTTP session.
+
+    Args:
+        url: Server endpoint, e.g. ``http://localhost:8001/mcp``.
+        connect_timeout: Seconds to wait for the session when connecting.
+        call_timeout: Seconds a single tool call may take.
+    """
+
+    def __init__(self, url: str, connect_timeout: float = 10.0, call_timeout: float = 30.0):
+        self.url = url
+        self.connect_timeout = connect_timeout
+        self.call_timeout = call_timeout
+
+        self._session = None
+        self._ready = asyncio.Event()
+        # 세션을 닫고 다시 연결하라는 신호 (close 또는 호출 실패)
+        self._drop = asyncio.Event()
+        self._closing = False
+        self._task: asyncio.Task | None = None
+        self._counters = {"connects": 0, "calls": 0, "errors": 0}
+
+    @classmethod
+    def from_env(cls) -> "McpToolset | None":
+        url = os.getenv("JOB_AGENT_MCP_URL")
+        if not url:
+            return None
+        return cls(
+            url,
+            connect_timeout=float(os.getenv("JOB_AGENT_MCP_CONNECT_TIMEOUT", "10")),
+            call_timeout=float(os.getenv("JOB_AGENT_MCP_CALL_TIMEOUT", "30")),
+        )
+
+    async def start(self) -> list[BaseTool]:
+        """Open the session on the running loop and load the server's tools."""
+        from langchain_mcp_adapters.tools import load_mcp_tools
+
+        self._task = asyncio.create_task(self._run(), name="mcp-session")
+        await asyncio.wait_for(self._ready.wait(), self.connect_timeout)
+        tools = await load_mcp_tools(self)
+        logger.info("loaded MCP tools %s from %s", [t.name for t in tools], self.url)
+        return tools
+
+    async def close(self) -> None:
+        self._closing = True
+        self._drop.set()
+        if self._task is not None:
+            # 연결 중(또는 재연결 대기 중)이면 기다리지 않고 취소
+            await asyncio.wait({self._task}, timeout=5.0)
+            self._task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        return {**self._counters, "connected": self._session is not None}
+
+    # --- ClientSession subset used by langchain-mcp-adapters ---------------------
+
+    async def list_tools(self, cursor: str | None = None):
+        session = await self._live()
+        return await session.list_tools(cursor=cursor)
+
+    async def call_tool(self, name: str, arguments: dict[str, Any] | None = None, **kwargs: Any):
+        session = await self._live()
+        self._counters["calls"] += 1
+        try:
+            return await session.call_tool(
+                name, arguments, read_timeout_seconds=timedelta(seconds=self.call_timeout), **kwargs
+            )
+        except Exception:
+            # 도구 자체의 오류는 isError 결과로 오므로, 예외는 세션/연결 문제
+            self._counters["errors"] += 1
+            if session is self._session:
+                self._drop.set()
+            raise
+
+    # --- internals --------------------------------------------------------------
+
+    async def _live(self):
+        await self._ready.wait()
+        return self._session
+
+    async def _run(self) -> None:
+        from langchain_mcp_adapters.sessions import create_session
+
+        connection = {"transport": "streamable_http", "url": self.url}
+        backoff = 0.5
+        while not self._closing:
+            try:
+                # 세션의 task group은 연 task에서 닫아야 하므로 이 task가 세션을 소유
+                async with create_session(connection) as session:
+                    await session.initialize()
+                    self._session = session
+                    self._counters["connects"] += 1
+                    self._ready.set()
+                    backoff = 0.5
+                    await self._drop.wait()
+            except Exception as e:
+                # anyio task group 오류는 ExceptionGroup으로 감싸져 옴
+                while isinstance(e, BaseExceptionGroup) and e.exceptions:
+                    e = e.exceptions[0]
+                logger.warning("MCP session to %s failed: %s: %s", self.url, type(e).__name__, e)
+            finally:
+                self._ready.clear()
+                self._session = None
+                self._drop.clear()
+            if not self._closing:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
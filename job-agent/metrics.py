@@ -0,0 +1,132 @@
+"""
+In-process latency histograms behind the `/metrics` endpoint.
+
+Histograms use fixed, log-spaced buckets (1 ms .. ~2 min, 25% apart), so
+recording is O(log buckets) with no per-sample storage, and p50/p95/p99 are
+interpolated from the bucket counts (within one bucket width of the true
+value). Component counters (caches, search client, tool guard, ...) are
+pulled from `stats()` callables registered with `register_stats`.
+"""
+
+import bisect
+import threading
+from typing import Any, Callable
+
+_BUCKET_START = 0.001
+_BUCKET_FACTOR = 1.25
+_BUCKET_COUNT = 56
+BUCKETS = [_BUCKET_START * _BUCKET_FACTOR ** i for i in range(_BUCKET_COUNT)]
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # counts[i]: samples <= BUCKETS[i] (and > BUCKETS[i-1]); last slot is overflow
+        self._counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        index = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        with self._lock:
+            return self._quantile(q, list(self._counts), self.count, self.max)
+
+    @staticmethod
+    def _quantile(q: float, counts: list[int], count: int, maximum: float) -> float:
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if bucket_count and seen + bucket_count >= rank:
+                low = BUCKETS[index - 1] if index > 0 else 0.0
+                high = BUCKETS[index] if index < len(BUCKETS) else maximum
+                value = low + (high - low) * (rank - seen) / bucket_count
+                return min(value, maximum)
+            seen += bucket_count
+        return maximum
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counts, count, total, maximum = list(self._counts), self.count, self.sum, self.max
+        result = {"count": count, "sum": total, "max": maximum}
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}"] = self._quantile(q, counts, count, maximum)
+        result["buckets"] = {f"{bound:.4g}": c for bound, c in zip(BUCKETS + [float("inf")], counts) if c}
+        return result
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: dict[str, Histogram] = {}
+        self._stats: dict[str, Callable[[], Any]] = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram())
+        histogram.observe(seconds)
+
+    def register_stats(self, name: str, stats: Callable[[], Any]) -> None:
+        """Include `stats()` under `name` in snapshots (e.g. a cache's counters)."""
+        with self._lock:
+            self._stats[name] = stats
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            histograms = dict(self._histograms)
+            stats = dict(self._stats)
+        components = {}
+        for name, fn in stats.items():
+            try:
+                components[name] = fn()
+            except Exception as e:
+                components[name] = {"error": str(e)}
+        return {
+            "latency_seconds": {name: h.snapshot() for name, h in sorted(histograms.items())},
+            "components": components,
+        }
+
+    def prometheus(self) -> str:
+        """Latency histograms in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = dict(self._histograms)
+        lines = [
+            "# HELP job_agent_latency_seconds Span latency by span name.",
+            "# TYPE job_agent_latency_seconds histogram",
+        ]
+        quantile_lines = [
+            "# HELP job_agent_latency_quantile_seconds Interpolated span latency quantiles.",
+            "# TYPE job_agent_latency_quantile_seconds gauge",
+        ]
+        for name, histogram in sorted(histograms.items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            with histogram._lock:
+                counts, count, total, maximum = list(histogram._counts), histogram.count, histogram.sum, histogram.max
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, counts):
+                cumulative += bucket_count
+                lines.append(f'job_agent_latency_seconds_bucket{{span="{label}",le="{bound:.4g}"}} {cumulative}')
+            lines.append(f'job_agent_latency_seconds_bucket{{span="{label}",le="+Inf"}} {count}')
+            lines.append(f'job_agent_latency_seconds_sum{{span="{label}"}} {total}')
+            lines.append(f'job_agent_latency_seconds_count{{span="{label}"}} {count}')
+            for q in QUANTILES:
+                value = Histogram._quantile(q, counts, count, maximum)
+                quantile_lines.append(f'job_agent_latency_quantile_seconds{{span="{label}",quantile="{q}"}} {value}')
+        return "\n".join(lines + quantile_lines) + "\n"
+
+
+metrics = MetricsRegistry()
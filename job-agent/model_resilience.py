@@ -0,0 +1,476 @@
+"""
+Resilient model calls: retries, hedging, circuit breakers and a fallback
+model chain behind one chat model, so the graph code does not change.
+
+`ResilientChatModel` wraps the primary model and the JOB_AGENT_FALLBACK_MODELS
+chain. Each model call:
+
+1. Goes to the first model in the chain whose circuit breaker is closed
+   (or half-open, allowing one trial call).
+2. Is hedged: if no answer has arrived after the model's recent p95
+   latency (time to first chunk when streaming), the same request is sent
+   again and whichever answers first wins; the other one is cancelled and
+   its stream closed. The p95 is taken over every attempt that ends,
+   timeouts and hedge losers included (a cancelled loser counts with the
+   time it had run), so hedging does not drift towards ever shorter delays.
+3. Is retried on transient errors (timeouts, 429/5xx) with jittered
+   exponential backoff. A request that hangs past `call_timeout` counts as
+   such an error.
+4. Moves on to the next model in the chain when retries are used up or the
+   breaker opens (`failure_threshold` failures in a row; the breaker stays
+   open for `cooldown` seconds, then lets one trial call through).
+
+When every model fails, `ModelUnavailable` (an `Overloaded`, answered with
+503 and Retry-After) is raised. Errors that a retry cannot fix (bad
+request, permission) are raised as they are.
+
+Streaming is hedged and retried only up to the first chunk; once tokens are
+flowing the call is committed to one model. The inner calls are tagged
+"nostream" so LangGraph streams only the wrapper's tokens, and token usage
+is counted on the inner calls (the model that actually served them).
+
+Per-model latency samples, breakers and counters are process-wide, so tool-
+bound copies and several chains using the same model share them; `stats`
+reports them.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable
+
+from langchain_core.callbacks import AsyncCallbackManager, AsyncCallbackManagerForLLMRun, CallbackManager
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from admission import Overloaded
+from textutil import content_text
+
+logger = logging.getLogger(__name__)
+
+# HTTP 상태 코드 기준 재시도 가능한 오류 (google.api_core 예외의 .code, httpx 등의 .status_code)
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {
+    "ResourceExhausted",
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "InternalServerError",
+    "BadGateway",
+    "GatewayTimeout",
+    "TooManyRequests",
+    "Aborted",
+    "RetryError",
+}
+# 최근 지연 시간 표본 수, hedge 지연을 p95로 잡기 위한 최소 표본 수
+LATENCY_SAMPLES = 200
+MIN_HEDGE_SAMPLES = 20
+# LangGraph "messages" 스트림에서 제외되는 태그 (langgraph.constants.TAG_NOSTREAM)
+NOSTREAM_TAG = "nostream"
+
+
+class ModelUnavailable(Overloaded):
+    """Every model in the chain failed or has its circuit breaker open."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("model_unavailable", retry_after, 503)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether `error` is transient (timeout, rate limit, 5xx) rather than a bad request."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    if getattr(error, "retryable", False):
+        return True
+    for attr in ("code", "status_code"):
+        value = getattr(error, attr, None)
+        try:
+            if int(value) in RETRYABLE_STATUS:
+                return True
+        except (TypeError, ValueError):
+            pass
+    return type(error).__name__ in RETRYABLE_ERRORS
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over consecutive failures.
+
+    Args:
+        failure_threshold: Failures in a row that open the breaker.
+        cooldown: Seconds the breaker stays open before a trial call.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = time.monotonic()
+            if self.state == "open" and now - self._opened_at >= self.cooldown:
+                self.state = "half_open"
+            # half-open: 시험 호출 하나만 허용 (취소되어 결과가 없으면 cooldown 뒤 다시 허용)
+            if self.state == "half_open" and now - self._trial_at >= self.cooldown:
+                self._trial_at = now
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self.state == "closed":
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - max(self._opened_at, self._trial_at)))
+
+    def success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._trial_at = 0.0
+
+    def failure(self) -> bool:
+        """Record a failure; True if the breaker is (now) open."""
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning("circuit breaker opened after %d failures", self._failures)
+                self.state = "open"
+                self._opened_at = time.monotonic()
+            return self.state == "open"
+
+
+class _ModelState:
+    """Latency samples, breaker and counters of one upstream model."""
+
+    def __init__(self, name: str, breaker: CircuitBreaker):
+        self.name = name
+        self.breaker = breaker
+        # streaming 여부별: 전체 응답 시간 / 첫 chunk까지의 시간
+        self.latencies = {False: deque(maxlen=LATENCY_SAMPLES), True: deque(maxlen=LATENCY_SAMPLES)}
+        self.counters = {
+            "calls": 0,
+            "errors": 0,
+            "retries": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "fallback_calls": 0,
+            "short_circuited": 0,
+        }
+
+    def quantile(self, stream: bool, q: float) -> float | None:
+        samples = sorted(self.latencies[stream])
+        if len(samples) < MIN_HEDGE_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def stats(self) -> dict[str, Any]:
+        p95 = self.quantile(False, 0.95)
+        p95_first_chunk = self.quantile(True, 0.95)
+        return {
+            **self.counters,
+            "breaker": self.breaker.state,
+            "p95_seconds": p95,
+            "p95_first_chunk_seconds": p95_first_chunk,
+        }
+
+
+_states_lock = threading.Lock()
+_states: dict[str, _ModelState] = {}
+
+
+def model_state(name: str, failure_threshold: int = 5, cooldown: float = 30.0) -> _ModelState:
+    """Process-wide state of model `name` (created on first use)."""
+    with _states_lock:
+        if name not in _states:
+            _states[name] = _ModelState(name, CircuitBreaker(failure_threshold, cooldown))
+        return _states[name]
+
+
+def stats() -> dict[str, dict[str, Any]]:
+    with _states_lock:
+        states = list(_states.values())
+    return {state.name: state.stats() for state in states}
+
+
+def _inner_config(run_manager) -> dict[str, Any]:
+    """Config for the inner model calls: children of the wrapper's run, hidden from the message stream."""
+    config: dict[str, Any] = {"tags": [NOSTREAM_TAG]}
+    if run_manager is not None:
+        manager_cls = AsyncCallbackManager if isinstance(run_manager, AsyncCallbackManagerForLLMRun) else CallbackManager
+        config["callbacks"] = manager_cls(
+            handlers=run_manager.inheritable_handlers,
+            inheritable_handlers=run_manager.inheritable_handlers,
+            parent_run_id=run_manager.run_id,
+            tags=run_manager.inheritable_tags,
+            inheritable_tags=run_manager.inheritable_tags,
+            metadata=run_manager.inheritable_metadata,
+            inheritable_metadata=run_manager.inheritable_metadata,
+        )
+    return config
+
+
+def _served(message: AIMessage, name: str | None) -> AIMessage:
+    # 토큰 사용량은 실제로 응답한 내부 호출에서 집계되므로 바깥 메시지에서는 model_name을 뺌
+    metadata = {k: v for k, v in message.response_metadata.items() if k != "model_name"}
+    if name is not None:
+        # 스트리밍에서는 첫 chunk에만 표시 (chunk를 합칠 때 문자열 값은 이어 붙여지므로)
+        metadata["served_by"] = name
+    return message.model_copy(update={"response_metadata": metadata})
+
+
+class ResilientChatModel(BaseChatModel):
+    """A chain of chat models behind retries, hedging and circuit breakers.
+
+    Attributes:
+        models: Chat models (or tool-bound runnables), primary first.
+        names: Model names, used for breakers, stats and logs.
+        retries: Retries per model on transient errors.
+        call_timeout: Seconds one call may take (to the first chunk when streaming).
+        hedge: Send a second request when the first is slower than `hedge_quantile`.
+        hedge_quantile: Latency quantile after which to hedge.
+        hedge_delay: Hedge delay until enough latency samples are collected.
+        hedge_min_delay: Lower bound of the hedge delay.
+        backoff: Base of the jittered exponential retry backoff, in seconds.
+        max_backoff: Upper bound of one backoff.
+        failure_threshold: Failures in a row that open a model's breaker.
+        cooldown: Seconds a breaker stays open.
+    """
+
+    models: list[Any]
+    names: list[str]
+    retries: int = 2
+    call_timeout: float = 60.0
+    hedge: bool = True
+    hedge_quantile: float = 0.95
+    hedge_delay: float = 2.0
+    hedge_min_delay: float = 0.05
+    backoff: float = 0.2
+    max_backoff: float = 5.0
+    failure_threshold: int = 5
+    cooldown: float = 30.0
+
+    @classmethod
+    def from_env(cls, names: list[str], get_model: Callable[[str], Any]) -> "ResilientChatModel":
+        """Chain of `names` (clients from `get_model`), configured from env."""
+        return cls(
+            models=[get_model(name) for name in names],
+            names=names,
+            retries=int(os.getenv("JOB_AGENT_MODEL_RETRIES", "2")),
+            call_timeout=float(os.getenv("JOB_AGENT_MODEL_TIMEOUT", "60")),
+            hedge=os.getenv("JOB_AGENT_HEDGE", "1") != "0",
+            hedge_quantile=float(os.getenv("JOB_AGENT_HEDGE_QUANTILE", "0.95")),
+            hedge_delay=float(os.getenv("JOB_AGENT_HEDGE_DELAY", "2.0")),
+            failure_threshold=int(os.getenv("JOB_AGENT_BREAKER_FAILURES", "5")),
+            cooldown=float(os.getenv("JOB_AGENT_BREAKER_COOLDOWN", "30")),
+        )
+
+    @property
+    def model_name(self) -> str:
+        return self.names[0]
+
+    @property
+    def _llm_type(self) -> str:
+        return "resilient-chat"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"models": self.names, "retries": self.retries, "hedge": self.hedge}
+
+    def _get_ls_params(self, stop=None, **kwargs):
+        # 바깥 호출(재시도/hedge 포함)과 실제 모델 호출이 서로 다른 span으로 집계되도록
+        params = super()._get_ls_params(stop=stop, **kwargs)
+        params["ls_model_name"] = f"resilient:{self.names[0]}"
+        return params
+
+    def bind_tools(self, tools, **kwargs):
+        # 체인의 모든 모델에 같은 도구를 바인딩 (상태는 모델 이름 기준으로 공유)
+        return self.model_copy(update={"models": [m.bind_tools(tools, **kwargs) for m in self.models]})
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {name: self._state(name).stats() for name in self.names}
+
+    # --- BaseChatModel --------------------------------------------------------
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        async def call(model, config):
+            return await model.ainvoke(messages, config, stop=stop, **kwargs)
+
+        name, message = await self._arun(call, run_manager, stream=False)
+        return ChatResult(generations=[ChatGeneration(message=_served(message, name))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        async def first_chunk(model, config):
+            stream = model.astream(messages, config, stop=stop, **kwargs)
+            try:
+                return stream, await anext(stream)
+            except BaseException:
+                await stream.aclose()
+                raise
+
+        name, (stream, first) = await self._arun(first_chunk, run_manager, stream=True)
+        try:
+            chunk = first
+            while True:
+                if isinstance(chunk, AIMessageChunk):
+                    chunk = _served(chunk, name if chunk is first else None)
+                    generation = ChatGenerationChunk(message=chunk)
+                    if run_manager and chunk.content:
+                        await run_manager.on_llm_new_token(content_text(chunk.content), chunk=generation)
+                    yield generation
+                try:
+                    chunk = await anext(stream)
+                except StopAsyncIteration:
+                    break
+        finally:
+            await stream.aclose()
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        # 동기 경로: hedge 없이 재시도와 대체 모델만 적용
+        config = _inner_config(run_manager)
+        last_error: BaseException | None = None
+        for i, (name, model) in enumerate(zip(self.names, self.models)):
+            state = self._state(name)
+            if not state.breaker.allow():
+                state.counters["short_circuited"] += 1
+                continue
+            state.counters["fallback_calls"] += i > 0
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    state.counters["retries"] += 1
+                    time.sleep(self._backoff(attempt))
+                state.counters["calls"] += 1
+                try:
+                    message = model.invoke(messages, config, stop=stop, **kwargs)
+                except Exception as e:
+                    if not is_retryable(e):
+                        raise
+                    last_error = e
+                    state.counters["errors"] += 1
+                    if state.breaker.failure():
+                        break
+                    continue
+                state.breaker.success()
+                return ChatResult(generations=[ChatGeneration(message=_served(message, name))])
+        raise self._unavailable() from last_error
+
+    # --- internals --------------------------------------------------------------
+
+    def _state(self, name: str) -> _ModelState:
+        return model_state(name, self.failure_threshold, self.cooldown)
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter: 동시에 실패한 요청들이 같은 시점에 몰려 재시도하지 않도록
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _unavailable(self) -> ModelUnavailable:
+        waits = [self._state(name).breaker.retry_after() for name in self.names]
+        return ModelUnavailable(retry_after=max(1, int(min(waits) + 0.999)))
+
+    async def _arun(self, call, run_manager, stream: bool) -> tuple[str, Any]:
+        """(model name, result of `call`) from the first model of the chain that answers."""
+        config = _inner_config(run_manager)
+        last_error: BaseException | None = None
+        for i, (name, model) in enumerate(zip(self.names, self.models)):
+            state = self._state(name)
+            if not state.breaker.allow():
+                state.counters["short_circuited"] += 1
+                continue
+            if i:
+                state.counters["fallback_calls"] += 1
+                if last_error is not None:
+                    logger.warning("model %s failing, falling back to %s", self.names[i - 1], name)
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    state.counters["retries"] += 1
+                    await asyncio.sleep(self._backoff(attempt))
+                try:
+                    result = await self._hedged(state, lambda: call(model, config), stream)
+                except Exception as e:
+                    if not is_retryable(e):
+                        raise
+                    last_error = e
+                    logger.warning("model %s call failed (attempt %d): %s: %s", name, attempt + 1, type(e).__name__, e)
+                    if state.breaker.failure():
+                        break
+                    continue
+                state.breaker.success()
+                return name, result
+        raise self._unavailable() from last_error
+
+    async def _hedged(self, state: _ModelState, call, stream: bool):
+        """Result of `call()`, sent a second time if the first is slower than usual."""
+        started: dict[asyncio.Task, float] = {}
+
+        def launch() -> asyncio.Task:
+            state.counters["calls"] += 1
+            task = asyncio.create_task(asyncio.wait_for(call(), self.call_timeout))
+            started[task] = time.perf_counter()
+            task.add_done_callback(self._reap(state, stream, started[task]))
+            return task
+
+        pending = {launch()}
+        winner: asyncio.Task | None = None
+        try:
+            if self.hedge:
+                quantile = state.quantile(stream, self.hedge_quantile)
+                delay = max(self.hedge_min_delay, quantile if quantile is not None else self.hedge_delay)
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    state.counters["hedges"] += 1
+                    pending.add(launch())
+            error: BaseException | None = None
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                    elif winner is None:
+                        winner = task
+                    elif stream:
+                        # 동시에 끝난 다른 요청의 스트림은 닫음
+                        await task.result()[0].aclose()
+            if winner is None:
+                raise error
+            if winner is not next(iter(started)):
+                state.counters["hedge_wins"] += 1
+            return winner.result()
+        finally:
+            if pending:
+                losers = list(pending)
+                cancelled_at = time.perf_counter()
+                for task in losers:
+                    task.cancel()
+                # 취소 직전에 끝난 요청의 스트림도 닫아 HTTP 연결을 돌려줌
+                results = await asyncio.gather(*losers, return_exceptions=True)
+                for task, result in zip(losers, results):
+                    if stream and isinstance(result, tuple):
+                        await result[0].aclose()
+                    if winner is not None and task.cancelled():
+                        # 진 요청은 적어도 이만큼 걸렸음: 빼면 p95가 빠른 쪽으로만 치우침
+                        state.latencies[stream].append(cancelled_at - started[task])
+
+    @staticmethod
+    def _reap(state: _ModelState, stream: bool, started: float):
+        """Done callback recording the latency of every finished call (also timeouts) and counting failures."""
+
+        def callback(task: asyncio.Task) -> None:
+            if task.cancelled():
+                return
+            error = task.exception()
+            if error is None or isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+                state.latencies[stream].append(time.perf_counter() - started)
+            if error is not None:
+                state.counters["errors"] += 1
+
+        return callback
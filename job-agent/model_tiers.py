@@ -0,0 +1,215 @@
+"""
+Complexity-based model tiering: each turn goes to the cheapest configured
+model tier that can answer it.
+
+`ComplexityScorer` rates a query between 0 and 1 from cheap local features,
+with no model call:
+
+- ``length``: estimated tokens of the query
+- ``tools``: keywords that usually need a search (postings, salaries, news)
+- ``planning``: keywords asking for plans, comparisons or analysis
+- ``questions``: several questions in one message
+- ``depth``: user turns already in the conversation
+- ``smalltalk``: the whole message is a short thanks / acknowledgement
+  (lowers the score); a thanks inside a real request does not count
+
+The keyword groups stand in for the query's intent; requests the intent
+router answers never reach the scorer.
+
+`TierRouter` picks the first tier whose ``max_score`` is at least the
+query's score. Tiers come from JOB_AGENT_MODEL_TIERS, e.g.
+``fast=gemini-2.0-flash-lite:0.3,default=gemini-2.5-flash-lite:0.7,deep=gemini-2.5-flash``
+(``name=model:max_score``; the last tier takes everything above). Without
+it there is a single tier on JOB_AGENT_MODEL and nothing is scored.
+
+`JobAgent` compiles one graph per tier at startup and reuses them; they
+share the checkpointer, so a conversation can move between tiers from turn
+to turn. Each turn runs in a ``tier <name>`` span (per-tier latency in
+`/metrics`, score and features in the trace), and `stats` counts the
+decisions per tier and the score distribution, for tuning the thresholds.
+"""
+
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+from intent_router import AhoCorasick
+from textutil import estimate_tokens, normalize_query
+
+logger = logging.getLogger(__name__)
+
+# 특징별 키워드 (normalize_query 기준으로 비교)
+DEFAULT_KEYWORDS: dict[str, list[str]] = {
+    "tools": [
+        "채용", "공고", "구인", "연봉", "최신", "요즘", "트렌드", "뉴스", "동향", "시장", "검색", "찾아",
+        "회사", "기업", "hiring", "job posting", "openings", "salary", "latest", "trend", "news", "market",
+    ],
+    "planning": [
+        "계획", "로드맵", "전략", "비교", "분석", "단계별", "커리어 패스", "커리어패스", "전환", "장단점",
+        "우선순위", "준비 과정", "어떻게 준비", "plan", "roadmap", "strategy", "compare", "pros and cons",
+        "step by step", "analysis", "career path", "transition",
+    ],
+    "smalltalk": [
+        "고마워", "고맙습니다", "감사", "알겠", "좋아요", "좋네요", "오케이", "ㅇㅋ",
+        "thanks", "thank you", "ok", "okay", "got it", "great", "cool",
+    ],
+}
+
+# 점수 = 특징 값(0~1) x 가중치의 합을 0~1로 자름
+DEFAULT_WEIGHTS = {"length": 0.35, "tools": 0.35, "planning": 0.35, "questions": 0.1, "depth": 0.15, "smalltalk": -0.6}
+# 이 토큰 수 / 사용자 턴 수에서 length / depth 특징이 1이 됨
+LENGTH_SCALE = 120
+DEPTH_SCALE = 10
+# 이보다 짧은 메시지만 인사로 봄
+SMALLTALK_MAX_TOKENS = 12
+# 인사 메시지에서 smalltalk 키워드 외에 허용하는 단어 ("thank you so much", "정말 감사합니다")
+SMALLTALK_FILLER = frozenset({
+    "so", "much", "very", "a", "lot", "really", "all", "that", "sounds", "good", "again", "for", "the", "help",
+    "네", "넵", "예", "정말", "진짜", "너무", "많이", "다시", "한번", "도움", "ㅎㅎ", "ㅋㅋ",
+})
+# 한글 smalltalk 키워드 뒤에 올 수 있는 어미 ("감사합니다"는 인정, "감사원"은 제외)
+SMALLTALK_ENDINGS = ("합", "해", "했", "드", "요", "어", "습", "네", "다", "ㅎ", "ㅋ")
+
+
+@dataclass
+class ModelTier:
+    """A model tier: turns scoring up to `max_score` go to `model`."""
+
+    name: str
+    model: str
+    max_score: float = 1.0
+
+
+def parse_tiers(spec: str) -> list[ModelTier]:
+    """Parse "fast=model-a:0.3,deep=model-b" into tiers, cheapest first."""
+    tiers = []
+    for item in spec.split(","):
+        name, sep, rest = item.partition("=")
+        if not sep or not name.strip() or not rest.strip():
+            continue
+        model, _, max_score = rest.strip().rpartition(":") if ":" in rest else (rest.strip(), "", "")
+        tiers.append(ModelTier(name.strip(), model.strip(), float(max_score) if max_score else 1.0))
+    tiers.sort(key=lambda t: t.max_score)
+    if tiers:
+        tiers[-1].max_score = 1.0
+    return tiers
+
+
+class ComplexityScorer:
+    """Scores a query's complexity from length, keywords and conversation depth."""
+
+    def __init__(self, keywords: dict[str, list[str]] | None = None, weights: dict[str, float] | None = None):
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        keywords = keywords or DEFAULT_KEYWORDS
+        self._matcher = AhoCorasick(
+            [(normalize_query(k), feature) for feature, words in keywords.items() for k in words]
+        )
+
+    def features(self, query: str, depth: int = 0) -> dict[str, float]:
+        text = normalize_query(query)
+        tokens = estimate_tokens(query)
+        hits: dict[str, int] = {}
+        smalltalk_starts: set[int] = set()
+        for start, end, feature in self._matcher.finditer(text):
+            # 키워드는 단어 첫머리에서만 ("회사"가 "자회사"에 걸리지 않도록), 영문은 단어 단위로만
+            # ("ok"가 "book"에 걸리지 않도록). 한글은 뒤에 조사/어미가 붙어도 인정
+            if (start > 0 and text[start - 1].isalnum()) or (
+                text[start:end].isascii() and end < len(text) and text[end].isalnum()
+            ):
+                continue
+            if feature == "smalltalk":
+                rest = text[end:].split(" ", 1)[0]
+                if rest and not rest.startswith(SMALLTALK_ENDINGS):
+                    continue
+                smalltalk_starts.update(m.start() + start for m in re.finditer(r"\S+", text[start:end]))
+            hits[feature] = hits.get(feature, 0) + 1
+        return {
+            "length": min(1.0, tokens / LENGTH_SCALE),
+            "tools": min(1.0, hits.get("tools", 0) / 2),
+            "planning": min(1.0, hits.get("planning", 0) / 2),
+            "questions": min(1.0, max(0, query.count("?") + query.count("？") - 1) / 2),
+            "depth": min(1.0, depth / DEPTH_SCALE),
+            "smalltalk": 1.0 if self._is_smalltalk(query, text, tokens, hits, smalltalk_starts) else 0.0,
+        }
+
+    @staticmethod
+    def _is_smalltalk(query: str, text: str, tokens: int, hits: dict[str, int], starts: set[int]) -> bool:
+        """Whether the message is only a thanks / acknowledgement.
+
+        Every word must start a smalltalk keyword ("감사합니다", "thank you")
+        or be filler ("so much", "정말"), and the message must not ask
+        anything or contain search / planning keywords.
+        """
+        if not hits.get("smalltalk") or tokens > SMALLTALK_MAX_TOKENS:
+            return False
+        if hits.get("tools") or hits.get("planning") or "?" in query or "？" in query:
+            return False
+        words = list(re.finditer(r"\S+", text))
+        return bool(words) and all(m.start() in starts or m.group() in SMALLTALK_FILLER for m in words)
+
+    def score(self, features: dict[str, float]) -> float:
+        total = sum(self.weights.get(name, 0.0) * value for name, value in features.items())
+        return min(1.0, max(0.0, total))
+
+
+class TierRouter:
+    """Picks the model tier of a turn.
+
+    Args:
+        tiers: Tiers, cheapest (lowest `max_score`) first.
+        scorer: Complexity scorer (default `ComplexityScorer()`).
+    """
+
+    def __init__(self, tiers: list[ModelTier], scorer: ComplexityScorer | None = None):
+        self.tiers = sorted(tiers, key=lambda t: t.max_score)
+        self.scorer = scorer or ComplexityScorer()
+        self._lock = threading.Lock()
+        self._counts = {tier.name: 0 for tier in self.tiers}
+        self._score_sums = {tier.name: 0.0 for tier in self.tiers}
+        # 점수 분포 (0.1 단위 구간) - 임계값 조정용
+        self._histogram = [0] * 10
+
+    @classmethod
+    def from_env(cls, default_model: str) -> "TierRouter":
+        tiers = parse_tiers(os.getenv("JOB_AGENT_MODEL_TIERS", ""))
+        return cls(tiers or [ModelTier("default", default_model)])
+
+    @property
+    def enabled(self) -> bool:
+        """Whether there is a choice to make (more than one tier)."""
+        return len(self.tiers) > 1
+
+    def choose(self, query: str, depth: int = 0) -> tuple[ModelTier, float, dict[str, float]]:
+        """(tier, score, features) for a turn with `depth` earlier user turns."""
+        if not self.enabled:
+            return self.tiers[0], 0.0, {}
+        features = self.scorer.features(str(query), depth)
+        score = self.scorer.score(features)
+        tier = next((t for t in self.tiers if score <= t.max_score), self.tiers[-1])
+        with self._lock:
+            self._counts[tier.name] += 1
+            self._score_sums[tier.name] += score
+            self._histogram[min(9, int(score * 10))] += 1
+        logger.debug("tier %s (score %.2f, %s)", tier.name, score, features)
+        return tier, score, features
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = sum(self._counts.values())
+            return {
+                "turns": total,
+                "tiers": {
+                    tier.name: {
+                        "model": tier.model,
+                        "max_score": tier.max_score,
+                        "turns": self._counts[tier.name],
+                        "share": self._counts[tier.name] / total if total else 0.0,
+                        "mean_score": self._score_sums[tier.name] / self._counts[tier.name] if self._counts[tier.name] else 0.0,
+                    }
+                    for tier in self.tiers
+                },
+                "score_histogram": {f"{i / 10:.1f}-{(i + 1) / 10:.1f}": n for i, n in enumerate(self._histogram)},
+            }
@@ -0,0 +1,188 @@
+"""
+Process-wide registry for the model client, checkpointer, search client, job
+postings index and compiled JobAgent.
+
+The A2A executor and the web UI share one `ChatVertexAI` client, one tool
+set and one compiled graph. Everything is built lazily on first use, and the
+heavy imports (Vertex AI SDK, LangGraph prebuilt, storage backends) happen
+there too, so importing this module is cheap. `prewarm` builds it ahead of
+the first request (called from the server's startup hook).
+
+With JOB_AGENT_MCP_URL set, `start_mcp_tools` (also called from the startup
+hook, before the agent is built) connects to the remote MCP tool server and
+the agent uses its tools in place of the built-in ones of the same name.
+
+The agent talks to the model through `get_chat_model`: the client behind
+retries, hedging, circuit breakers and the JOB_AGENT_FALLBACK_MODELS chain
+(see `model_resilience.py`; JOB_AGENT_MODEL_RESILIENCE=0 turns it off).
+"""
+
+import logging
+import os
+import threading
+
+from metrics import metrics
+from startup_profile import startup
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = os.getenv("JOB_AGENT_MODEL", "gemini-2.5-flash-lite")
+
+_lock = threading.RLock()
+_models: dict = {}
+_chat_models: dict = {}
+_checkpointer = None
+_search_client = None
+_job_index = None
+_agent = None
+_mcp_toolset = None
+_mcp_tools: list = []
+
+
+def get_model(name: str = DEFAULT_MODEL):
+    """Shared chat model client for `name` (one per model per process)."""
+    with _lock:
+        if name not in _models and (name == "fake" or name.startswith("fake-")):
+            # 오프라인 실행/벤치마크용 결정적 모델 (JOB_AGENT_MODEL=fake)
+            from fakes import FakeChatModel
+
+            _models[name] = FakeChatModel.from_env(name)
+        if name not in _models:
+            with startup.phase("import langchain_google_vertexai"):
+                from langchain_google_vertexai import ChatVertexAI
+            with startup.phase(f"construct ChatVertexAI({name})"):
+                _models[name] = ChatVertexAI(
+                    model=name,
+                    location=os.getenv("GOOGLE_CLOUD_LOCATION"),
+                    project=os.getenv("GOOGLE_CLOUD_PROJECT"),
+                    temperature=0,
+                )
+        return _models[name]
+
+
+def get_chat_model(name: str = DEFAULT_MODEL):
+    """`name` followed by the JOB_AGENT_FALLBACK_MODELS chain, behind retries,
+    hedging and circuit breakers (the plain client with JOB_AGENT_MODEL_RESILIENCE=0)."""
+    if os.getenv("JOB_AGENT_MODEL_RESILIENCE", "1") == "0":
+        return get_model(name)
+    with _lock:
+        if name not in _chat_models:
+            import model_resilience
+
+            fallbacks = [n.strip() for n in os.getenv("JOB_AGENT_FALLBACK_MODELS", "").split(",") if n.strip()]
+            names = [name] + [n for n in fallbacks if n != name]
+            _chat_models[name] = model_resilience.ResilientChatModel.from_env(names, get_model)
+            metrics.register_stats("models", model_resilience.stats)
+        return _chat_models[name]
+
+
+def get_checkpointer():
+    """Shared checkpointer for the configured state backend."""
+    global _checkpointer
+    with _lock:
+        if _checkpointer is None:
+            with startup.phase("build checkpointer"):
+                from state_store import build_checkpointer
+
+                _checkpointer = build_checkpointer()
+            if hasattr(_checkpointer, "stats"):
+                metrics.register_stats("checkpointer", _checkpointer.stats)
+        return _checkpointer
+
+
+def get_search_client():
+    """Shared web search client (session reuse, result cache, single-flight)."""
+    global _search_client
+    with _lock:
+        if _search_client is None:
+            from search_client import SearchClient
+
+            _search_client = SearchClient.from_env()
+            metrics.register_stats("search_client", _search_client.stats)
+        return _search_client
+
+
+def get_job_index():
+    """Shared job postings index, loaded from JOB_AGENT_POSTINGS_PATH on first use."""
+    global _job_index
+    with _lock:
+        if _job_index is None:
+            with startup.phase("load job postings"):
+                from job_index import load_job_index
+
+                _job_index = load_job_index()
+        return _job_index
+
+
+async def start_mcp_tools() -> None:
+    """Connect to the MCP tool server (JOB_AGENT_MCP_URL) on the running event loop.
+
+    The session lives on this loop, so call it from the server's loop. If the
+    server can't be reached the agent falls back to its built-in tools.
+    """
+    global _mcp_toolset, _mcp_tools
+    if _mcp_toolset is not None:
+        return
+    from mcp_tools import McpToolset
+
+    toolset = McpToolset.from_env()
+    if toolset is None:
+        return
+    try:
+        with startup.phase("connect MCP tools"):
+            tools = await toolset.start()
+    except Exception:
+        logger.exception("MCP tool server %s unavailable, using built-in tools", toolset.url)
+        await toolset.close()
+        return
+    with _lock:
+        _mcp_toolset, _mcp_tools = toolset, tools
+    metrics.register_stats("mcp", toolset.stats)
+
+
+async def stop_mcp_tools() -> None:
+    global _mcp_toolset
+    if _mcp_toolset is not None:
+        await _mcp_toolset.close()
+        _mcp_toolset = None
+
+
+def get_mcp_tools() -> list:
+    """Tools loaded from the MCP server (empty if not configured or not connected)."""
+    with _lock:
+        return list(_mcp_tools)
+
+
+def get_agent():
+    """Shared JobAgent, built on first use."""
+    global _agent
+    with _lock:
+        if _agent is None:
+            with startup.phase("build JobAgent"):
+                from agent import JobAgent
+
+                _agent = JobAgent()
+            _register_agent_stats(_agent)
+        return _agent
+
+
+def _register_agent_stats(agent) -> None:
+    metrics.register_stats("admission", agent.admission.stats)
+    metrics.register_stats("tools", agent.tool_guard.stats)
+    if agent.tool_guard.compactor is not None:
+        metrics.register_stats("tool_compaction", agent.tool_guard.compactor.stats)
+    if agent.tool_guard.prefetcher is not None:
+        metrics.register_stats("tool_prefetch", agent.tool_guard.prefetcher.stats)
+    metrics.register_stats("intent_router", agent.intent_router.stats)
+    if agent.tier_router.enabled:
+        metrics.register_stats("model_tiers", agent.tier_router.stats)
+    if agent.response_cache is not None:
+        metrics.register_stats("response_cache", agent.response_cache.stats)
+    if agent.history_trimmer is not None:
+        metrics.register_stats("history", lambda: dict(agent.history_trimmer.stats))
+
+
+def prewarm() -> None:
+    """Build the shared model, agent and job index now instead of on the first request."""
+    get_agent()
+    get_job_index()
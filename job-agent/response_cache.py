@@ -0,0 +1,158 @@
+"""
+Opt-in cache of first-turn replies for common career questions.
+
+Two tiers, both scoped to a namespace (system prompt + model version) so a
+prompt or model change never serves stale answers:
+
+1. exact: normalized query text -> reply
+2. similar: a character-trigram inverted index finds cached queries whose
+   Jaccard similarity to the new query is above a threshold (no embedding
+   service involved)
+
+Entries expire after a TTL and the least recently used entry is evicted
+once the cache is full.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from textutil import char_ngrams, normalize_query
+
+
+def cache_namespace(*parts: str) -> str:
+    """Short, stable namespace id for e.g. (system prompt, model name)."""
+    digest = hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()
+    return digest[:16]
+
+
+@dataclass
+class _Entry:
+    reply: str
+    expires_at: float
+    grams: set[str] = field(default_factory=set)
+
+
+class ResponseCache:
+    """LRU + TTL reply cache with a lexical near-duplicate tier.
+
+    Args:
+        max_entries: Entries kept before LRU eviction.
+        ttl_seconds: Lifetime of an entry.
+        similarity: Minimum trigram Jaccard similarity for the second tier
+            (0 disables it).
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 3600, similarity: float = 0.8):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple[str, str], _Entry]" = OrderedDict()
+        # (namespace, trigram) -> keys of entries containing it
+        self._postings: dict[tuple[str, str], set[tuple[str, str]]] = {}
+        self._counters = {"hits_exact": 0, "hits_similar": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache | None":
+        """Build from env; returns None unless JOB_AGENT_RESPONSE_CACHE=1."""
+        if os.getenv("JOB_AGENT_RESPONSE_CACHE", "0") != "1":
+            return None
+        return cls(
+            max_entries=int(os.getenv("JOB_AGENT_RESPONSE_CACHE_SIZE", "1000")),
+            ttl_seconds=float(os.getenv("JOB_AGENT_RESPONSE_CACHE_TTL", "3600")),
+            similarity=float(os.getenv("JOB_AGENT_RESPONSE_CACHE_SIMILARITY", "0.8")),
+        )
+
+    def get(self, query: str, namespace: str) -> str | None:
+        normalized = normalize_query(query)
+        if not normalized:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            key = (namespace, normalized)
+            entry = self._live(key, now)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits_exact"] += 1
+                return entry.reply
+
+            if self.similarity > 0:
+                key = self._most_similar(namespace, char_ngrams(normalized), now)
+                if key is not None:
+                    self._entries.move_to_end(key)
+                    self._counters["hits_similar"] += 1
+                    return self._entries[key].reply
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, query: str, namespace: str, reply: str) -> None:
+        normalized = normalize_query(query)
+        if not normalized or not reply:
+            return
+        key = (namespace, normalized)
+        grams = char_ngrams(normalized) if self.similarity > 0 else set()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(reply, time.monotonic() + self.ttl_seconds, grams)
+            for gram in grams:
+                self._postings.setdefault((namespace, gram), set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits_exact"] + self._counters["hits_similar"] + self._counters["misses"]
+            hits = lookups - self._counters["misses"]
+            return {
+                **self._counters,
+                "size": len(self._entries),
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+
+    def _live(self, key: tuple[str, str], now: float) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= now:
+            self._remove(key)
+            self._counters["expired"] += 1
+            return None
+        return entry
+
+    def _most_similar(self, namespace: str, grams: set[str], now: float) -> tuple[str, str] | None:
+        if not grams:
+            return None
+        overlap: dict[tuple[str, str], int] = {}
+        for gram in grams:
+            for key in self._postings.get((namespace, gram), ()):
+                overlap[key] = overlap.get(key, 0) + 1
+
+        best_key, best_score = None, self.similarity
+        for key, shared in overlap.items():
+            # Cheap upper bound first: Jaccard <= shared / |grams|
+            if shared / len(grams) < best_score:
+                continue
+            entry = self._entries[key]
+            score = shared / (len(grams) + len(entry.grams) - shared)
+            if score >= best_score:
+                best_key, best_score = key, score
+        if best_key is not None and self._live(best_key, now) is None:
+            return None
+        return best_key
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key)
+        namespace = key[0]
+        for gram in entry.grams:
+            keys = self._postings.get((namespace, gram))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[(namespace, gram)]
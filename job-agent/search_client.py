@@ -0,0 +1,216 @@
+"""
+Shared web search client used by the `web_search` tool and the MCP server.
+
+- Backends are pluggable (`SearchBackend`); `DDGSBackend` talks to
+  DuckDuckGo through `ddgs`, `FakeSearchBackend` is a deterministic local
+  provider for tests and benchmarks.
+- `DDGSBackend` keeps one `DDGS` instance per worker thread, so its engine
+  HTTP sessions are reused instead of being opened for every search.
+- `SearchClient` adds a TTL result cache, single-flight deduplication
+  (concurrent identical queries wait on one fetch) and a per-call timeout.
+  A fetch whose every async waiter was cancelled is dropped if it has not
+  started yet, so abandoned turns don't spend search quota.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Protocol
+
+from textutil import normalize_query
+
+
+class SearchTimeout(Exception):
+    """The search did not finish within the client's timeout."""
+
+
+class SearchBackend(Protocol):
+    def search(self, query: str, count: int) -> list[dict[str, Any]]:
+        """Return up to `count` results as ``{"title", "href", "body"}`` dicts."""
+        ...
+
+
+class DDGSBackend:
+    """DuckDuckGo (ddgs) backend reusing one client per thread."""
+
+    def __init__(self, timeout: int = 5):
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            from ddgs import DDGS  # lightweight, no API key
+
+            client = self._local.client = DDGS(timeout=self.timeout)
+        return client
+
+    def search(self, query: str, count: int) -> list[dict[str, Any]]:
+        return [
+            {"title": r.get("title"), "href": r.get("href"), "body": r.get("body")}
+            for r in self._client().text(query, max_results=count)
+        ]
+
+
+class FakeSearchBackend:
+    """Deterministic local provider with configurable latency and failures."""
+
+    def __init__(self, latency: float = 0.0, fail: bool = False):
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def search(self, query: str, count: int) -> list[dict[str, Any]]:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError("fake search backend failure")
+        return [
+            {
+                "title": f"{query} - result {i}",
+                "href": f"https://example.com/search/{i}",
+                "body": f"Example summary {i} for '{query}'.",
+            }
+            for i in range(1, count + 1)
+        ]
+
+
+class SearchClient:
+    """Cached, deduplicating front for a `SearchBackend`.
+
+    Args:
+        backend: Where results come from.
+        ttl_seconds: How long results are cached (0 disables the cache).
+        max_entries: Cached queries kept before LRU eviction.
+        timeout: Seconds a caller waits for a result. A timed-out fetch keeps
+            running in the background and still fills the cache.
+        max_workers: Concurrent backend fetches.
+    """
+
+    def __init__(
+        self,
+        backend: SearchBackend,
+        ttl_seconds: float = 300,
+        max_entries: int = 512,
+        timeout: float = 8.0,
+        max_workers: int = 8,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.timeout = timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="web-search")
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[tuple[str, int], tuple[float, list[dict[str, Any]]]]" = OrderedDict()
+        self._inflight: dict[tuple[str, int], Future] = {}
+        # key -> 진행 중인 fetch를 기다리는 호출 수 (취소 시 fetch를 버릴지 판단)
+        self._waiters: dict[tuple[str, int], int] = {}
+        self._counters = {"cache_hits": 0, "coalesced": 0, "fetches": 0, "errors": 0, "timeouts": 0, "cancelled": 0}
+
+    @classmethod
+    def from_env(cls) -> "SearchClient":
+        if os.getenv("JOB_AGENT_SEARCH_BACKEND", "ddgs") == "fake":
+            backend: SearchBackend = FakeSearchBackend(latency=float(os.getenv("JOB_AGENT_FAKE_SEARCH_LATENCY", "0")))
+        else:
+            backend = DDGSBackend()
+        return cls(
+            backend,
+            ttl_seconds=float(os.getenv("JOB_AGENT_SEARCH_CACHE_TTL", "300")),
+            timeout=float(os.getenv("JOB_AGENT_SEARCH_TIMEOUT", "8")),
+        )
+
+    def search(self, query: str, count: int = 5) -> list[dict[str, Any]]:
+        """Blocking search; raises `SearchTimeout` past `timeout`."""
+        cached, future = self._lookup(self._key(query, count), query, count)
+        if cached is not None:
+            return cached
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self._count("timeouts")
+            raise SearchTimeout(f"timed out after {self.timeout:g}s") from None
+
+    async def asearch(self, query: str, count: int = 5) -> list[dict[str, Any]]:
+        """Async search; the fetch runs in the client's thread pool."""
+        key = self._key(query, count)
+        cached, future = self._lookup(key, query, count)
+        if cached is not None:
+            return cached
+        try:
+            # shield: a timed-out or cancelled waiter must not cancel the shared fetch
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            raise SearchTimeout(f"timed out after {self.timeout:g}s") from None
+        except asyncio.CancelledError:
+            self._abandon(key, future)
+            raise
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "cached": len(self._cache), "inflight": len(self._inflight)}
+
+    @staticmethod
+    def _key(query: str, count: int) -> tuple[str, int]:
+        return normalize_query(query), count
+
+    def _lookup(self, key: tuple[str, int], query: str, count: int) -> tuple[list[dict[str, Any]] | None, Future | None]:
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                if hit[0] > time.monotonic():
+                    self._cache.move_to_end(key)
+                    self._counters["cache_hits"] += 1
+                    return hit[1], None
+                del self._cache[key]
+
+            future = self._inflight.get(key)
+            self._waiters[key] = self._waiters.get(key, 0) + 1
+            if future is not None:
+                self._counters["coalesced"] += 1
+                return None, future
+
+            self._counters["fetches"] += 1
+            future = self._executor.submit(self.backend.search, query, count)
+            self._inflight[key] = future
+        future.add_done_callback(lambda f: self._finish(key, f))
+        return None, future
+
+    def _finish(self, key: tuple[str, int], future: Future) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._waiters.pop(key, None)
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self._counters["errors"] += 1
+                return
+            if self.ttl_seconds > 0:
+                self._cache[key] = (time.monotonic() + self.ttl_seconds, future.result())
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+
+    def _abandon(self, key: tuple[str, int], future: Future) -> None:
+        """A waiter was cancelled; drop the fetch if it was the last one and it has not started."""
+        with self._lock:
+            remaining = self._waiters.get(key, 1) - 1
+            if remaining > 0:
+                self._waiters[key] = remaining
+                return
+            self._waiters.pop(key, None)
+        # 이미 실행 중인 검색은 스레드에서 끝까지 실행됨 (결과는 캐시에 남음)
+        if future.cancel():
+            self._count("cancelled")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
@@ -0,0 +1,352 @@
+"""
+Starlette app for the Job Agent: A2A endpoints, a small chat web UI,
+`/chat`, `/chat/stream` and `/metrics`.
+
+`build_app` is used by `__main__` (uvicorn) and by `benchmark.py`, which
+serves it in-process with fake model and search backends.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import uuid
+
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.types import AgentCapabilities, AgentCard, AgentSkill
+from sse_starlette.sse import EventSourceResponse
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, JSONResponse, PlainTextResponse
+
+from admission import Overloaded
+from agent import JobAgent
+from agent_executor import JobAgentExecutor
+from metrics import metrics
+from registry import get_agent, prewarm, start_mcp_tools, stop_mcp_tools
+from startup_profile import startup
+from state_store import build_task_store
+from tracing import TracingMiddleware
+
+
+def _overloaded_response(e: Overloaded) -> JSONResponse:
+    return JSONResponse(
+        {"error": str(e), "reason": e.reason, "retryAfter": e.retry_after},
+        status_code=e.status_code,
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+class ClientDisconnected(Exception):
+    """The HTTP client went away before the turn finished."""
+
+
+async def _unless_disconnected(request: Request, awaitable):
+    """Await `awaitable`, cancelling it if the client disconnects first.
+
+    The request body must already be read: after that, `receive()` only
+    returns once the client disconnects. Cancelling the turn stops its model
+    and tool calls and frees its admission slot.
+    """
+    work = asyncio.ensure_future(awaitable)
+
+    async def disconnected() -> None:
+        while (await request.receive())["type"] != "http.disconnect":
+            pass
+
+    watcher = asyncio.create_task(disconnected())
+    try:
+        await asyncio.wait({work, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not work.done():
+            work.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await work
+            raise ClientDisconnected()
+    return work.result()
+
+
+def _disconnected_response() -> JSONResponse:
+    # 499: nginx 관례 (클라이언트가 먼저 연결을 끊음); 실제로 전달되지는 않음
+    return JSONResponse({"error": "client disconnected"}, status_code=499)
+
+
+def build_app(host: str, port: int, startup_profile: bool = False):
+    """Build the Starlette app: A2A endpoints, web UI, /chat, /chat/stream and /metrics."""
+    capabilities = AgentCapabilities(streaming=True)
+    skill = AgentSkill(
+        id="job_agent",
+        name="일자리 전문가",
+        description="일자리 고민이 있는 사람에게 전문가 조언을 제공합니다.",
+        tags=["job_agent"],
+        examples=["커리어 고민이 있어요."],
+    )
+    agent_host_url = (
+        os.getenv("HOST_OVERRIDE")
+        if os.getenv("HOST_OVERRIDE")
+        else f"http://{host}:{port}/"
+    )
+    agent_card = AgentCard(
+        name="일자리 전문가",
+        description="일자리 고민이 있는 사람에게 전문가 조언을 제공합니다.",
+        url=agent_host_url,
+        version="1.0.0",
+        defaultInputModes=JobAgent.SUPPORTED_CONTENT_TYPES,
+        defaultOutputModes=JobAgent.SUPPORTED_CONTENT_TYPES,
+        capabilities=capabilities,
+        skills=[skill],
+    )
+
+    request_handler = DefaultRequestHandler(
+        agent_executor=JobAgentExecutor(), task_store=build_task_store()
+    )
+    server = A2AStarletteApplication(agent_card=agent_card, http_handler=request_handler)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_app):
+        # Build the shared model/agent before serving so the first request doesn't pay for it.
+        # "background" starts serving (agent card, health checks) right away and builds in parallel.
+        mode = "1" if startup_profile else os.getenv("JOB_AGENT_PREWARM", "1")
+        # 원격 MCP 도구 세션은 이 이벤트 루프에서 열어야 하고, 에이전트 생성 전에 필요함
+        await start_mcp_tools()
+        warmup = None
+        if mode == "background":
+            warmup = asyncio.create_task(asyncio.to_thread(prewarm))
+        elif mode != "0":
+            await asyncio.to_thread(prewarm)
+        if startup_profile:
+            print(startup.report(), flush=True)
+        yield
+        if warmup is not None and not warmup.done():
+            warmup.cancel()
+        await stop_mcp_tools()
+
+    # Build underlying Starlette app and mount a simple web UI
+    app = server.build(lifespan=lifespan)
+
+    async def homepage(_: Request) -> HTMLResponse:
+        return HTMLResponse(
+            """
+<!doctype html>
+<html lang="en">
+  <head>
+    <meta charset="utf-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1" />
+    <title>Job Agent - Chat</title>
+    <style>
+      body { font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; margin: 0; background: #0b1021; color: #e6e9f5; }
+      .container { max-width: 840px; margin: 0 auto; padding: 24px; }
+      h1 { margin: 0 0 16px; font-size: 20px; color: #a7b1ff; }
+      .chat { background: #0f1633; border: 1px solid #1f2a56; border-radius: 12px; padding: 16px; min-height: 360px; }
+      .msg { padding: 10px 12px; border-radius: 8px; margin: 8px 0; max-width: 80%; white-space: pre-wrap; }
+      .user { background: #1b2554; margin-left: auto; }
+      .agent { background: #131a3a; }
+      .input { display: flex; gap: 8px; margin-top: 12px; }
+      input, button { font-size: 16px; }
+      input { flex: 1; padding: 10px 12px; border-radius: 8px; border: 1px solid #1f2a56; background: #0f1633; color: #e6e9f5; }
+      button { padding: 10px 14px; border-radius: 8px; border: 1px solid #2a3a7a; background: #2d3c80; color: #e6e9f5; cursor: pointer; }
+      button:disabled { opacity: .6; cursor: not-allowed; }
+      .hint { color: #97a0d1; font-size: 12px; margin-top: 8px; }
+      a { color: #a7b1ff; }
+    </style>
+  </head>
+  <body>
+    <div class="container">
+      <h1>Job Agent - Chat</h1>
+      <div class="chat" id="chat"></div>
+      <div class="input">
+        <input id="text" placeholder="Type your message..." />
+        <button id="send">Send</button>
+      </div>
+      <div class="hint">
+        This UI posts to <code>/chat/stream</code> on this service and renders the response as it streams (<code>/chat</code> returns it in one piece). The Agent Card is available at <a href="/.well-known/agent.json">/.well-known/agent.json</a>.
+      </div>
+    </div>
+    <script>
+      const chat = document.getElementById('chat');
+      const input = document.getElementById('text');
+      const btn = document.getElementById('send');
+      function safeUUID() {
+        try {
+          if (typeof crypto !== 'undefined' && crypto && typeof crypto.randomUUID === 'function') {
+            return crypto.randomUUID();
+          }
+        } catch (_) {}
+        // Fallback
+        const s4 = () => Math.floor((1 + Math.random()) * 0x10000).toString(16).substring(1);
+        return `${Date.now().toString(16)}-${s4()}-${s4()}-${s4()}-${s4()}${s4()}${s4()}`;
+      }
+      let contextId = safeUUID();
+
+      function addMsg(text, cls) {
+        const div = document.createElement('div');
+        div.className = 'msg ' + cls;
+        div.textContent = text;
+        chat.appendChild(div);
+        chat.scrollTop = chat.scrollHeight;
+        return div;
+      }
+
+      let isProcessing = false; // 중복 처리 방지 플래그
+      let isComposing = false; // IME 조합 상태 플래그
+
+      async function send() {
+        const text = input.value.trim();
+        if (!text || isProcessing) return; // 이미 처리 중이면 무시
+        
+        isProcessing = true; // 처리 시작
+        input.value = ''; // 즉시 input 비우기
+        btn.disabled = true;
+        addMsg(text, 'user');
+        
+        try {
+          const res = await fetch('/chat/stream', { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify({ text, contextId }) });
+          if (!res.ok || !res.body) {
+            let message = 'Request failed';
+            try { message = (await res.json()).error || message; } catch (_) {}
+            throw new Error(message);
+          }
+          const div = addMsg('', 'agent');
+          const reader = res.body.getReader();
+          const decoder = new TextDecoder();
+          let buffer = '';
+          let streamed = '';
+          while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            // SSE 이벤트는 빈 줄로 구분됨
+            const frames = buffer.split(/\\r?\\n\\r?\\n/);
+            buffer = frames.pop();
+            for (const frame of frames) {
+              let event = 'message';
+              let data = '';
+              for (const line of frame.split(/\\r?\\n/)) {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+              }
+              if (!data) continue;
+              const payload = JSON.parse(data);
+              if (event === 'token') {
+                streamed += payload.content;
+                div.textContent = streamed;
+              } else if (event === 'tool') {
+                if (!streamed) div.textContent = payload.status;
+              } else if (event === 'done') {
+                div.textContent = payload.reply || '[No reply]';
+              } else if (event === 'error') {
+                div.textContent = 'Error: ' + payload.error;
+              }
+              chat.scrollTop = chat.scrollHeight;
+            }
+          }
+        } catch (e) {
+          console.error('POST /chat failed', e);
+          addMsg('Error: ' + e.message, 'agent');
+        } finally {
+          btn.disabled = false;
+          isProcessing = false; // 처리 완료
+          input.focus();
+        }
+      }
+
+      btn.addEventListener('click', send);
+
+      // IME 조합 상태 처리 (한국어 등)
+      input.addEventListener('compositionstart', () => { isComposing = true; });
+      input.addEventListener('compositionend', () => { isComposing = false; });
+      
+      // Enter 키 이벤트 처리 개선
+      input.addEventListener('keydown', (e) => { 
+        if (e.key === 'Enter' && !e.shiftKey) {
+          if (e.isComposing || isComposing) {
+            // IME 조합 중에는 전송하지 않음
+            return;
+          }
+          e.preventDefault(); // 기본 Enter 동작 방지
+          e.stopPropagation(); // 이벤트 전파 중단
+          e.stopImmediatePropagation(); // 즉시 이벤트 중단
+          send(); 
+        }
+      });
+      
+      input.focus();
+    </script>
+  </body>
+  </html>
+            """
+        )
+
+    async def chat(request: Request) -> JSONResponse:
+        body = await request.json()
+        user_text = (body or {}).get("text", "").strip()
+        context_id = (body or {}).get("contextId") or str(uuid.uuid4())
+        if not user_text:
+            return JSONResponse({"error": "Missing text"}, status_code=400)
+        try:
+            reply = await _unless_disconnected(request, get_agent().ainvoke(user_text, context_id))
+            return JSONResponse({"reply": reply, "contextId": context_id})
+        except ClientDisconnected:
+            return _disconnected_response()
+        except Overloaded as e:
+            return _overloaded_response(e)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, status_code=500)
+
+    async def chat_stream(request: Request):
+        body = await request.json()
+        user_text = (body or {}).get("text", "").strip()
+        context_id = (body or {}).get("contextId") or str(uuid.uuid4())
+        if not user_text:
+            return JSONResponse({"error": "Missing text"}, status_code=400)
+
+        # 첫 이벤트까지 받아 본 뒤 응답 시작 (대기열 초과는 SSE가 아닌 429/503으로 응답)
+        # 이후 연결이 끊기면 sse-starlette가 스트림을 취소함
+        stream = get_agent().astream(user_text, context_id)
+        try:
+            first = await _unless_disconnected(request, anext(stream))
+        except ClientDisconnected:
+            await stream.aclose()
+            return _disconnected_response()
+        except Overloaded as e:
+            return _overloaded_response(e)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, status_code=500)
+
+        async def agent_events():
+            yield first
+            async for event in stream:
+                yield event
+
+        async def events():
+            try:
+                async for event in agent_events():
+                    kind = event["type"]
+                    if kind == "token":
+                        yield {"event": "token", "data": json.dumps({"content": event["content"]}, ensure_ascii=False)}
+                    elif kind == "tool_call":
+                        status = f"{event['name']} 도구 실행 중..."
+                        yield {"event": "tool", "data": json.dumps({"name": event["name"], "status": status}, ensure_ascii=False)}
+                    elif kind == "final":
+                        reply = str(event["content"])
+                        yield {"event": "done", "data": json.dumps({"reply": reply, "contextId": context_id}, ensure_ascii=False)}
+            except Exception as e:
+                yield {"event": "error", "data": json.dumps({"error": str(e)}, ensure_ascii=False)}
+
+        return EventSourceResponse(events())
+
+    async def metrics_endpoint(request: Request):
+        # 기본은 JSON (p50/p95/p99 + 컴포넌트 카운터), ?format=prometheus 는 텍스트 포맷
+        if request.query_params.get("format") == "prometheus":
+            return PlainTextResponse(metrics.prometheus(), media_type="text/plain; version=0.0.4")
+        return JSONResponse(metrics.snapshot())
+
+    app.add_route("/", homepage, methods=["GET"])
+    app.add_route("/chat", chat, methods=["POST"])
+    app.add_route("/chat/stream", chat_stream, methods=["POST"])
+    app.add_route("/metrics", metrics_endpoint, methods=["GET"])
+    # 요청별 span (A2A JSON-RPC, /chat, /chat/stream)
+    app.add_middleware(TracingMiddleware)
+
+    return app
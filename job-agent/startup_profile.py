@@ -0,0 +1,55 @@
+"""
+Wall-clock timing of startup phases (imports and object construction).
+
+Phases are always recorded (the cost is one `perf_counter` pair each);
+`__main__ --startup-profile` prints the report once the server is ready.
+Nested phases are indented under the phase that was running.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class StartupProfile:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # (name, depth, seconds); seconds is None until the phase ends
+        self._phases: list[list] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        depth = getattr(self._local, "depth", 0)
+        entry = [name, depth, None]
+        with self._lock:
+            self._phases.append(entry)
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry[2] = time.perf_counter() - start
+            self._local.depth = depth
+
+    def record(self, name: str, seconds: float) -> None:
+        """Record a phase that was timed elsewhere (e.g. before this module loaded)."""
+        with self._lock:
+            self._phases.append([name, 0, seconds])
+
+    def report(self) -> str:
+        with self._lock:
+            phases = [tuple(p) for p in self._phases]
+        width = max((len(name) + 2 * depth for name, depth, _ in phases), default=10)
+        lines = ["Startup profile (ms):"]
+        for name, depth, seconds in phases:
+            label = "  " * depth + name
+            value = f"{seconds * 1000:10.1f}" if seconds is not None else "   running"
+            lines.append(f"  {label:<{width}} {value}")
+        total = sum(seconds or 0 for _, depth, seconds in phases if depth == 0)
+        lines.append(f"  {'total':<{width}} {total * 1000:10.1f}")
+        return "\n".join(lines)
+
+
+startup = StartupProfile()
@@ -0,0 +1,485 @@
+"""
+Persistent conversation and task state backed by a local SQLite file.
+
+Selected with ``JOB_AGENT_STATE_BACKEND=sqlite``; the default ``memory``
+backend keeps using `BoundedMemorySaver` and `InMemoryTaskStore`.
+
+The database runs in WAL mode so several worker processes on the same host
+(or a shared volume) can read while one writes. Writes are buffered and
+committed in batches by a background thread; every read flushes the buffer
+first, so a process always sees its own writes. Checkpoints are stored
+zlib-compressed and only the newest few per thread are kept, which keeps the
+file small even for long conversations.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import random
+import sqlite3
+import threading
+import zlib
+from typing import Any, AsyncIterator, Callable, Iterator, Sequence
+
+from a2a.server.tasks import InMemoryTaskStore, TaskStore
+from a2a.types import Task
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from checkpointer import BoundedMemorySaver
+
+logger = logging.getLogger(__name__)
+
+_CHECKPOINT_COLUMNS = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+
+# 이 크기 이상의 직렬화 값만 압축 (작은 값은 압축 이득보다 비용이 큼)
+COMPRESS_MIN_BYTES = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    context_id TEXT,
+    data BLOB
+);
+"""
+
+
+def _pack(typed: tuple[str, bytes]) -> tuple[str, bytes]:
+    type_, data = typed
+    if len(data) >= COMPRESS_MIN_BYTES:
+        return f"{type_}+z", zlib.compress(data, 1)
+    return type_, data
+
+
+def _unpack(type_: str, data: bytes) -> tuple[str, bytes]:
+    if type_.endswith("+z"):
+        return type_[:-2], zlib.decompress(data)
+    return type_, data
+
+
+class SqliteDatabase:
+    """A WAL-mode SQLite connection with a write-behind batch.
+
+    Use `open` to get the shared instance for a path, so the checkpointer and
+    the task store commit in the same batches.
+    """
+
+    _instances: dict[str, "SqliteDatabase"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path: str, flush_interval: float = 0.05, batch_size: int = 64):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+
+        self._pending: list[tuple[str, tuple]] = []
+        self._before_commit: list[Callable[[sqlite3.Connection], None]] = []
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name="sqlite-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def open(cls, path: str, **kwargs: Any) -> "SqliteDatabase":
+        key = os.path.abspath(path)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(path, **kwargs)
+            return cls._instances[key]
+
+    def enqueue(self, sql: str, params: tuple) -> None:
+        """Queue a write for the next batch commit."""
+        with self._lock:
+            self._pending.append((sql, params))
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+
+    def on_commit(self, callback: Callable[[sqlite3.Connection], None]) -> None:
+        """Run `callback` inside every batch transaction, after the queued writes."""
+        self._before_commit.append(callback)
+
+    def query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        """Flush pending writes, then run a read."""
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute(sql, params).fetchall()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._closed = True
+            self._conn.close()
+        self._wakeup.set()
+
+    def _flush_locked(self) -> None:
+        if not self._pending or self._closed:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for sql, params in batch:
+                self._conn.execute(sql, params)
+            for callback in self._before_commit:
+                callback(self._conn)
+            self._conn.execute("COMMIT")
+        except sqlite3.OperationalError:
+            # Usually another process holding the write lock past busy_timeout: retry next flush.
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            self._pending[:0] = batch
+            logger.warning("SQLite batch commit deferred (%d writes)", len(batch), exc_info=True)
+        except Exception:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            logger.exception("SQLite batch commit failed (%d writes dropped)", len(batch))
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("SQLite background flush failed")
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
+    """LangGraph checkpointer storing compressed checkpoints in SQLite.
+
+    Args:
+        db: Shared database handle.
+        keep_checkpoints: Newest checkpoints kept per thread (0 = keep all).
+    """
+
+    def __init__(self, db: SqliteDatabase, keep_checkpoints: int = 4):
+        super().__init__()
+        self.db = db
+        self.keep_checkpoints = keep_checkpoints
+        self._dirty: set[tuple[str, str]] = set()
+        self._dirty_lock = threading.Lock()
+        if keep_checkpoints > 0:
+            db.on_commit(self._prune)
+
+    @classmethod
+    def from_env(cls) -> "SqliteCheckpointSaver":
+        return cls(
+            _database_from_env(),
+            keep_checkpoints=int(os.getenv("JOB_AGENT_SQLITE_KEEP_CHECKPOINTS", "4")),
+        )
+
+    # --- reads ------------------------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        if checkpoint_id := get_checkpoint_id(config):
+            rows = self.db.query(
+                f"SELECT {_CHECKPOINT_COLUMNS} FROM checkpoints "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            )
+        else:
+            rows = self.db.query(
+                f"SELECT {_CHECKPOINT_COLUMNS} FROM checkpoints "
+                "WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id, checkpoint_ns),
+            )
+        if not rows:
+            return None
+        return self._row_to_tuple(thread_id, checkpoint_ns, rows[0])
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.db.query(
+            f"SELECT thread_id, checkpoint_ns, {_CHECKPOINT_COLUMNS} "
+            f"FROM checkpoints {where} ORDER BY checkpoint_id DESC",
+            tuple(params),
+        )
+        yielded = 0
+        for thread_id, checkpoint_ns, *row in rows:
+            item = self._row_to_tuple(thread_id, checkpoint_ns, tuple(row))
+            if filter and not all(item.metadata.get(k) == v for k, v in filter.items()):
+                continue
+            yield item
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                break
+
+    # --- writes (buffered) ------------------------------------------------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, data = _pack(self.serde.dumps_typed(checkpoint))
+        meta_type, meta = _pack(self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)))
+        self.db.enqueue(
+            "INSERT OR REPLACE INTO checkpoints "
+            f"(thread_id, checkpoint_ns, {_CHECKPOINT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+             type_, data, meta_type, meta),
+        )
+        with self._dirty_lock:
+            self._dirty.add((thread_id, checkpoint_ns))
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # Special writes (errors, interrupts) overwrite; regular writes keep the first value.
+        verb = "INSERT OR REPLACE" if all(c in WRITES_IDX_MAP for c, _ in writes) else "INSERT OR IGNORE"
+        for idx, (channel, value) in enumerate(writes):
+            type_, data = _pack(self.serde.dumps_typed(value))
+            self.db.enqueue(
+                f"{verb} INTO writes "
+                "(thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx),
+                 channel, type_, data, task_path),
+            )
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.db.enqueue("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+        self.db.enqueue("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+
+    # --- async API --------------------------------------------------------
+    # Writes only append to the in-memory batch, so they run inline; reads may
+    # hit the disk and are moved off the event loop.
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+    def get_next_version(self, current: str | None, channel: None) -> str:
+        # Same scheme as MemorySaver, so graphs behave identically on both backends.
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # --- internals --------------------------------------------------------
+
+    def _row_to_tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, data, meta_type, meta = row
+        writes = self.db.query(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        )
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self.serde.loads_typed(_unpack(type_, data)),
+            metadata=self.serde.loads_typed(_unpack(meta_type, meta)),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed(_unpack(w_type, value)))
+                for task_id, channel, w_type, value in writes
+            ],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, set()
+        for thread_id, checkpoint_ns in dirty:
+            row = conn.execute(
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?",
+                (thread_id, checkpoint_ns, self.keep_checkpoints - 1),
+            ).fetchone()
+            if row is None:
+                continue
+            for table in ("checkpoints", "writes"):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                    (thread_id, checkpoint_ns, row[0]),
+                )
+
+
+class SqliteTaskStore(TaskStore):
+    """A2A task store persisting compressed task JSON in SQLite."""
+
+    def __init__(self, db: SqliteDatabase):
+        self.db = db
+
+    @classmethod
+    def from_env(cls) -> "SqliteTaskStore":
+        return cls(_database_from_env())
+
+    async def save(self, task: Task) -> None:
+        data = zlib.compress(task.model_dump_json(exclude_none=True).encode("utf-8"), 1)
+        self.db.enqueue(
+            "INSERT OR REPLACE INTO tasks (task_id, context_id, data) VALUES (?, ?, ?)",
+            (task.id, task.context_id, data),
+        )
+
+    async def get(self, task_id: str) -> Task | None:
+        rows = await asyncio.to_thread(self.db.query, "SELECT data FROM tasks WHERE task_id = ?", (task_id,))
+        if not rows:
+            return None
+        return Task.model_validate_json(zlib.decompress(rows[0][0]))
+
+    async def delete(self, task_id: str) -> None:
+        self.db.enqueue("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+
+
+def _database_from_env() -> SqliteDatabase:
+    return SqliteDatabase.open(
+        os.getenv("JOB_AGENT_SQLITE_PATH", "/tmp/job_agent_state.db"),
+        flush_interval=float(os.getenv("JOB_AGENT_SQLITE_FLUSH_MS", "50")) / 1000,
+    )
+
+
+def _backend() -> str:
+    return os.getenv("JOB_AGENT_STATE_BACKEND", "memory").lower()
+
+
+def build_checkpointer() -> BaseCheckpointSaver:
+    """Checkpointer for the configured state backend."""
+    if _backend() == "sqlite":
+        return SqliteCheckpointSaver.from_env()
+    return BoundedMemorySaver.from_env()
+
+
+def build_task_store() -> TaskStore:
+    """A2A task store for the configured state backend."""
+    if _backend() == "sqlite":
+        return SqliteTaskStore.from_env()
+    return InMemoryTaskStore()
@@ -112,7 +112,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--text",
         required=False,
-        default="I want to order 1 Margherita Pizza. Please confirm the total price.",
+        default="백엔드 개발자로 이직하려면 무엇을 준비해야 하나요?",
         help="Test user message to send",
     )
     return parser.parse_args()
@@ -0,0 +1,108 @@
+import asyncio
+import uuid
+
+import pytest
+
+from agent import DEADLINE_REPLY, JobAgent
+from fakes import FakeChatModel
+
+
+@pytest.fixture(autouse=True)
+def _offline(monkeypatch):
+    monkeypatch.setenv("JOB_AGENT_SEARCH_BACKEND", "fake")
+    monkeypatch.setenv("JOB_AGENT_PREFETCH", "0")
+    monkeypatch.setenv("JOB_AGENT_TURN_DEADLINE", "0.3")
+
+
+def _messages(agent, session):
+    state = agent.graph.get_state({"configurable": {"thread_id": session}})
+    return [(m.type, m.content) for m in state.values["messages"]]
+
+
+def test_slow_model_turn_ends_at_the_deadline():
+    agent = JobAgent(model=FakeChatModel(latency=2.0))
+
+    async def run():
+        started = asyncio.get_running_loop().time()
+        reply = await agent.ainvoke("tell me about careers in data", "s1")
+        return reply, asyncio.get_running_loop().time() - started
+
+    reply, elapsed = asyncio.run(run())
+    assert reply == DEADLINE_REPLY
+    assert elapsed < 1.0
+    assert _messages(agent, "s1")[-1] == ("ai", DEADLINE_REPLY)
+
+
+def test_streamed_turn_ends_at_the_deadline():
+    agent = JobAgent(model=FakeChatModel(latency=2.0))
+
+    async def run():
+        return [event async for event in agent.astream("tell me about careers in data", "s1")]
+
+    events = asyncio.run(run())
+    assert events[-1] == {"type": "final", "content": DEADLINE_REPLY}
+
+
+def test_deadline_starts_after_the_admission_slot(monkeypatch):
+    # 두 번째 턴은 첫 턴이 끝날 때까지 대기열에서 기다리지만, 대기 시간은 마감 시간에 포함되지 않음
+    monkeypatch.setenv("JOB_AGENT_TURN_DEADLINE", "0.5")
+    agent = JobAgent(model=FakeChatModel(latency=0.35), max_concurrency=1)
+
+    async def run():
+        return await asyncio.gather(agent.ainvoke("first question", "a"), agent.ainvoke("second question", "b"))
+
+    first, second = asyncio.run(run())
+    assert DEADLINE_REPLY not in (first, second)
+
+
+def _resilient(primary_errors: float):
+    from model_resilience import ResilientChatModel
+
+    names = [f"fake-primary-{uuid.uuid4().hex[:8]}", f"fake-fallback-{uuid.uuid4().hex[:8]}"]
+    models = [FakeChatModel(model_name=names[0], error_rate=primary_errors), FakeChatModel(model_name=names[1])]
+    return ResilientChatModel(models=models, names=names, retries=0, hedge=False, backoff=0.0)
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_reply_of_the_default_model_is_cached(monkeypatch, stream):
+    monkeypatch.setenv("JOB_AGENT_RESPONSE_CACHE", "1")
+    agent = JobAgent(model=_resilient(primary_errors=0.0))
+    query = "how do I prepare for a system design interview"
+    # 체크포인터는 프로세스 전역: 캐시는 첫 턴에만 쓰이므로 새 세션 사용
+    session = f"cache-{uuid.uuid4().hex}"
+
+    async def run():
+        if stream:
+            return [e async for e in agent.astream(query, session)][-1]["content"]
+        return await agent.ainvoke(query, session)
+
+    reply = asyncio.run(run())
+    assert agent.response_cache.get(query, agent._cache_namespace) == reply
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_reply_of_a_fallback_model_is_not_cached(monkeypatch, stream):
+    monkeypatch.setenv("JOB_AGENT_RESPONSE_CACHE", "1")
+    agent = JobAgent(model=_resilient(primary_errors=1.0))
+    query = "how do I prepare for a system design interview"
+    # 체크포인터는 프로세스 전역: 캐시는 첫 턴에만 쓰이므로 새 세션 사용
+    session = f"cache-{uuid.uuid4().hex}"
+
+    async def run():
+        if stream:
+            return [e async for e in agent.astream(query, session)][-1]["content"]
+        return await agent.ainvoke(query, session)
+
+    assert asyncio.run(run())
+    assert agent.response_cache.get(query, agent._cache_namespace) is None
+
+
+def test_reply_of_another_tier_is_not_cached(monkeypatch):
+    from model_tiers import ModelTier
+
+    monkeypatch.setenv("JOB_AGENT_RESPONSE_CACHE", "1")
+    agent = JobAgent(model=FakeChatModel())
+    agent._cache_put("resume tips", "reply", ModelTier("deep", "another-model"), [])
+    assert agent.response_cache.get("resume tips", agent._cache_namespace) is None
+    agent._cache_put("resume tips", "reply", agent.tier_router.tiers[0], [])
+    assert agent.response_cache.get("resume tips", agent._cache_namespace) == "reply"
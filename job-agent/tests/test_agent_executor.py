@@ -0,0 +1,64 @@
+import asyncio
+from types import SimpleNamespace
+
+from agent_executor import JobAgentExecutor
+
+
+class _Agent:
+    def __init__(self, events):
+        self.events = events
+
+    async def astream(self, query, session_id):
+        for event in self.events:
+            yield event
+
+
+class _Updater:
+    def __init__(self):
+        self.artifact = ""
+        self.closed = False
+        self.completed = False
+
+    async def start_work(self):
+        pass
+
+    async def update_status(self, *args, **kwargs):
+        pass
+
+    async def add_artifact(self, parts, artifact_id, name, append, last_chunk):
+        text = parts[0].root.text
+        self.artifact = self.artifact + text if append else text
+        self.closed = last_chunk
+
+    async def complete(self):
+        self.completed = True
+
+
+def _run(events):
+    updater = _Updater()
+    executor = JobAgentExecutor(agent=_Agent(events))
+    task = SimpleNamespace(id="t1", context_id="c1")
+    asyncio.run(executor._run("q", task, updater, "job_t1"))
+    assert updater.closed and updater.completed
+    return updater.artifact
+
+
+def test_streamed_tokens_form_the_artifact():
+    reply = "커리어 전환은 작은 프로젝트부터 시작해 보세요. " * 5
+    tokens = [{"type": "token", "content": reply[i:i + 7]} for i in range(0, len(reply), 7)]
+    assert _run([*tokens, {"type": "final", "content": reply}]) == reply
+
+
+def test_text_before_a_tool_call_is_not_left_in_the_artifact():
+    events = [
+        {"type": "token", "content": "Let me search for that first. " * 3},
+        {"type": "tool_call", "name": "search_jobs", "args": {"query": "backend"}},
+        {"type": "tool_result", "name": "search_jobs"},
+        {"type": "token", "content": "Here are three backend roles."},
+        {"type": "final", "content": "Here are three backend roles."},
+    ]
+    assert _run(events) == "Here are three backend roles."
+
+
+def test_reply_without_tokens_is_sent_whole():
+    assert _run([{"type": "final", "content": [{"type": "text", "text": "안녕하세요"}]}]) == "안녕하세요"
@@ -0,0 +1,133 @@
+import asyncio
+import io
+import json
+
+import batch
+import registry
+from admission import Overloaded
+from agent import JobAgent
+from fakes import FakeChatModel
+
+
+def _write_lines(path, lines):
+    path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+    return str(path)
+
+
+def test_read_items_reports_malformed_lines(tmp_path):
+    path = _write_lines(tmp_path / "in.jsonl", [
+        json.dumps({"id": "a", "sessionId": "s1", "query": " 이력서 팁 "}),
+        "{not json",
+        "",
+        json.dumps({"id": "b", "query": ""}),
+        json.dumps(["not", "an", "object"]),
+        json.dumps({"text": "면접 준비", "contextId": "s2"}),
+    ])
+    items = list(batch.read_items(path))
+    assert items[0] == {"id": "a", "line": 1, "session_id": "s1", "query": "이력서 팁"}
+    assert [(i["line"], "error" in i) for i in items] == [(1, False), (2, True), (4, True), (5, True), (6, False)]
+    assert items[2]["error"] == "bad input line: missing query"
+    assert items[4]["id"] == "6" and items[4]["session_id"] == "s2" and items[4]["query"] == "면접 준비"
+    assert [i["line"] for i in batch.read_items(path, limit=2)] == [1, 2]
+
+
+def test_load_checkpoint_drops_a_torn_last_line(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text(
+        json.dumps({"id": "1", "status": "ok"}) + "\n"
+        + json.dumps({"id": "2", "status": "error"}) + "\n"
+        + '{"id": "3", "sta',
+        encoding="utf-8",
+    )
+    assert batch.load_checkpoint(str(path), retry_errors=False) == {"1", "2"}
+    assert path.read_text(encoding="utf-8").endswith('"error"}\n')
+    assert batch.load_checkpoint(str(path), retry_errors=True) == {"1"}
+    assert batch.load_checkpoint(str(tmp_path / "missing.jsonl"), retry_errors=False) == set()
+
+
+class _Agent:
+    """Records the order turns run in; fails the first `overloaded` calls."""
+
+    def __init__(self, delays=None, overloaded=0):
+        self.delays = delays or {}
+        self.overloaded = overloaded
+        self.calls = 0
+        self.events = []
+
+    async def ainvoke(self, query, session_id):
+        self.calls += 1
+        if self.overloaded:
+            self.overloaded -= 1
+            raise Overloaded("queue_full", 0, 503)
+        self.events.append(("start", session_id, query))
+        await asyncio.sleep(self.delays.get(query, 0.01))
+        self.events.append(("end", session_id, query))
+        return f"reply to {query}"
+
+
+def _run_batch(agent, input_path, done=frozenset(), extra=()):
+    args = batch.parse_args([input_path, "--output", "unused.jsonl", "--concurrency", "4", *extra])
+    out = io.StringIO()
+    runner = batch.BatchRunner(agent, args, set(done), out)
+    asyncio.run(runner.run())
+    return runner, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_turns_of_one_session_run_in_file_order(tmp_path):
+    path = _write_lines(tmp_path / "in.jsonl", [
+        json.dumps({"id": "1", "sessionId": "s1", "query": "s1 first"}),
+        json.dumps({"id": "2", "sessionId": "s2", "query": "s2 first"}),
+        json.dumps({"id": "3", "sessionId": "s1", "query": "s1 second"}),
+        json.dumps({"id": "4", "sessionId": "s1", "query": "s1 third"}),
+    ])
+    # 첫 턴이 가장 느려도 같은 세션의 다음 턴은 끝날 때까지 기다림
+    agent = _Agent(delays={"s1 first": 0.1, "s1 second": 0.05})
+    runner, results = _run_batch(agent, path)
+    s1 = [(kind, query) for kind, session, query in agent.events if session == "s1"]
+    assert s1 == [
+        ("start", "s1 first"), ("end", "s1 first"),
+        ("start", "s1 second"), ("end", "s1 second"),
+        ("start", "s1 third"), ("end", "s1 third"),
+    ]
+    # 다른 세션은 기다리지 않음
+    assert agent.events.index(("end", "s2", "s2 first")) < agent.events.index(("end", "s1", "s1 first"))
+    assert runner.counts == {"ok": 4, "error": 0, "skipped": 0}
+    assert not runner._session_tail
+
+
+def test_overloaded_turn_is_retried(tmp_path):
+    path = _write_lines(tmp_path / "in.jsonl", [json.dumps({"id": "1", "query": "hello"})])
+    agent = _Agent(overloaded=2)
+    _, results = _run_batch(agent, path, extra=("--retries", "2"))
+    assert results[0]["status"] == "ok" and results[0]["attempts"] == 3
+    assert agent.calls == 3
+
+    agent = _Agent(overloaded=5)
+    _, results = _run_batch(agent, path, extra=("--retries", "1"))
+    assert results[0]["status"] == "error" and "server busy" in results[0]["error"]
+    assert agent.calls == 2
+
+
+def test_resume_skips_completed_items(tmp_path, monkeypatch):
+    # --fake-model과 같은 구성: registry는 import 시점에 JOB_AGENT_MODEL을 읽으므로 에이전트를 직접 넣음
+    monkeypatch.setenv("JOB_AGENT_SEARCH_BACKEND", "fake")
+    monkeypatch.setattr(registry, "_agent", JobAgent(model=FakeChatModel()))
+    input_path = _write_lines(tmp_path / "in.jsonl", [
+        json.dumps({"id": f"q{i}", "sessionId": f"s{i % 2}", "query": f"커리어 질문 {i}"}) for i in range(5)
+    ])
+    output = tmp_path / "out.jsonl"
+    # 이전 실행: q0은 답변 완료, q1은 오류, q2는 기록 도중 중단
+    output.write_text(
+        json.dumps({"id": "q0", "status": "ok"}) + "\n"
+        + json.dumps({"id": "q1", "status": "error"}) + "\n"
+        + '{"id": "q2", "st',
+        encoding="utf-8",
+    )
+    args = batch.parse_args([input_path, "--output", str(output), "--retry-errors"])
+    report = asyncio.run(batch.run(args))
+
+    assert report["items"] == {"ok": 4, "error": 0, "skipped": 1, "resumed_from_checkpoint": 1}
+    lines = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert sorted(r["id"] for r in lines if r["status"] == "ok") == ["q0", "q1", "q2", "q3", "q4"]
+    assert [r["id"] for r in lines].count("q0") == 1
+    assert all(r["reply"] for r in lines[2:])
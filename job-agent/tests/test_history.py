@@ -0,0 +1,43 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from history import SUMMARY_LINE_CHARS, SUMMARY_PREFIX, HistoryTrimmer
+
+
+def _thread(turns, answer_words=150):
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"question {i}", id=f"h{i}"))
+        messages.append(AIMessage(content=" ".join(f"answer{i}" for _ in range(answer_words)), id=f"a{i}"))
+    messages.append(HumanMessage(content="current question", id="current"))
+    return messages
+
+
+def test_under_budget_is_untouched():
+    trimmer = HistoryTrimmer(token_budget=100_000)
+    messages = _thread(3)
+    update = trimmer({"messages": messages}, {})
+    assert update["llm_input_messages"] == messages
+    assert "context" not in update
+
+
+def test_oldest_turns_fold_into_truncated_lines():
+    trimmer = HistoryTrimmer(token_budget=800, summary_tokens=400)
+    update = trimmer({"messages": _thread(6)}, {})
+    llm_input = update["llm_input_messages"]
+    assert llm_input[0].content.startswith(SUMMARY_PREFIX)
+    assert llm_input[-1].content == "current question"
+    lines = update["context"]["running_summary"].splitlines()
+    assert lines[0] == "- 사용자: question 0"
+    # 긴 답변은 앞부분만, 단어 경계에서 잘려 남음
+    assert lines[1].startswith("- 어시스턴트: answer0 answer0") and lines[1].endswith("answer0…")
+    assert len(lines[1]) <= len("- 어시스턴트: ") + SUMMARY_LINE_CHARS + 1
+
+
+def test_folded_messages_are_not_sent_again():
+    trimmer = HistoryTrimmer(token_budget=800, summary_tokens=400)
+    messages = _thread(6)
+    context = trimmer({"messages": messages}, {})["context"]
+    update = trimmer({"messages": messages, "context": context}, {})
+    sent = {m.id for m in update["llm_input_messages"]}
+    assert context["summarized_until"] not in sent
+    assert "h0" not in sent and "current" in sent
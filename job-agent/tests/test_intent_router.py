@@ -0,0 +1,55 @@
+import pytest
+
+from intent_router import DEFAULT_INTENTS, IntentRouter
+
+
+class _Tool:
+    def invoke(self, args):
+        return f"jobs: {args['query']}"
+
+
+@pytest.fixture
+def router():
+    return IntentRouter(DEFAULT_INTENTS, {"search_jobs": _Tool()})
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "How can I improve my job search strategy?",
+        "job search tips for new grads",
+        "job search tips for new grads?",
+        "Job search: how do I stand out?",
+        "what should I do when my job search stalls",
+        "search jobs or build a portfolio first?",
+        "채용 공고 검색 요령 알려줘",
+        "채용 공고 검색 어떻게 해야 하나요",
+        "신입 채용 공고 검색은 어디서 하나요",
+        "job search",
+    ],
+)
+def test_advice_questions_go_to_the_graph(router, query):
+    assert router.route(query) is None
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("job search backend engineer", "backend engineer"),
+        ("Find jobs: data analyst in Seoul", "data analyst in seoul"),
+        ("채용 공고 검색 백엔드 개발자", "백엔드 개발자"),
+    ],
+)
+def test_search_commands_call_the_tool(router, query, expected):
+    route = router.route(query)
+    assert route is not None and route.intent == "job_search"
+    assert route.args["query"] == expected
+    assert route.run() == f"jobs: {expected}"
+
+
+def test_replies_and_word_boundaries(router):
+    assert router.route("hello").intent == "greeting"
+    assert router.route("this is hard") is None
+    assert router.route("LinkedIn 공고도 찾아줘").intent == "linkedin"
+    stats = router.stats()
+    assert stats["queries"] == 3 and stats["routed"] == 2
@@ -0,0 +1,183 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from admission import Overloaded
+from fakes import FakeModelError
+from model_resilience import CircuitBreaker, ModelUnavailable, ResilientChatModel, is_retryable
+
+
+class _Scripted:
+    """Upstream model whose calls follow `script`: an exception to raise, or (delay, text)."""
+
+    def __init__(self, *script, default=(0.0, "ok")):
+        self.script = list(script)
+        self.default = default
+        self.calls = 0
+        self.opened = 0
+        self.closed = 0
+
+    def _next(self):
+        self.calls += 1
+        step = self.script.pop(0) if self.script else self.default
+        if isinstance(step, BaseException):
+            raise step
+        return step
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        delay, text = self._next()
+        await asyncio.sleep(delay)
+        return AIMessage(content=text, response_metadata={"model_name": "upstream"})
+
+    async def astream(self, messages, config=None, **kwargs):
+        step = self._next()
+        self.opened += 1
+        try:
+            delay, text = step
+            await asyncio.sleep(delay)
+            for word in text.split():
+                yield AIMessageChunk(content=word + " ")
+        finally:
+            self.closed += 1
+
+
+def _chain(*models, **options):
+    # 모델 상태(breaker, 지연 표본)는 이름별 프로세스 전역이므로 테스트마다 새 이름 사용
+    names = [f"{i}-{uuid.uuid4().hex[:8]}" for i in range(len(models))]
+    return ResilientChatModel(models=list(models), names=names, **{"backoff": 0.0, "hedge": False, **options})
+
+
+def test_transient_errors_are_retried():
+    model = _Scripted(FakeModelError("503"), TimeoutError(), (0.0, "answer"))
+    chain = _chain(model, retries=2)
+    reply = asyncio.run(chain.ainvoke("hi"))
+    assert reply.content == "answer"
+    assert model.calls == 3
+    stats = chain.stats()[chain.names[0]]
+    assert stats["retries"] == 2 and stats["errors"] == 2 and stats["breaker"] == "closed"
+
+
+def test_non_retryable_errors_are_raised_as_is():
+    model = _Scripted(ValueError("bad request"))
+    with pytest.raises(ValueError):
+        asyncio.run(_chain(model).ainvoke("hi"))
+    assert model.calls == 1
+    assert not is_retryable(ValueError()) and is_retryable(FakeModelError())
+
+
+def test_call_timeout_counts_as_transient():
+    model = _Scripted((1.0, "too slow"), (0.0, "answer"))
+    reply = asyncio.run(_chain(model, call_timeout=0.05).ainvoke("hi"))
+    assert reply.content == "answer" and model.calls == 2
+
+
+def test_hedge_wins_and_the_slow_call_is_cancelled():
+    model = _Scripted((1.0, "slow"), (0.0, "fast"))
+    chain = _chain(model, hedge=True, hedge_delay=0.05)
+
+    started = time.perf_counter()
+    reply = asyncio.run(chain.ainvoke("hi"))
+    assert reply.content == "fast"
+    assert time.perf_counter() - started < 0.5
+    stats = chain.stats()[chain.names[0]]
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1 and stats["calls"] == 2
+
+
+def test_streamed_hedge_closes_the_losing_stream():
+    model = _Scripted((1.0, "slow reply"), (0.0, "fast reply"))
+    chain = _chain(model, hedge=True, hedge_delay=0.05)
+
+    async def run():
+        return "".join([chunk.content async for chunk in chain.astream("hi")])
+
+    assert asyncio.run(run()) == "fast reply "
+    assert model.opened == 2 and model.closed == 2
+    assert chain.stats()[chain.names[0]]["hedge_wins"] == 1
+
+
+def test_circuit_breaker_opens_half_opens_and_closes():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=0.05)
+    assert breaker.allow()
+    assert not breaker.failure()
+    assert breaker.failure() and breaker.state == "open"
+    assert not breaker.allow() and breaker.retry_after() > 0
+
+    time.sleep(0.06)
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()  # 시험 호출은 하나만
+    assert breaker.failure() and breaker.state == "open"  # 시험 호출 실패: 다시 open
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.state == "closed" and breaker.allow() and breaker.retry_after() == 0.0
+
+
+def test_fallback_chain_is_tried_in_order():
+    primary = _Scripted(default=FakeModelError("503"))
+    first_fallback = _Scripted(default=FakeModelError("503"))
+    second_fallback = _Scripted(default=(0.0, "from the second fallback"))
+    chain = _chain(primary, first_fallback, second_fallback, retries=1)
+
+    reply = asyncio.run(chain.ainvoke("hi"))
+    assert reply.content == "from the second fallback"
+    assert reply.response_metadata["served_by"] == chain.names[2]
+    assert (primary.calls, first_fallback.calls, second_fallback.calls) == (2, 2, 1)
+    stats = chain.stats()
+    assert stats[chain.names[1]]["fallback_calls"] == 1 and stats[chain.names[2]]["fallback_calls"] == 1
+
+
+def test_open_breaker_skips_the_model():
+    primary = _Scripted(default=FakeModelError("503"))
+    fallback = _Scripted()
+    chain = _chain(primary, fallback, retries=0, failure_threshold=1, cooldown=60)
+
+    asyncio.run(chain.ainvoke("first"))
+    asyncio.run(chain.ainvoke("second"))
+    assert primary.calls == 1 and fallback.calls == 2
+    assert chain.stats()[chain.names[0]]["short_circuited"] == 1
+
+
+def test_model_unavailable_when_every_model_is_down():
+    chain = _chain(_Scripted(default=FakeModelError("503")), _Scripted(default=TimeoutError()), retries=1, failure_threshold=2, cooldown=7)
+    with pytest.raises(ModelUnavailable) as info:
+        asyncio.run(chain.ainvoke("hi"))
+    assert isinstance(info.value, Overloaded)
+    assert info.value.status_code == 503 and 1 <= info.value.retry_after <= 7
+
+    # 모든 breaker가 열린 상태: 모델을 호출하지 않고 바로 실패
+    with pytest.raises(ModelUnavailable):
+        asyncio.run(chain.ainvoke("again"))
+    assert all(chain.stats()[name]["short_circuited"] == 1 for name in chain.names)
+
+
+def test_sync_path_retries_and_falls_back():
+    class _SyncScripted(_Scripted):
+        def invoke(self, messages, config=None, **kwargs):
+            delay, text = self._next()
+            return AIMessage(content=text)
+
+    primary = _SyncScripted(default=FakeModelError("503"))
+    fallback = _SyncScripted(FakeModelError("503"), (0.0, "sync answer"))
+    chain = _chain(primary, fallback, retries=1)
+    assert chain.invoke("hi").content == "sync answer"
+    assert (primary.calls, fallback.calls) == (2, 2)
+
+
+def test_streamed_reply_is_marked_once_with_the_serving_model():
+    primary = _Scripted(FakeModelError("503"))
+    fallback = _Scripted(default=(0.0, "three word reply"))
+    chain = _chain(primary, fallback, retries=0)
+
+    async def run():
+        merged = None
+        async for chunk in chain.astream("hi"):
+            merged = chunk if merged is None else merged + chunk
+        return merged
+
+    merged = asyncio.run(run())
+    assert merged.content == "three word reply "
+    assert merged.response_metadata["served_by"] == chain.names[1]
@@ -0,0 +1,50 @@
+import pytest
+
+from model_tiers import ComplexityScorer, ModelTier, TierRouter, parse_tiers
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    return ComplexityScorer()
+
+
+@pytest.mark.parametrize("query", ["thanks!", "Thank you so much", "ok great", "감사합니다", "정말 고마워요", "알겠습니다"])
+def test_acknowledgements_are_smalltalk(scorer, query):
+    features = scorer.features(query)
+    assert features["smalltalk"] == 1.0
+    assert scorer.score(features) == 0.0
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "Is Google a great company to join?",
+        "ok, what are the latest hiring trends?",
+        "thanks, now compare the two offers",
+        "감사원 채용 공고 찾아줘",
+        "감사 인사 문구를 써 주세요",
+        "감사원",
+    ],
+)
+def test_smalltalk_keywords_inside_requests_do_not_count(scorer, query):
+    assert scorer.features(query)["smalltalk"] == 0.0
+
+
+def test_search_request_keeps_its_tool_score(scorer):
+    features = scorer.features("감사원 채용 공고 찾아줘")
+    assert features["tools"] == 1.0
+    assert scorer.score(features) > 0.3
+
+
+def test_tier_router_picks_cheapest_covering_tier():
+    router = TierRouter(parse_tiers("deep=model-c,fast=model-a:0.3,default=model-b:0.7"))
+    assert [t.name for t in router.tiers] == ["fast", "default", "deep"]
+    assert router.choose("thanks!")[0].name == "fast"
+    planning = "Give me a step by step roadmap and compare the pros and cons of a career path transition to data engineering"
+    assert router.choose(planning)[0].name != "fast"
+    assert router.stats()["turns"] == 2
+
+
+def test_single_tier_is_not_scored():
+    router = TierRouter([ModelTier("default", "model-a")])
+    assert router.choose("anything") == (router.tiers[0], 0.0, {})
@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+import pytest
+
+from search_client import FakeSearchBackend, SearchClient, SearchTimeout
+
+
+def test_cache_hit_within_ttl():
+    backend = FakeSearchBackend()
+    client = SearchClient(backend, ttl_seconds=60)
+    first = client.search("Backend  Engineer", 3)
+    # 정규화된 질의가 같으면 같은 캐시 항목
+    assert client.search("backend engineer", 3) == first
+    assert backend.calls == 1
+    assert client.stats()["cache_hits"] == 1
+
+
+def test_cache_entry_expires():
+    backend = FakeSearchBackend()
+    client = SearchClient(backend, ttl_seconds=0.05)
+    client.search("data analyst")
+    time.sleep(0.1)
+    client.search("data analyst")
+    assert backend.calls == 2
+    assert client.stats()["cache_hits"] == 0
+
+
+def test_ttl_zero_disables_the_cache():
+    backend = FakeSearchBackend()
+    client = SearchClient(backend, ttl_seconds=0)
+    client.search("devops")
+    client.search("devops")
+    assert backend.calls == 2 and client.stats()["cached"] == 0
+
+
+def test_concurrent_identical_searches_share_one_fetch():
+    backend = FakeSearchBackend(latency=0.1)
+    client = SearchClient(backend)
+
+    async def run():
+        return await asyncio.gather(*(client.asearch("ml engineer salary") for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert backend.calls == 1
+    assert all(r == results[0] for r in results)
+    stats = client.stats()
+    assert stats["fetches"] == 1 and stats["coalesced"] == 9 and stats["inflight"] == 0
+
+
+def test_timeout_raises_and_the_fetch_still_fills_the_cache():
+    backend = FakeSearchBackend(latency=0.2)
+    client = SearchClient(backend, timeout=0.05)
+    with pytest.raises(SearchTimeout):
+        asyncio.run(client.asearch("slow query"))
+    with pytest.raises(SearchTimeout):
+        client.search("other slow query")
+    assert client.stats()["timeouts"] == 2
+    time.sleep(0.3)
+    assert client.search("slow query")
+    assert backend.calls == 2
+
+
+def test_backend_error_is_raised_and_not_cached():
+    backend = FakeSearchBackend(fail=True)
+    client = SearchClient(backend)
+    with pytest.raises(RuntimeError):
+        client.search("anything")
+    backend.fail = False
+    assert client.search("anything")
+    assert backend.calls == 2 and client.stats()["errors"] == 1
+
+
+def test_abandoned_queued_fetch_is_dropped():
+    # 작업 스레드 1개가 첫 검색으로 막혀 있는 동안, 두 번째 검색의 유일한 대기자가 취소됨
+    backend = FakeSearchBackend(latency=0.2)
+    client = SearchClient(backend, max_workers=1)
+
+    async def run():
+        busy = asyncio.create_task(client.asearch("first"))
+        queued = asyncio.create_task(client.asearch("second"))
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        await busy
+
+    asyncio.run(run())
+    time.sleep(0.05)
+    assert backend.calls == 1
+    assert client.stats()["cancelled"] == 1
+
+
+def test_queued_fetch_is_kept_while_another_waiter_remains():
+    backend = FakeSearchBackend(latency=0.1)
+    client = SearchClient(backend, max_workers=1)
+
+    async def run():
+        busy = asyncio.create_task(client.asearch("first"))
+        waiters = [asyncio.create_task(client.asearch("shared")) for _ in range(2)]
+        await asyncio.sleep(0.02)
+        waiters[0].cancel()
+        await busy
+        return await waiters[1]
+
+    assert asyncio.run(run())
+    assert backend.calls == 2
+    assert client.stats()["cancelled"] == 0
@@ -0,0 +1,78 @@
+"""
+Small text helpers shared by the prompt-size and search features.
+"""
+
+import re
+import unicodedata
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate that does not need the model's tokenizer.
+
+    Latin text averages ~4 characters per token; Hangul and other non-ASCII
+    characters tokenize far less densely, so they are counted at ~1.5 chars
+    per token. Good enough for budgeting, not for billing.
+    """
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    other_chars = len(text) - ascii_chars
+    return int(ascii_chars / 4 + other_chars / 1.5) + 1
+
+
+def content_text(content) -> str:
+    """Flatten a message content (str or list of parts) into plain text."""
+    if isinstance(content, str):
+        return content
+    texts = []
+    for part in content or []:
+        if isinstance(part, str):
+            texts.append(part)
+        elif isinstance(part, dict) and part.get("type", "text") == "text":
+            texts.append(part.get("text", ""))
+    return "".join(texts)
+
+
+_PUNCT_TRANSLATION = str.maketrans({ch: " " for ch in "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~…·“”‘’「」『』、。！？"})
+
+
+def normalize_query(text: str) -> str:
+    """Canonical form of a user query: NFKC, lower case, no punctuation, single spaces."""
+    text = unicodedata.normalize("NFKC", text or "").lower().translate(_PUNCT_TRANSLATION)
+    return " ".join(text.split())
+
+
+def char_ngrams(text: str, n: int = 3) -> set[str]:
+    """Character n-grams of a normalized string (spaces removed).
+
+    Works the same for Korean and English without a tokenizer, which makes it
+    a good fit for lexical near-duplicate matching of short queries.
+    """
+    compact = text.replace(" ", "")
+    if len(compact) <= n:
+        return {compact} if compact else set()
+    return {compact[i:i + n] for i in range(len(compact) - n + 1)}
+
+
+_WORD_RE = re.compile(r"[0-9a-z]+|[가-힣]+")
+
+
+def split_words(text: str) -> list[str]:
+    """Latin and Hangul words of text that is already NFKC-normalized (lower-cased here)."""
+    return _WORD_RE.findall(text.lower())
+
+
+def tokenize(text: str) -> list[str]:
+    """Index/search terms: Latin words plus Hangul character bigrams.
+
+    Korean attaches particles to nouns ("개발자를", "개발자가"), so Hangul
+    words are split into overlapping bigrams; "개발자" and "개발자를" then
+    share the terms "개발" and "발자" without needing a morphological analyzer.
+    """
+    tokens: list[str] = []
+    for word in split_words(normalize_query(text)):
+        if len(word) > 1 and "가" <= word[0] <= "힣":
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
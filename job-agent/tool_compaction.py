@@ -0,0 +1,243 @@
+"""
+Compaction of tool results before they reach the model.
+
+Tool outputs are added to the prompt as-is and stay in the checkpointed
+history, so low-value text (repeated snippets, boilerplate sentences, long
+URLs) is paid for on every later model call of the conversation.
+`ToolOutputCompactor.compact` rewrites one result to fit its tool's token
+budget:
+
+1. Web search results (the JSON list returned by `web_search`, locally or
+   from the MCP server) are split into sentences per result; plain-text
+   results into lines.
+2. Repeated results (same URL) and near-duplicate sentences (character
+   trigram overlap) are dropped.
+3. Sentences are scored against the user query and the tool call's own
+   query (BM25-style term weights over the result's sentences, with a small
+   bonus for leading sentences and top-ranked results). In search results,
+   sentences sharing no term with the query are dropped, except each
+   result's first one.
+4. The best sentences are kept until the budget is used up, and printed in
+   their original order under each result's title and URL.
+
+Results already within budget are returned unchanged (apart from search
+JSON, which is always rendered compactly). `stats` records bytes and
+estimated tokens before and after, per tool.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlsplit, urlunsplit
+
+from textutil import char_ngrams, estimate_tokens, normalize_query, tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOOL_TOKEN_BUDGETS = {"web_search": 400, "search_jobs": 700}
+
+# 문장 경계: 마침표/물음표/느낌표 뒤 공백, 또는 줄바꿈
+_SENTENCE_RE = re.compile(r"(?<=[.!?。！？])\s+|\n+")
+# 이 비율 이상 trigram이 겹치면 같은 문장으로 봄
+NEAR_DUPLICATE = 0.8
+# 너무 짧은 조각("...", "더보기")은 문장으로 취급하지 않음
+MIN_SENTENCE_CHARS = 8
+
+
+@dataclass
+class _Doc:
+    title: str = ""
+    url: str = ""
+    sentences: list[str] = field(default_factory=list)
+    # 평문 결과는 줄 단위로 고르고 줄바꿈으로 다시 이어 붙임
+    separator: str = " "
+
+
+def _parse_budgets(spec: str) -> dict[str, int]:
+    """Parse "web_search=400,search_jobs=700" into a dict."""
+    budgets = {}
+    for item in spec.split(","):
+        name, sep, value = item.partition("=")
+        if sep and name.strip():
+            budgets[name.strip()] = int(value)
+    return budgets
+
+
+def _short_url(url: str) -> str:
+    # 추적 파라미터 등 query/fragment는 모델에 필요 없음
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+
+def _sentences(text: str) -> list[str]:
+    return [s.strip() for s in _SENTENCE_RE.split(text or "") if len(s.strip()) >= MIN_SENTENCE_CHARS]
+
+
+def _search_docs(text: str) -> list[_Doc] | None:
+    """Documents of a web search JSON result, or None if `text` is not one."""
+    if not text.startswith("["):
+        return None
+    try:
+        items = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+        return None
+    return [
+        _Doc(
+            title=str(item.get("title") or ""),
+            url=_short_url(str(item.get("href") or item.get("url") or "")),
+            sentences=_sentences(str(item.get("body") or item.get("snippet") or "")),
+        )
+        for item in items
+    ]
+
+
+class ToolOutputCompactor:
+    """Per-tool token budgets for tool results.
+
+    Args:
+        budgets: Token budget per tool name.
+        default_budget: Budget for tools not in `budgets` (0 = leave as is).
+    """
+
+    def __init__(self, budgets: dict[str, int] | None = None, default_budget: int = 800):
+        self.budgets = {**DEFAULT_TOOL_TOKEN_BUDGETS, **(budgets or {})}
+        self.default_budget = default_budget
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls) -> "ToolOutputCompactor | None":
+        """Build from env; None when JOB_AGENT_TOOL_COMPACTION=0."""
+        if os.getenv("JOB_AGENT_TOOL_COMPACTION", "1") == "0":
+            return None
+        return cls(
+            budgets=_parse_budgets(os.getenv("JOB_AGENT_TOOL_TOKEN_BUDGETS", "")),
+            default_budget=int(os.getenv("JOB_AGENT_TOOL_TOKEN_BUDGET", "800")),
+        )
+
+    def compact(self, tool: str, output: Any, query: str = "") -> Any:
+        """`output` fitted to the budget of `tool`, ranked against `query`."""
+        if not isinstance(output, str):
+            return output
+        budget = self.budgets.get(tool, self.default_budget)
+        tokens_in = estimate_tokens(output)
+
+        docs = _search_docs(output)
+        search = docs is not None
+        if not search:
+            if budget <= 0 or tokens_in <= budget:
+                self._record(tool, output, output, tokens_in, tokens_in)
+                return output
+            docs = [_Doc(sentences=[line.strip() for line in output.splitlines() if line.strip()], separator="\n")]
+        compacted = self._render(self._select(docs, query, budget, drop_unrelated=search))
+        self._record(tool, output, compacted, tokens_in, estimate_tokens(compacted))
+        return compacted
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {
+                    **counts,
+                    "token_ratio": counts["tokens_out"] / counts["tokens_in"] if counts["tokens_in"] else 1.0,
+                }
+                for name, counts in self._counters.items()
+            }
+
+    # --- internals --------------------------------------------------------------
+
+    def _select(self, docs: list[_Doc], query: str, budget: int, drop_unrelated: bool) -> list[_Doc]:
+        """Deduplicate, score and keep the best sentences within `budget` tokens."""
+        seen_urls: set[str] = set()
+        kept_shingles: list[set[str]] = []
+        # (doc index, sentence index, sentence)
+        candidates: list[tuple[int, int, str]] = []
+        for d, doc in enumerate(docs):
+            if doc.url and doc.url in seen_urls:
+                doc.sentences = []
+                continue
+            seen_urls.add(doc.url)
+            for s, sentence in enumerate(doc.sentences):
+                shingles = char_ngrams(normalize_query(sentence))
+                if any(len(shingles & k) >= NEAR_DUPLICATE * min(len(shingles), len(k)) for k in kept_shingles):
+                    continue
+                kept_shingles.append(shingles)
+                candidates.append((d, s, sentence))
+
+        query_terms = set(tokenize(query))
+        sentence_terms = [set(tokenize(sentence)) for _, _, sentence in candidates]
+        n = len(candidates)
+        df: dict[str, int] = {}
+        for terms in sentence_terms:
+            for term in terms & query_terms:
+                df[term] = df.get(term, 0) + 1
+
+        scored = []
+        for (d, s, sentence), terms in zip(candidates, sentence_terms):
+            relevance = sum(math.log(1 + n / df[t]) for t in terms & query_terms)
+            if drop_unrelated and query_terms and not relevance and s > 0:
+                continue  # 질문과 무관한 본문 문장 (쿠키 안내, 구독 권유 등)
+            # 짧은 문장이 유리하도록 길이로 나누되, 앞쪽 결과/첫 문장에 약간의 가점
+            score = relevance / math.sqrt(max(len(terms), 1)) + 0.3 / (1 + s) + 0.2 / (1 + d)
+            scored.append((score, d, s, sentence))
+        scored.sort(key=lambda item: -item[0])
+
+        headers_paid: set[int] = set()
+        used = 0
+        chosen: dict[int, list[tuple[int, str]]] = {}
+        for _, d, s, sentence in scored:
+            cost = estimate_tokens(sentence)
+            if d not in headers_paid:
+                cost += estimate_tokens(f"{docs[d].title} {docs[d].url}") + 2
+            if used + cost > budget and used > 0:
+                continue
+            used += cost
+            headers_paid.add(d)
+            chosen.setdefault(d, []).append((s, sentence))
+
+        return [
+            _Doc(
+                title=docs[d].title,
+                url=docs[d].url,
+                sentences=[sentence for _, sentence in sorted(chosen[d])],
+                separator=docs[d].separator,
+            )
+            for d in sorted(chosen)
+        ]
+
+    @staticmethod
+    def _render(docs: list[_Doc]) -> str:
+        blocks = []
+        for i, doc in enumerate(docs, 1):
+            if not doc.title and not doc.url:
+                blocks.append(doc.separator.join(doc.sentences))
+                continue
+            lines = [f"{i}. {doc.title}".rstrip()]
+            if doc.url:
+                lines.append(f"   URL: {doc.url}")
+            if doc.sentences:
+                lines.append(f"   {' '.join(doc.sentences)}")
+            blocks.append("\n".join(lines))
+        return "\n\n".join(blocks)
+
+    def _record(self, tool: str, before: str, after: str, tokens_in: int, tokens_out: int) -> None:
+        with self._lock:
+            counts = self._counters.setdefault(
+                tool, {"calls": 0, "compacted": 0, "bytes_in": 0, "bytes_out": 0, "tokens_in": 0, "tokens_out": 0}
+            )
+            counts["calls"] += 1
+            counts["compacted"] += after is not before
+            counts["bytes_in"] += len(before.encode("utf-8"))
+            counts["bytes_out"] += len(after.encode("utf-8"))
+            counts["tokens_in"] += tokens_in
+            counts["tokens_out"] += tokens_out
+        logger.debug("tool %s output %d -> %d tokens", tool, tokens_in, tokens_out)
@@ -0,0 +1,166 @@
+"""
+Speculative web search prefetch: start the search a turn will probably need
+at the same time as the turn's first model call.
+
+In the ReAct loop the model asks for `web_search` only after its first
+round trip, so the search and the model call wait one after the other.
+`SearchPrefetcher` looks at the user's message for wording that usually
+ends in a web search (trends, salaries, "latest", news, outlook) and, if it
+finds some, starts the search with the message as the query while the
+model is still thinking.
+
+When the model then calls `web_search` in that turn with a query close to
+the prefetched one (most of its terms appear in the message, default
+count), `ToolGuard` hands it the prefetched result instead of searching
+again. Searches the model never asks for are cancelled at the end of the
+turn (a fetch already running still fills the search cache).
+
+`stats` counts prefetches, hits (tool calls served by a prefetch), misses
+(web searches with no usable prefetch) and waste (prefetches nobody used),
+plus the search time taken off the critical path.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from intent_router import AhoCorasick
+from textutil import normalize_query, tokenize
+
+logger = logging.getLogger(__name__)
+
+# run config key holding the turn's `Prefetch` ("__" keeps it out of checkpoint metadata)
+PREFETCH_KEY = "__job_agent_prefetch"
+
+# 웹 검색으로 이어지는 경우가 많은 표현 (normalize_query 기준으로 비교)
+DEFAULT_PREFETCH_KEYWORDS = [
+    "최신", "요즘", "최근", "트렌드", "동향", "전망", "뉴스", "연봉", "평균 연봉", "시장", "올해", "현황", "통계",
+    "latest", "recent", "trend", "trends", "news", "salary", "salaries", "outlook", "market", "this year",
+]
+# 검색어 길이 (모델 쪽 fake와 MCP 서버도 100자 이내 검색어를 씀)
+MAX_QUERY_CHARS = 100
+DEFAULT_COUNT = 5
+
+
+@dataclass
+class Prefetch:
+    """One speculative search of a turn."""
+
+    query: str
+    terms: set[str]
+    task: asyncio.Task
+    started_at: float = field(default_factory=time.perf_counter)
+    done_at: float | None = None
+    used: bool = False
+
+
+class SearchPrefetcher:
+    """Starts likely web searches early and serves matching tool calls from them.
+
+    Args:
+        keywords: Phrases in the user message that trigger a prefetch.
+        similarity: Share of the tool call's query terms that must appear in
+            the prefetched query for the prefetch to be used.
+        tool_name: Name of the search tool.
+    """
+
+    def __init__(self, keywords: list[str] | None = None, similarity: float = 0.6, tool_name: str = "web_search"):
+        self.similarity = similarity
+        self.tool_name = tool_name
+        self.tool = None  # 원본 검색 도구 (ToolGuard.wrap에서 설정)
+        self._matcher = AhoCorasick([(normalize_query(k), k) for k in keywords or DEFAULT_PREFETCH_KEYWORDS])
+        self._lock = threading.Lock()
+        self._counters = {"prefetched": 0, "hits": 0, "misses": 0, "wasted": 0, "failed": 0}
+        self._saved_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> "SearchPrefetcher | None":
+        """Build from env; None when JOB_AGENT_PREFETCH=0."""
+        if os.getenv("JOB_AGENT_PREFETCH", "1") == "0":
+            return None
+        return cls(similarity=float(os.getenv("JOB_AGENT_PREFETCH_SIMILARITY", "0.6")))
+
+    def predict(self, query: str) -> str | None:
+        """Search query to prefetch for the user message `query`, or None."""
+        text = normalize_query(query)
+        for start, end, _ in self._matcher.finditer(text):
+            # 영문 키워드는 단어 단위로만
+            if text[start:end].isascii() and (
+                (start > 0 and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum())
+            ):
+                continue
+            return query.strip()[:MAX_QUERY_CHARS]
+        return None
+
+    def start(self, query: str, tool_options: dict[str, Any]) -> Prefetch | None:
+        """Start the prefetch for this turn's message (on the running loop)."""
+        if self.tool is None:
+            return None
+        search_query = self.predict(query)
+        if search_query is None:
+            return None
+        task = asyncio.create_task(self.tool.ainvoke({"query": search_query}, tool_options))
+        prefetch = Prefetch(query=search_query, terms=set(tokenize(search_query)), task=task)
+
+        def done(task: asyncio.Task) -> None:
+            prefetch.done_at = time.perf_counter()
+            if not task.cancelled() and task.exception() is not None:
+                self._count("failed")
+
+        task.add_done_callback(done)
+        self._count("prefetched")
+        logger.debug("prefetching web search %r", search_query)
+        return prefetch
+
+    def claim(self, prefetch: Prefetch | None, kwargs: dict[str, Any]) -> asyncio.Task | None:
+        """The prefetched search to use for a tool call with `kwargs`, or None."""
+        if prefetch is None or not self._matches(prefetch, kwargs):
+            self._count("misses")
+            return None
+        prefetch.used = True
+        now = time.perf_counter()
+        with self._lock:
+            self._counters["hits"] += 1
+            # 도구 호출 전에 이미 진행된 검색 시간만큼 임계 경로에서 빠짐
+            self._saved_seconds += min(now, prefetch.done_at or now) - prefetch.started_at
+        return prefetch.task
+
+    def finish(self, prefetch: Prefetch | None) -> None:
+        """End of the turn: drop an unused prefetch."""
+        if prefetch is None or prefetch.used:
+            return
+        self._count("wasted")
+        if not prefetch.task.done():
+            prefetch.task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counters)
+            saved = self._saved_seconds
+        searches = counts["hits"] + counts["misses"]
+        return {
+            **counts,
+            "hit_rate": counts["hits"] / searches if searches else 0.0,
+            "waste_rate": counts["wasted"] / counts["prefetched"] if counts["prefetched"] else 0.0,
+            "saved_seconds": saved,
+        }
+
+    # --- internals --------------------------------------------------------------
+
+    def _matches(self, prefetch: Prefetch, kwargs: dict[str, Any]) -> bool:
+        if prefetch.used or kwargs.get("count", DEFAULT_COUNT) != DEFAULT_COUNT:
+            return False
+        if prefetch.task.done() and (prefetch.task.cancelled() or prefetch.task.exception() is not None):
+            return False
+        terms = set(tokenize(str(kwargs.get("query") or "")))
+        if not terms:
+            return False
+        return len(terms & prefetch.terms) >= self.similarity * len(terms)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
@@ -0,0 +1,216 @@
+"""
+Per-tool timeouts, fallback results and a per-turn deadline for agent tools.
+
+`ToolGuard.wrap` returns a drop-in copy of a tool (same name, description and
+argument schema) that:
+
+- gives up after the tool's timeout, capped by what is left of the turn's
+  deadline, and returns a short fallback message instead of raising, so the
+  model can still answer with the other tools' results
+- turns tool exceptions into the same kind of fallback result
+- counts calls, timeouts, errors and deadline skips per tool (`stats`)
+- optionally compacts successful results to a per-tool token budget,
+  ranked against the user query (`tool_compaction.ToolOutputCompactor`)
+- optionally serves web searches from a search started speculatively with
+  the turn (`prefetch`, `tool_prefetch.SearchPrefetcher`)
+
+The turn deadline starts once the turn has its concurrency slot
+(`ToolGuard.start_deadline`) and travels in the run config, so it reaches
+tools running in parallel branches of the graph and in executor threads.
+Timed-out sync tools keep running in their worker thread; only the turn
+stops waiting for them. The agent bounds the async graph run itself with
+the same deadline (see `JobAgent.ainvoke`).
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Iterator
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, StructuredTool
+
+from tool_compaction import ToolOutputCompactor
+from tool_prefetch import PREFETCH_KEY, SearchPrefetcher
+
+logger = logging.getLogger(__name__)
+
+# run config key holding the turn deadline (time.monotonic() value); "__" keeps
+# it out of checkpoint metadata
+DEADLINE_KEY = "__job_agent_turn_deadline"
+# run config key holding the user's message of the turn (for result compaction)
+QUERY_KEY = "__job_agent_user_query"
+
+# the wrapper's own tool run is the one traced; don't report the inner call again
+_NO_CALLBACKS: RunnableConfig = {"callbacks": []}
+
+DEFAULT_TOOL_TIMEOUTS = {"web_search": 8.0, "search_jobs": 2.0}
+
+
+def _parse_timeouts(spec: str) -> dict[str, float]:
+    """Parse "web_search=6,search_jobs=1.5" into a dict."""
+    timeouts = {}
+    for item in spec.split(","):
+        name, sep, value = item.partition("=")
+        if sep and name.strip():
+            timeouts[name.strip()] = float(value)
+    return timeouts
+
+
+class ToolGuard:
+    """Timeouts and fallbacks for a set of tools.
+
+    Args:
+        timeouts: Seconds per tool name.
+        default_timeout: Seconds for tools not in `timeouts`.
+        turn_deadline: Seconds a whole turn may spend (0 disables the deadline).
+        max_workers: Threads for sync tool calls made through `invoke`.
+        compactor: Rewrites successful results to fit the prompt (optional).
+        prefetcher: Starts likely web searches with the turn (optional).
+    """
+
+    def __init__(
+        self,
+        timeouts: dict[str, float] | None = None,
+        default_timeout: float = 10.0,
+        turn_deadline: float = 30.0,
+        max_workers: int = 8,
+        compactor: ToolOutputCompactor | None = None,
+        prefetcher: SearchPrefetcher | None = None,
+    ):
+        self.timeouts = {**DEFAULT_TOOL_TIMEOUTS, **(timeouts or {})}
+        self.default_timeout = default_timeout
+        self.turn_deadline = turn_deadline
+        self.compactor = compactor
+        self.prefetcher = prefetcher
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-tool")
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls) -> "ToolGuard":
+        return cls(
+            timeouts=_parse_timeouts(os.getenv("JOB_AGENT_TOOL_TIMEOUTS", "")),
+            default_timeout=float(os.getenv("JOB_AGENT_TOOL_TIMEOUT", "10")),
+            turn_deadline=float(os.getenv("JOB_AGENT_TURN_DEADLINE", "30")),
+            compactor=ToolOutputCompactor.from_env(),
+            prefetcher=SearchPrefetcher.from_env(),
+        )
+
+    def turn_config(self, config: dict[str, Any], query: str | None = None) -> dict[str, Any]:
+        """`config` with the turn's user query added to ``configurable``."""
+        configurable = dict(config.get("configurable", {}))
+        if query is not None:
+            configurable[QUERY_KEY] = query
+        return {**config, "configurable": configurable}
+
+    def start_deadline(self, config: dict[str, Any]) -> dict[str, Any]:
+        """`config` with the turn deadline starting now.
+
+        Call it once the turn holds its concurrency slot, so time spent
+        queued is not taken from the tools.
+        """
+        if self.turn_deadline <= 0:
+            return config
+        configurable = {**config.get("configurable", {}), DEADLINE_KEY: time.monotonic() + self.turn_deadline}
+        return {**config, "configurable": configurable}
+
+    @contextmanager
+    def prefetch(self, config: dict[str, Any], query: str) -> Iterator[dict[str, Any]]:
+        """`config` carrying a speculative web search for `query`, if it looks like it needs one.
+
+        Use around the graph run (on the event loop); an unused prefetch is
+        dropped on exit.
+        """
+        prefetch = self.prefetcher.start(query, _NO_CALLBACKS) if self.prefetcher is not None else None
+        if prefetch is None:
+            yield config
+            return
+        try:
+            yield {**config, "configurable": {**config.get("configurable", {}), PREFETCH_KEY: prefetch}}
+        finally:
+            self.prefetcher.finish(prefetch)
+
+    def wrap(self, tool: BaseTool) -> StructuredTool:
+        name = tool.name
+        with self._lock:
+            self._counters.setdefault(name, {"calls": 0, "timeouts": 0, "errors": 0, "deadline_skips": 0})
+        prefetcher = self.prefetcher if self.prefetcher is not None and name == self.prefetcher.tool_name else None
+        if prefetcher is not None:
+            prefetcher.tool = tool
+
+        def run(config: RunnableConfig, **kwargs: Any) -> str:
+            budget = self._budget(name, config)
+            if budget is None:
+                return self._fallback(name, "deadline_skips", "턴 응답 시간 한도를 초과하여 실행하지 않았습니다")
+            future = self._executor.submit(tool.invoke, kwargs, _NO_CALLBACKS)
+            try:
+                return self._compact(name, future.result(timeout=budget), kwargs, config)
+            except FutureTimeoutError:
+                return self._fallback(name, "timeouts", f"{budget:.1f}초 안에 응답하지 않았습니다")
+            except Exception as e:
+                return self._fallback(name, "errors", f"오류가 발생했습니다 ({e})")
+
+        async def arun(config: RunnableConfig, **kwargs: Any) -> str:
+            budget = self._budget(name, config)
+            if budget is None:
+                return self._fallback(name, "deadline_skips", "턴 응답 시간 한도를 초과하여 실행하지 않았습니다")
+            prefetched = None
+            if prefetcher is not None:
+                prefetched = prefetcher.claim(((config or {}).get("configurable") or {}).get(PREFETCH_KEY), kwargs)
+            try:
+                call = prefetched if prefetched is not None else tool.ainvoke(kwargs, _NO_CALLBACKS)
+                result = await asyncio.wait_for(call, budget)
+                return self._compact(name, result, kwargs, config)
+            except asyncio.TimeoutError:
+                return self._fallback(name, "timeouts", f"{budget:.1f}초 안에 응답하지 않았습니다")
+            except Exception as e:
+                return self._fallback(name, "errors", f"오류가 발생했습니다 ({e})")
+
+        return StructuredTool.from_function(
+            func=run,
+            coroutine=arun,
+            name=name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+        )
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Per-tool counters; ``degraded`` is every call answered with a fallback."""
+        with self._lock:
+            return {
+                name: {**counts, "degraded": counts["timeouts"] + counts["errors"] + counts["deadline_skips"]}
+                for name, counts in self._counters.items()
+            }
+
+    def _budget(self, name: str, config: RunnableConfig | None) -> float | None:
+        """Seconds this call may take, or None if the turn deadline already passed."""
+        with self._lock:
+            self._counters[name]["calls"] += 1
+        budget = self.timeouts.get(name, self.default_timeout)
+        deadline = ((config or {}).get("configurable") or {}).get(DEADLINE_KEY)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            budget = min(budget, remaining)
+        return budget
+
+    def _compact(self, name: str, result: Any, kwargs: dict[str, Any], config: RunnableConfig | None) -> Any:
+        if self.compactor is None:
+            return result
+        # 사용자 질문과 도구 호출의 검색어 모두에 대해 문장 관련도 계산
+        user_query = ((config or {}).get("configurable") or {}).get(QUERY_KEY) or ""
+        query = f"{user_query} {kwargs.get('query') or ''}".strip()
+        return self.compactor.compact(name, result, query)
+
+    def _fallback(self, name: str, counter: str, reason: str) -> str:
+        with self._lock:
+            self._counters[name][counter] += 1
+        logger.warning("tool %s degraded (%s): %s", name, counter, reason)
+        return f"[{name}] 결과를 가져오지 못했습니다: {reason}. 이 도구 없이 답변하세요."
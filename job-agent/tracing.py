@@ -0,0 +1,319 @@
+"""
+Lightweight request tracing: spans for HTTP/A2A requests, the executor,
+LangGraph nodes, model calls (with token counts) and tool calls.
+
+- `tracer.span(name, **attributes)` opens a span; the current span lives in
+  a contextvar, so child spans (and spans opened in tasks spawned inside it)
+  are linked automatically.
+- `TracingCallbackHandler` turns LangChain/LangGraph callbacks into spans:
+  the graph run, each node (``node <name>``), each chat model call
+  (``model <name>``, with input/output token counts) and each tool call
+  (``tool <name>``).
+- `TracingMiddleware` is a pure ASGI middleware with one span per HTTP
+  request (A2A JSON-RPC, /chat, ...).
+
+Every finished span feeds the `/metrics` latency histogram of its name.
+Spans are exported only when a sink is configured, from a background
+thread, so request handlers never wait on disk or network I/O:
+
+- JOB_AGENT_TRACE_FILE: append spans as JSON lines to this file
+- JOB_AGENT_OTLP_ENDPOINT: POST batches as OTLP/HTTP JSON, e.g.
+  ``http://localhost:4318/v1/traces``
+"""
+
+import contextvars
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "job-agent"
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+    _start: float = field(default_factory=time.perf_counter, repr=False)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6 if self.end_ns else None,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span) -> dict[str, Any]:
+    otlp = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        otlp["parentSpanId"] = span.parent_id
+    return otlp
+
+
+class SpanExporter:
+    """Writes finished spans from a background thread (file and/or OTLP)."""
+
+    def __init__(self, path: str | None = None, otlp_endpoint: str | None = None, batch_size: int = 256, max_queue: int = 10000):
+        self.path = path
+        self.otlp_endpoint = otlp_endpoint
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            # 내보내기가 밀리면 요청 처리를 막지 않고 버림
+            self.dropped += 1
+
+    def _run(self) -> None:
+        client = None
+        if self.otlp_endpoint:
+            import httpx
+
+            client = httpx.Client(timeout=5.0)
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=0.2))
+                except queue.Empty:
+                    break
+            try:
+                if self.path:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        for span in batch:
+                            f.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+                if client is not None:
+                    client.post(self.otlp_endpoint, json=self._otlp_payload(batch)).raise_for_status()
+            except Exception:
+                logger.exception("span export failed (%d spans dropped)", len(batch))
+
+    @staticmethod
+    def _otlp_payload(batch: list[Span]) -> dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                    "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": [_otlp_span(s) for s in batch]}],
+                }
+            ]
+        }
+
+
+class Tracer:
+    def __init__(self, exporter: SpanExporter | None = None):
+        self.exporter = exporter
+        self._current: contextvars.ContextVar[Span | None] = contextvars.ContextVar("job_agent_span", default=None)
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        path = os.getenv("JOB_AGENT_TRACE_FILE")
+        endpoint = os.getenv("JOB_AGENT_OTLP_ENDPOINT")
+        return cls(SpanExporter(path, endpoint) if path or endpoint else None)
+
+    def current(self) -> Span | None:
+        return self._current.get()
+
+    def start(self, name: str, parent: Span | None = None, **attributes: Any) -> Span:
+        """Start a span without making it current (see `span` for the usual form)."""
+        if parent is None:
+            parent = self._current.get()
+        return Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes,
+        )
+
+    def end(self, span: Span, error: BaseException | str | None = None) -> None:
+        span.end_ns = time.time_ns()
+        if error is not None:
+            span.error = error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+        metrics.observe(span.name, time.perf_counter() - span._start)
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        span = self.start(name, **attributes)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            self.end(span, e)
+            raise
+        else:
+            self.end(span)
+        finally:
+            try:
+                self._current.reset(token)
+            except ValueError:
+                # async generator closed from another context
+                pass
+
+
+tracer = Tracer.from_env()
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """LangChain callbacks -> spans for the graph, its nodes, model and tool calls."""
+
+    # 콜백을 이벤트 루프에서 바로 실행 (현재 span contextvar를 그대로 보기 위해)
+    run_inline = True
+
+    def __init__(self, tracer: Tracer = tracer):
+        self.tracer = tracer
+        self._lock = threading.Lock()
+        # run_id -> (span or None, parent span) ; runs without their own span
+        # (prompt, routing, ...) just pass their parent through
+        self._runs: dict[UUID, tuple[Span | None, Span | None]] = {}
+
+    def _parent(self, parent_run_id: UUID | None) -> Span | None:
+        if parent_run_id is not None:
+            with self._lock:
+                entry = self._runs.get(parent_run_id)
+            if entry is not None:
+                return entry[0] or entry[1]
+        return self.tracer.current()
+
+    def _open(self, run_id: UUID, parent_run_id: UUID | None, name: str | None, **attributes: Any) -> None:
+        parent = self._parent(parent_run_id)
+        span = self.tracer.start(name, parent=parent, **attributes) if name else None
+        with self._lock:
+            self._runs[run_id] = (span, parent)
+
+    def _close(self, run_id: UUID, error: BaseException | None = None, **attributes: Any) -> None:
+        with self._lock:
+            entry = self._runs.pop(run_id, None)
+        if entry is not None and entry[0] is not None:
+            entry[0].set(**attributes)
+            self.tracer.end(entry[0], error)
+
+    # --- graph and nodes ----------------------------------------------------
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        name = kwargs.get("name") or (serialized or {}).get("name")
+        node = metadata.get("langgraph_node")
+        if parent_run_id is None:
+            span_name = "graph"
+        elif node and name == node:
+            span_name = f"node {node}"
+        else:
+            span_name = None
+        attributes = {"thread_id": metadata["thread_id"]} if span_name == "graph" and "thread_id" in metadata else {}
+        self._open(run_id, parent_run_id, span_name, **attributes)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._close(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, error)
+
+    # --- model calls -----------------------------------------------------------
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        model = (metadata or {}).get("ls_model_name") or kwargs.get("name") or "chat_model"
+        self._open(run_id, parent_run_id, f"model {model}", messages=sum(len(m) for m in messages))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage: dict[str, Any] = {}
+        for generations in response.generations:
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                for key in ("input_tokens", "output_tokens", "total_tokens"):
+                    if key in metadata:
+                        usage[key] = usage.get(key, 0) + metadata[key]
+        self._close(run_id, **usage)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, error)
+
+    # --- tools ----------------------------------------------------------------
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+        self._open(run_id, parent_run_id, f"tool {name}")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._close(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, error)
+
+
+class TracingMiddleware:
+    """ASGI middleware: one span (and latency sample) per HTTP request."""
+
+    def __init__(self, app, tracer: Tracer = tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        with self.tracer.span(f"http {scope['method']} {scope['path']}") as span:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    span.set(status_code=message["status"])
+                    if message["status"] == 404:
+                        # 알 수 없는 경로마다 히스토그램이 생기지 않도록 묶음
+                        span.name = "http 404"
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -2,48 +2,78 @@
 Minimal MCP server exposing a web_search tool via DuckDuckGo (no API key).
 
 Protocol: Model Context Protocol (MCP)
-Transport: stdio (default)
+Transport: stdio (default) or streamable HTTP
 
 Run locally (example):
   python web_search_server.py
+  python web_search_server.py --transport streamable-http --host 0.0.0.0 --port 8001
 
-Client usage (via langchain-mcp-adapters): connect as command "python" with args ["/abs/path/to/web_search_server.py"].
+Client usage (via langchain-mcp-adapters):
+  - stdio: connect as command "python" with args ["/abs/path/to/web_search_server.py"]
+  - streamable HTTP: {"transport": "streamable_http", "url": "http://host:8001/mcp"};
+    the Job Agent does this itself when JOB_AGENT_MCP_URL is set (see mcp_tools.py)
+
+The tool is async and searches run in the shared search client's thread
+pool, so one server handles many searches at once. Results are cached and
+concurrent identical queries share one fetch, across every agent instance
+connected to the server.
 """
 
+import argparse
 import json
+import os
 import sys
+import threading
+from collections import OrderedDict
 from typing import List
 
 from mcp.server import FastMCP
 
+from registry import get_search_client
+
+# 캐시된 검색 결과(같은 list 객체)의 JSON 직렬화 재사용
+_JSON_CACHE_SIZE = 256
+_json_lock = threading.Lock()
+_json_cache: "OrderedDict[int, tuple[list, str]]" = OrderedDict()
 
-def duckduckgo_search(query: str, count: int = 5) -> List[dict]:
-    """Simple, unauthenticated search using DuckDuckGo's HTML endpoint via ddg API wrapper.
 
-    If ddg is not available, returns empty results gracefully.
+async def duckduckgo_search(query: str, count: int = 5) -> List[dict]:
+    """Simple, unauthenticated search using DuckDuckGo via the shared search client.
+
+    Results are cached and concurrent identical queries share one fetch.
+    If ddgs is not available or the search fails, returns empty results gracefully.
     """
     try:
-        from ddgs import DDGS  # lightweight, no API key
+        return await get_search_client().asearch(query, count)
     except Exception:
         return []
 
-    results: List[dict] = []
-    with DDGS() as ddgs:
-        for r in ddgs.text(query, max_results=count):
-            results.append({
-                "title": r.get("title"),
-                "href": r.get("href"),
-                "body": r.get("body"),
-            })
-    return results
+
+def _dumps(results: List[dict]) -> str:
+    """JSON for `results`, reused while the search client serves the same cached list."""
+    key = id(results)
+    with _json_lock:
+        hit = _json_cache.get(key)
+        # 캐시 항목이 list를 참조하고 있으므로 id가 다른 객체에 재사용되지 않음
+        if hit is not None and hit[0] is results:
+            _json_cache.move_to_end(key)
+            return hit[1]
+    text = json.dumps(results, ensure_ascii=False)
+    if results:
+        with _json_lock:
+            _json_cache[key] = (results, text)
+            while len(_json_cache) > _JSON_CACHE_SIZE:
+                _json_cache.popitem(last=False)
+    return text
 
 
 # Create FastMCP server
-server = FastMCP(name="job-agent-web-search")
+# json_response: 도구 호출 응답을 SSE 스트림 대신 단일 JSON으로 반환 (streamable HTTP)
+server = FastMCP(name="job-agent-web-search", json_response=True)
 
 
 @server.tool()
-def web_search(query: str, count: int = 5) -> str:
+async def web_search(query: str, count: int = 5) -> str:
     """Perform a web search and return top results as JSON.
 
     Args:
@@ -53,12 +83,28 @@ def web_search(query: str, count: int = 5) -> str:
     Returns:
         JSON string of [{title, href, body}]
     """
-    results = duckduckgo_search(query, count=count)
-    return json.dumps(results, ensure_ascii=False)
+    results = await duckduckgo_search(query, count=count)
+    return _dumps(results)
 
 
-def main() -> None:
-    server.run(transport="stdio")
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="MCP web search server for the Job Agent")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "streamable-http"],
+        default=os.getenv("JOB_AGENT_MCP_TRANSPORT", "stdio"),
+    )
+    parser.add_argument("--host", default=os.getenv("JOB_AGENT_MCP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("JOB_AGENT_MCP_PORT", "8001")))
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    if args.transport == "streamable-http":
+        server.settings.host = args.host
+        server.settings.port = args.port
+    server.run(transport=args.transport)
 
 
 if __name__ == "__main__":
@@ -67,5 +113,3 @@ if __name__ == "__main__":
         main()
     except KeyboardInterrupt:
         sys.exit(0)
-
-